@@ -1,11 +1,86 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
+from core.config import settings
+
+# bcrypt releases the GIL, so a small thread pool hashes in parallel without blocking the event loop
+HASH_WORKERS = max(1, settings.password_hash_workers)
+HASH_ROUNDS = settings.password_hash_rounds
+HASH_TARGET_MS = settings.password_hash_target_ms
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+CALIBRATION_SAMPLES = 5
+
 
 class Hash:
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
 
     @staticmethod
     def encrypt(password: str):
         return Hash.pwd_context.hash(password)
     @staticmethod
     def verify_password(input_password: str, hashed_password: str):
-        return Hash.pwd_context.verify(input_password, hashed_password)
\ No newline at end of file
+        return Hash.pwd_context.verify(input_password, hashed_password)
+
+    @staticmethod
+    async def async_encrypt(password: str):
+        """ Hash the password in the hashing pool instead of the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(Hash.executor, Hash.encrypt, password)
+
+    @staticmethod
+    async def async_verify_password(input_password: str, hashed_password: str):
+        """ Verify the password in the hashing pool instead of the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(Hash.executor, Hash.verify_password, input_password, hashed_password)
+
+    @staticmethod
+    async def async_verify_and_update(input_password: str, hashed_password: str):
+        """ Verify the password and return a new hash as well if the stored one uses an outdated cost."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(Hash.executor, Hash.pwd_context.verify_and_update,
+                                          input_password, hashed_password)
+
+    @staticmethod
+    def configure(rounds: int):
+        """ Use the given bcrypt cost for new hashes and mark hashes with a lower cost for rehash.
+            Hashes with a higher cost are kept, so a rehash never lowers the cost of a password."""
+        Hash.pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds
+        )
+
+    @staticmethod
+    def calibrate_rounds(target_ms: float = HASH_TARGET_MS, floor: int = HASH_ROUNDS):
+        """
+            Find the highest bcrypt cost whose hashing stays within the target latency on this host, never
+            lower than the floor. The median of a few samples is used, as a single timing is noisy.
+        """
+        samples = []
+        for _ in range(CALIBRATION_SAMPLES):
+            start = time.perf_counter()
+            bcrypt.using(rounds=BCRYPT_MIN_ROUNDS).hash("calibration")
+            samples.append((time.perf_counter() - start) * 1000)
+        elapsed_ms = statistics.median(samples)
+
+        # every extra round doubles the hashing time
+        rounds = BCRYPT_MIN_ROUNDS
+        while rounds < BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= target_ms:
+            rounds += 1
+            elapsed_ms *= 2
+
+        return max(rounds, floor)
+
+
+Hash.configure(HASH_ROUNDS)
+
+
+if __name__ == "__main__":
+    # run once per deployment and set the printed cost as PASSWORD_HASH_ROUNDS of every worker
+    print(f"PASSWORD_HASH_ROUNDS = {Hash.calibrate_rounds()}")
@@ -0,0 +1,78 @@
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from sqlalchemy import select
+from core.config import settings
+from models.roles_model import Roles
+from models.user_model import User
+
+PRINCIPAL_CACHE_SIZE = settings.principal_cache_size
+PRINCIPAL_CACHE_TTL_SECONDS = settings.principal_cache_ttl_seconds
+
+
+class Principal(NamedTuple):
+    is_active: bool
+    is_verified: bool
+    role: str | None
+
+
+class PrincipalCache:
+    """ Short lived LRU cache of the user state which is checked on every authorized request."""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+
+    def get(self, user_id):
+        """ This method returns the cached principal of the user, None if it is missing or expired."""
+        entry = self.entries.get(str(user_id))
+        if entry is None:
+            return None
+
+        principal, cached_at = entry
+        if time.monotonic() - cached_at >= self.ttl_seconds:
+            del self.entries[str(user_id)]
+            return None
+
+        self.entries.move_to_end(str(user_id))
+        return principal
+
+    def set(self, user_id, principal):
+        """ This method caches the principal of the user and evicts the least recently used one."""
+        self.entries[str(user_id)] = (principal, time.monotonic())
+        self.entries.move_to_end(str(user_id))
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """ This method removes the user from the cache after the user state is changed."""
+        self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        """ This method empties the cache."""
+        self.entries.clear()
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+async def get_principal(db, user_id):
+    """ This function returns the activation state and role of the user, None if user does not exist."""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user_state = (await db.execute(
+        select(User.is_active, User.is_verified, Roles.role_name)
+        .outerjoin(Roles, User.role_id == Roles.id)
+        .where(User.id == user_id)
+    )).first()
+
+    if user_state is None:
+        return None
+
+    principal = Principal(*user_state)
+    principal_cache.set(user_id, principal)
+    return principal
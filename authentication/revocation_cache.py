@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from sqlalchemy import select, delete, func
+from core.config import settings
+from models.blacklist_token_model import BlackListToken
+
+REVOCATION_CACHE_SIZE = settings.token_revocation_cache_size
+REVOCATION_SYNC_SECONDS = settings.token_revocation_sync_seconds
+REVOCATION_PURGE_SECONDS = settings.token_revocation_purge_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationCache:
+    """ In-memory copy of the unexpired revoked token ids, so the verification of a token
+        which is not revoked does not need a database round-trip."""
+
+    def __init__(self, max_size, sync_seconds):
+        self.max_size = max_size
+        self.sync_seconds = sync_seconds
+        self.revoked = set()
+        self.is_complete = False
+        self.synced_at = None
+
+    def is_stale(self):
+        """ This method checks whether the cache has to be reloaded from the database."""
+        return self.synced_at is None or time.monotonic() - self.synced_at >= self.sync_seconds
+
+    async def sync(self, db):
+        """ This method reloads the revoked token ids from the database, It picks up the
+            tokens revoked by the other workers and drops the expired ones."""
+
+        # mark the cache as synced first so that concurrent requests do not reload it again
+        self.synced_at = time.monotonic()
+        try:
+            revoked_ids = (await db.execute(
+                select(BlackListToken.jti)
+                .where(BlackListToken.expires_at > func.now())
+                .limit(self.max_size + 1))
+            ).scalars().all()
+        except Exception:
+            self.synced_at = None
+            raise
+
+        self.is_complete = len(revoked_ids) <= self.max_size
+        self.revoked = set(revoked_ids[:self.max_size])
+
+    def add(self, jti):
+        """ This method adds the token id revoked by this worker into the cache."""
+        if len(self.revoked) < self.max_size:
+            self.revoked.add(jti)
+        else:
+            self.is_complete = False
+
+    def is_revoked(self, jti):
+        """ This method returns True or False if the cache knows the token state
+            otherwise None, In that case the database has to be checked."""
+        if jti in self.revoked:
+            return True
+        if self.is_complete:
+            return False
+        return None
+
+    def clear(self):
+        """ This method empties the cache, It will be reloaded on the next verification."""
+        self.revoked = set()
+        self.is_complete = False
+        self.synced_at = None
+
+
+revocation_cache = RevocationCache(REVOCATION_CACHE_SIZE, REVOCATION_SYNC_SECONDS)
+
+
+async def purge_expired_revocations(db):
+    """ This function deletes the revocations of the tokens which are expired,
+        as an expired token is rejected by its signature check anyway."""
+    result = await db.execute(delete(BlackListToken).where(BlackListToken.expires_at <= func.now()))
+    await db.commit()
+    return result.rowcount
+
+
+async def purge_expired_revocations_periodically(db_session, interval = REVOCATION_PURGE_SECONDS):
+    """ This function runs the purge of expired revocations in the background, with the sessions of db_session."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with db_session() as db:
+                await purge_expired_revocations(db)
+        except Exception:
+            logger.exception("Purging expired token revocations failed")
@@ -1,13 +1,7 @@
 from functools import wraps
-import os
-from dotenv import load_dotenv
 from fastapi import HTTPException
 from core.constant import NOT_ALLOWED
 
-load_dotenv()
-SECRET_KEY = os.environ.get("HASH_KEY")
-ALGORITHM = os.environ.get("HASH_ALGO")
-
 def pre_authorize(authorized_roles: list = []):
     def decorator(func):
         @wraps(func)
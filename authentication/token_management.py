@@ -1,49 +1,117 @@
+import hashlib
 from datetime import datetime, timedelta, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 import jwt
 from fastapi import HTTPException
 from jwt import DecodeError
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects.postgresql import insert
 from starlette import status
-from core.constant import EXPIRES, REFRESH_TOKEN_REQUIRED, IS_REFRESH, ACCESS_TOKEN_REQUIRED, TOKEN_EXPIRED
+from core.constant import EXPIRES, REFRESH_TOKEN_REQUIRED, IS_REFRESH, ACCESS_TOKEN_REQUIRED, TOKEN_EXPIRED, JTI
+from authentication.revocation_cache import revocation_cache
 from models.blacklist_token_model import BlackListToken
 from schemas.user_schemas import TokenData
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from core.config import settings
 
-SECRET_KEY = os.environ.get("HASH_KEY")
-ALGORITHM = os.environ.get("HASH_ALGO")
+SECRET_KEY = settings.hash_key
+ALGORITHM = settings.hash_algo
+ACCESS_TOKEN_EXPIRE_TIME = settings.jwt_access_token_time
+REFRESH_TOKEN_EXPIRE_TIME = settings.jwt_refresh_token_time
+# tokens were revoked by their full text before the revocations by jti
+LEGACY_REVOCATION_TABLE = "blacklist_token"
+LEGACY_REVOCATION_BATCH_SIZE = 1000
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None, refresh = False):
     """ This function create access token and refresh token for the given data."""
 
-    load_dotenv()
-    ACCESS_TOKEN_EXPIRE_TIME = os.environ.get("JWT_ACCESS_TOKEN_TIME")
-    REFRESH_TOKEN_EXPIRE_TIME = os.environ.get("JWT_REFRESH_TOKEN_TIME")
     to_encode = data.copy()
 
     if refresh:
-        expire = datetime.now(timezone.utc) + timedelta(hours = int(REFRESH_TOKEN_EXPIRE_TIME))
+        expire = datetime.now(timezone.utc) + timedelta(hours = REFRESH_TOKEN_EXPIRE_TIME)
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes = float(ACCESS_TOKEN_EXPIRE_TIME))
+        expire = datetime.now(timezone.utc) + timedelta(minutes = ACCESS_TOKEN_EXPIRE_TIME)
 
     to_encode.update({EXPIRES: expire})
     to_encode.update({IS_REFRESH: refresh})
+    to_encode.update({JTI: uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
     return encoded_jwt
 
-def verify_access_token(db, token, credentials_exception, check_refresh=False):
-    """ This function verifies the token, If access token is invalid then raise exception """
+def token_jti(payload, token):
+    """ This function returns the id of the token, Tokens issued without jti claim are identified by their digest."""
+    return payload.get(JTI) or hashlib.sha256(token.encode()).hexdigest()
+
+def revocation_claims(token):
+    """ This function returns the id and expiry of the token to revoke it, None if there is nothing to revoke."""
     try:
-        blacklisted_token = db.query(BlackListToken).filter(BlackListToken.token == token).first()
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    except jwt.InvalidTokenError:
+        return None
 
-        if blacklisted_token:
-            raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED, detail = TOKEN_EXPIRED)
+    expires = payload.get(EXPIRES)
+    if expires is None:
+        expires_at = datetime.max.replace(tzinfo=timezone.utc)
+    else:
+        expires_at = datetime.fromtimestamp(expires, tz=timezone.utc)
+
+    # expired token is already rejected by the signature check
+    if expires_at <= datetime.now(timezone.utc):
+        return None
+
+    return token_jti(payload, token), expires_at
+
+async def backfill_legacy_revocations(db, batch_size = LEGACY_REVOCATION_BATCH_SIZE):
+    """
+        This function copies the unexpired tokens of the legacy blacklist_token table into the revocations by jti,
+        so the tokens revoked before the deploy stay revoked. It is safe to run again and returns the number of
+        revocations copied.
+    """
+    has_legacy_table = await db.run_sync(
+        lambda session: inspect(session.connection()).has_table(LEGACY_REVOCATION_TABLE)
+    )
+    if not has_legacy_table:
+        return 0
+
+    # only the tokens revoked within their lifetime are kept, the older ones are rejected as expired anyway
+    revocations = []
+    tokens = await db.stream_scalars(text(f"SELECT token FROM {LEGACY_REVOCATION_TABLE}"))
+    async for token in tokens:
+        claims = revocation_claims(token)
+        if claims is not None:
+            revocations.append({"jti": claims[0], "expires_at": claims[1]})
 
+    copied = 0
+    for start in range(0, len(revocations), batch_size):
+        copied += await insert_revocations(db, revocations[start:start + batch_size])
+    await db.commit()
+    return copied
+
+async def insert_revocations(db, revocations):
+    """ This function stores the revocations, skipping the ones which exist already."""
+    result = await db.execute(
+        insert(BlackListToken).values(revocations).on_conflict_do_nothing(index_elements = [BlackListToken.jti])
+    )
+    return result.rowcount
+
+async def verify_access_token(db, token, credentials_exception, check_refresh=False):
+    """ This function verifies the token, If access token is invalid then raise exception """
+    try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
+        jti = token_jti(payload, token)
+        if revocation_cache.is_stale():
+            await revocation_cache.sync(db)
+
+        is_revoked = revocation_cache.is_revoked(jti)
+        if is_revoked is None:
+            # cache is over its size limit, so fall back to the indexed lookup
+            is_revoked = await db.get(BlackListToken, jti) is not None
+
+        if is_revoked:
+            raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED, detail = TOKEN_EXPIRED)
+
         email: str = payload.get("sub")
         user_id: UUID = payload.get("user_id")
         role: str = payload.get("Role")
@@ -0,0 +1,32 @@
+from sqlalchemy import select, and_
+from core.validations import start_of_day
+from models.turf_booking import TurfBooking, ACTIVE_BOOKING
+
+
+def conflicting_bookings(turf_id, reservation_date, start_time, end_time):
+    """ This function returns the query of the active bookings of the turf which overlap the time range."""
+    return select(TurfBooking).where(
+        and_(
+            TurfBooking.turf_id == turf_id,
+            TurfBooking.reservation_date == start_of_day(reservation_date),
+            TurfBooking.start_time < end_time,
+            TurfBooking.end_time > start_time,
+            ACTIVE_BOOKING
+        )
+    )
+
+
+def customer_bookings(customer_id):
+    """ This function returns the query of the booking history of the customer."""
+    return select(TurfBooking).where(TurfBooking.customer_id == customer_id)
+
+
+def turf_bookings(turf_id, start_date, end_date):
+    """ This function returns the query of the bookings of the turf reserved from the start date to the end date."""
+    return select(TurfBooking).where(
+        and_(
+            TurfBooking.turf_id == turf_id,
+            TurfBooking.reservation_date >= start_of_day(start_date),
+            TurfBooking.reservation_date <= start_of_day(end_date)
+        )
+    )
@@ -0,0 +1,79 @@
+import os
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """ Application settings, read once from the environment and the .env file."""
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Database
+    database_name: str | None = None
+    database_username: str | None = None
+    database_password: str | None = None
+    database_host: str | None = None
+    database_port: str | None = None
+    test_database_name: str | None = None
+
+    # Connection pool, see core/database.py for the defaults derived from the connection budget
+    web_concurrency: int = 1
+    database_max_connections: int = 90
+    database_pool_size: int | None = None
+    database_max_overflow: int | None = None
+    database_pool_timeout: float = 30
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+
+    # JWT
+    hash_key: str | None = None
+    hash_algo: str | None = None
+    jwt_access_token_time: float = 30
+    jwt_refresh_token_time: int = 24
+
+    # Password hashing
+    password_hash_workers: int = min(4, os.cpu_count() or 1)
+    password_hash_rounds: int = 12
+    password_hash_target_ms: float = 250
+
+    # Authentication caches
+    token_revocation_cache_size: int = 100000
+    # a token revoked on one worker is accepted by the other workers until their next sync, while the
+    # revocations used to be checked in the database on every request, so keep the window short
+    token_revocation_sync_seconds: float = 5
+    token_revocation_purge_seconds: float = 3600
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: float = 30
+
+    # Turf search cache
+    search_cache_size: int = 1000
+    search_cache_ttl_seconds: float = 30
+
+    # Compiled price tables of the turfs
+    price_table_cache_size: int = 10000
+
+    # Reference data catalog of games, cities, states and roles
+    reference_catalog_sync_seconds: float = 300
+
+    # Mail
+    mail_username: str | None = None
+    mail_password: str | None = None
+    mail_from: str | None = None
+    mail_port: int | None = None
+    mail_server: str | None = None
+
+    # Google SSO
+    google_client_id: str | None = None
+    google_client_secret: str | None = None
+
+    # Server
+    host: str | None = None
+    port: str | None = None
+
+
+@lru_cache
+def get_settings():
+    """ Get the settings object, It is created only once per process."""
+    return Settings()
+
+
+settings = get_settings()
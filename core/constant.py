@@ -1,6 +1,4 @@
-import os
-
-from dotenv import load_dotenv
+from core.config import settings
 
 MESSAGE = "Message"
 WELCOME_MSG = "Welcome! Turf booking mode is ON"
@@ -61,6 +59,7 @@ PASSWORD_CHANGED = "Password changed successfully !"
 PASSWORD_SHOULD_NOT_BE_SAME = "New password and old password should not be same! Try again"
 EXPIRES = "exp"
 IS_REFRESH = "is_refresh"
+JTI = "jti"
 
 FORGOT_PASSWORD_SUB = "Reset your password"
 EMAIL_SENT = "Email has been sent for password reset"
@@ -69,6 +68,11 @@ NEW_PASSWORD_NOT_SAME = "New password and confirm password do not match! Try aga
 LOGOUT_SUCCESS = "Logout successful"
 NEXT_PAGE = "next_page"
 PREV_PAGE = "previous_page"
+NEXT_CURSOR = "next_cursor"
+PREV_CURSOR = "previous_cursor"
+CURSOR_NEXT = "next"
+CURSOR_PREVIOUS = "prev"
+INVALID_CURSOR = "Invalid page cursor"
 INVALID_FEEDBACK_INPUT = "Invalid feedback input data !"
 
 INVALID_ACCESS_TOKEN = "Invalid access token !"
@@ -97,6 +101,8 @@ TURF_ACTIVATION_UPDATED =  "Turf activation and verification data updated succes
 TURF_DEACTIVATED = "Turf deactivate successfully !"
 TURF_DISCOUNT_ADDED = "Turf discount added successfully !"
 TURF_DISCOUNT_DEACTIVATED = "Turf discount deactivated successfully !"
+PRICING_RULE_ADDED = "Turf pricing rule added successfully !"
+PRICING_RULE_DEACTIVATED = "Turf pricing rule deactivated successfully !"
 TURF_OWNER_ALREADY_VERIFIED = "Turf owner already verified !"
 TURF_ADDRESS_ADDED = "Turf address address added successfully !"
 TURF_ADDED_SUCCESS = "Turf added successfully !"
@@ -107,6 +113,10 @@ TURF_ALREADY_BOOKED = "Turf is already booked !"
 INVALID_DISCOUNT_ID = "Invalid discount id !"
 DISCOUNT_EXPIRED = "Discount has been expired!"
 INVALID_DISCOUNT_AMOUNT = "Invalid discount amount must be greater than zero and minimum discount amount is 100 Rs."
+INVALID_PRICING_RULE = ("Invalid pricing rule ! weekdays must be 0 (monday) to 6, times in 30-minute intervals with "
+                        "the end after the start, and the price between 10 and 1000 percent.")
+INVALID_PRICING_RULE_ID = "Invalid pricing rule id !"
+PRICING_RULE_INACTIVE = "Pricing rule is already deactivated!"
 INVALID_DATE_TIME_FORMAT = "Invalid date time format !"
 INVALID_DATE = "Error: Reservation date cannot be in the past."
 INVALID_END_TIME = "Error: End time must be on the same day as reservation date or the very next day (for overnight bookings)."
@@ -116,6 +126,8 @@ PAST_TIME_ERROR = "Error: slot time cannot be in the past."
 INVALID_END_TIME_OVERNIGHT = "Error: End time must be after start time or select valid date and time for booking !"
 INVALID_BOOKING_TIME = "Error: Booking must be at least 1 hour long."
 MAXIMUM_ADVANCE_DAYS_ERROR = "Error: You can only book up to 30 days in advance."
+INVALID_AVAILABILITY_DAYS = "Availability can be shown for 1 to 30 days within the booking window."
+INVALID_QUOTE_SLOTS = "A quote can price 1 to 100 slots."
 CUSTOMER_ROLE = "Customer"
 OWNER_ROLE = "Owner"
 MANAGER_ROLE = "Manager"
@@ -152,11 +164,30 @@ FEEDBACK_ADDED = "Feedback added successfully"
 NO_TURF_FOUND = "No turfs found for this owner"
 FEEDBACK_NOT_ALLOWED = "Feedback not allowed, you can only give the feedback on confirm booking."
 INVALID_USER_ACTION = "Invalid user action ! This user has not a role of manager"
-load_dotenv()
-HOST = os.environ.get("HOST")
-PORT = os.environ.get("PORT")
+INVALID_RADIUS = "Search radius must be greater than zero"
+INVALID_WINDOW = "Window must be at least one hour, in steps of 30 minutes, and fit between the start and end time"
+
+# Geo search
+KM_PER_DEGREE = 111.32
+MIN_LATITUDE_COS = 0.01
+SEARCH_MODE_COUNT = "count"
+SEARCH_MODE_HAS_MORE = "has_more"
+
+# Slot occupancy, one bit per half-hour slot of a day
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 48
+MAXIMUM_ADVANCE_DAYS = 30
+MAXIMUM_QUOTE_SLOTS = 100
+MINIMUM_PRICE_PERCENT = 10
+MAXIMUM_PRICE_PERCENT = 1000
+
+# Postgres error codes
+EXCLUSION_VIOLATION = "23P01"
+HOST = settings.host
+PORT = settings.port
 
 #URL
-SOCIAL_AUTH_REDIRECT_URL= f"http://{HOST}:{PORT}/api/v1/user/callback"
+BASE_URL = f"http://{HOST}:{PORT}"
+SOCIAL_AUTH_REDIRECT_URL= f"{BASE_URL}/api/v1/user/callback"
 FORGOT_PASSWORD_URL= "http://localhost:8000/api/v1/user/reset-forgot-password/?token={0}"
-SING_IN_URL= f"http://{HOST}:{PORT}/api/v1/user/sign-in"
+SING_IN_URL= f"{BASE_URL}/api/v1/user/sign-in"
@@ -1,30 +1,155 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine, text, inspect
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateIndex
+from core.config import settings
 
-load_dotenv()
-DB_NAME = os.environ.get("DATABASE_NAME")
-DB_USERNAME = os.environ.get("DATABASE_USERNAME")
-DB_PASSWORD = os.environ.get("DATABASE_PASSWORD")
-DB_HOST = os.environ.get("DATABASE_HOST")
-DB_PORT = os.environ.get("DATABASE_PORT")
-TEST_DB_NAME = os.environ.get("TEST_DATABASE_NAME")
+DB_NAME = settings.database_name
+DB_USERNAME = settings.database_username
+DB_PASSWORD = settings.database_password
+DB_HOST = settings.database_host
+DB_PORT = settings.database_port
+TEST_DB_NAME = settings.test_database_name
 
 DB_URL = f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 TEST_DB_URL = f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{TEST_DB_NAME}"
+ASYNC_DB_URL = f"postgresql+asyncpg://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+TEST_ASYNC_DB_URL = f"postgresql+asyncpg://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{TEST_DB_NAME}"
+
+# Connection budget of the database server is shared among all the uvicorn workers,
+# so the default pool of every worker is sized from its share of that budget.
+WORKER_COUNT = max(1, settings.web_concurrency)
+DB_MAX_CONNECTIONS = settings.database_max_connections
+WORKER_CONNECTIONS = max(2, DB_MAX_CONNECTIONS // WORKER_COUNT)
+
+DB_POOL_SIZE = settings.database_pool_size
+if DB_POOL_SIZE is None:
+    DB_POOL_SIZE = max(1, WORKER_CONNECTIONS // 2)
+DB_MAX_OVERFLOW = settings.database_max_overflow
+if DB_MAX_OVERFLOW is None:
+    DB_MAX_OVERFLOW = max(0, WORKER_CONNECTIONS - DB_POOL_SIZE)
+DB_POOL_TIMEOUT = settings.database_pool_timeout
+DB_POOL_RECYCLE = settings.database_pool_recycle
+DB_POOL_PRE_PING = settings.database_pool_pre_ping
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """ Queue pool which keeps count of the checkouts that had to wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def _do_get(self):
+        must_wait = (self._max_overflow > -1 and self.checkedin() == 0
+                     and self.overflow() >= self._max_overflow)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if must_wait:
+                self.waits += 1
+                self.wait_time += time.perf_counter() - start
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.waits = self.waits
+        pool.wait_time = self.wait_time
+        return pool
 
-engine = create_engine(DB_URL)
+
+# Synchronous engines are kept for table creation, seeding and test fixtures.
+engine = create_engine(DB_URL, pool_pre_ping=DB_POOL_PRE_PING, pool_recycle=DB_POOL_RECYCLE)
 test_engine = create_engine(TEST_DB_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False)
 TestSessionLocal =  sessionmaker(bind=test_engine,autocommit=False, autoflush=False)
+
+# Asyncio engines serve the request path so queries do not block the event loop.
+async_engine = create_async_engine(
+    ASYNC_DB_URL,
+    poolclass=MonitoredQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
+)
+test_async_engine = create_async_engine(TEST_ASYNC_DB_URL, poolclass=NullPool)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession,
+                                       autoflush=False, expire_on_commit=False)
+TestAsyncSessionLocal = async_sessionmaker(bind=test_async_engine, class_=AsyncSession,
+                                           autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    """ Get the database connection from session"""
-    db = SessionLocal()
-    try:
+def add_missing_columns(bind):
+    """
+        create_all skips the tables which exist already, so add the columns declared on them later.
+        A column added to an existing table needs a server default or has to be nullable, the rows
+        which are already in the table are filled with it.
+    """
+    with bind.begin() as connection:
+        ddl_compiler = connection.dialect.ddl_compiler(connection.dialect, None)
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    connection.execute(text(
+                        f'ALTER TABLE "{table.name}" ADD COLUMN IF NOT EXISTS '
+                        f'{ddl_compiler.get_column_specification(column)}'
+                    ))
+
+def create_missing_indexes(bind):
+    """
+        create_all skips the tables which exist already, so create the indexes declared on them later.
+        It is a deploy step, the indexes are built concurrently so the writes to the tables go on meanwhile,
+        and an index left invalid by an interrupted build is dropped and built again.
+    """
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                is_invalid = connection.execute(
+                    text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:index_name)"),
+                    {"index_name": index.name}
+                ).scalar()
+                if is_invalid:
+                    connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+
+                create_index = str(CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect))
+                connection.execute(text(create_index.replace("INDEX", "INDEX CONCURRENTLY", 1)))
+
+async def get_db():
+    """ Get the async database session for the request"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+def app_db_session(app):
+    """ Get the factory of the database sessions used outside of the requests, e.g. at startup and by the
+        background jobs. It goes through the get_db dependency, so its overrides apply as well."""
+    return asynccontextmanager(app.dependency_overrides.get(get_db, get_db))
+
+def get_pool_status():
+    """ Get the connection pool statistics of the request engine."""
+    pool = async_engine.pool
+    return {
+        "workers": WORKER_COUNT,
+        "pool_size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "waits": pool.waits,
+        "wait_time": round(pool.wait_time, 3),
+        "timeout": DB_POOL_TIMEOUT,
+        "recycle": DB_POOL_RECYCLE,
+        "pre_ping": DB_POOL_PRE_PING
+    }
@@ -0,0 +1,83 @@
+import asyncio
+from sqlalchemy import select, and_, text
+from sqlalchemy.orm import aliased
+from sqlalchemy.schema import AddConstraint
+from authentication.token_management import backfill_legacy_revocations
+from core.constant import STATUS_CANCELLED
+from core.database import AsyncSessionLocal, Base, engine, add_missing_columns, create_missing_indexes
+from models import (
+    blacklist_token_model, state_model, city_model, address_model, roles_model, user_model, game_model, discount_model,
+    admin_revenue_model, turf_model, media_model, manage_turf_manager_model, turf_booking,
+    turf_slot_occupancy_model, turf_pricing_rule_model, revenue_model, feedback_model)
+from models.turf_booking import TurfBooking, SLOT_EXCLUSION_CONSTRAINT
+
+
+def overlapping_bookings(connection):
+    """ This function returns the pairs of bookings of a turf which are not cancelled and whose times overlap."""
+    booking, other_booking = aliased(TurfBooking), aliased(TurfBooking)
+    return connection.execute(
+        select(booking.turf_id, booking.id, booking.start_time, booking.end_time,
+               other_booking.id.label("other_id"), other_booking.start_time.label("other_start_time"),
+               other_booking.end_time.label("other_end_time"))
+        .join(other_booking, and_(
+            other_booking.turf_id == booking.turf_id,
+            other_booking.id > booking.id,
+            other_booking.start_time < booking.end_time,
+            other_booking.end_time > booking.start_time
+        ))
+        .where(booking.booking_status != STATUS_CANCELLED, other_booking.booking_status != STATUS_CANCELLED)
+        .order_by(booking.turf_id, booking.start_time)
+    ).all()
+
+
+def add_slot_exclusion_constraint(bind):
+    """
+        create_all only adds the exclusion constraint of the bookings to a new turf_booking table, so add it to
+        an existing one. The bookings which overlap already have to be resolved first, as the constraint and the
+        slot occupancy bitmap both rely on each slot of a turf being held by one booking.
+    """
+    with bind.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        has_constraint = connection.execute(
+            text("SELECT 1 FROM pg_constraint WHERE conname = :constraint_name"),
+            {"constraint_name": SLOT_EXCLUSION_CONSTRAINT}
+        ).first()
+        if has_constraint:
+            return False
+
+        # no booking can be added between the check and the constraint
+        connection.execute(text(f"LOCK TABLE {TurfBooking.__tablename__} IN ACCESS EXCLUSIVE MODE"))
+        overlaps = overlapping_bookings(connection)
+        if overlaps:
+            raise RuntimeError(
+                f"{len(overlaps)} pairs of active bookings overlap, cancel one booking of each pair and deploy "
+                f"again:\n" + "\n".join(
+                    f"turf {overlap.turf_id}: booking {overlap.id} {overlap.start_time} - {overlap.end_time} "
+                    f"and booking {overlap.other_id} {overlap.other_start_time} - {overlap.other_end_time}"
+                    for overlap in overlaps
+                )
+            )
+
+        exclusion_constraint = next(
+            constraint for constraint in TurfBooking.__table__.constraints
+            if constraint.name == SLOT_EXCLUSION_CONSTRAINT
+        )
+        connection.execute(AddConstraint(exclusion_constraint))
+        return True
+
+
+async def deploy():
+    """ This function runs the one-off steps of a deployment, before the workers of the new version start."""
+    Base.metadata.create_all(engine)
+    add_missing_columns(engine)
+    if add_slot_exclusion_constraint(engine):
+        print(f"Added the {SLOT_EXCLUSION_CONSTRAINT} constraint to the existing bookings")
+    create_missing_indexes(engine)
+
+    async with AsyncSessionLocal() as db:
+        copied = await backfill_legacy_revocations(db)
+    print(f"Revoked tokens copied from the legacy blacklist: {copied}")
+
+
+if __name__ == "__main__":
+    asyncio.run(deploy())
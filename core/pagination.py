@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple, List, Any, Optional
+from urllib.parse import urlencode
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from starlette import status
+from core.constant import INVALID_CURSOR, CURSOR_NEXT, CURSOR_PREVIOUS
+
+
+class KeysetPage(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_page: Optional[str]
+    previous_page: Optional[str]
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+def encode_cursor(row, direction):
+    """ This function creates an opaque cursor pointing at the (created_at, id) key of the row."""
+    payload = json.dumps({"d": direction, "c": row.created_at.isoformat(), "i": str(row.id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """ This function reads the direction and the (created_at, id) key from the cursor."""
+    try:
+        padded_cursor = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded_cursor.encode()))
+        direction = payload["d"]
+        if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(payload["c"]), UUID(payload["i"])
+
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_CURSOR)
+
+
+def page_cursors(items, has_next_page, has_previous_page):
+    """ This function creates the cursors of the pages around the given rows."""
+    next_cursor = encode_cursor(items[-1], CURSOR_NEXT) if items and has_next_page else None
+    previous_cursor = encode_cursor(items[0], CURSOR_PREVIOUS) if items and has_previous_page else None
+    return next_cursor, previous_cursor
+
+
+def newest_first(query, model):
+    """ This function orders the query by the (created_at, id) key of the model, newest first."""
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def keyset_query(query, model, size, cursor):
+    """
+        This function returns the query of the rows which come after or before the cursor, newest first
+        by (created_at, id), with the direction of the scan and the key of the cursor. It seeks through
+        the composite index instead of skipping rows with offset.
+    """
+    key = tuple_(model.created_at, model.id)
+
+    if cursor is None:
+        direction, cursor_key = CURSOR_NEXT, None
+    else:
+        direction, created_at, row_id = decode_cursor(cursor)
+        cursor_key = tuple_(created_at, row_id)
+
+    if direction == CURSOR_NEXT:
+        if cursor_key is not None:
+            query = query.where(key < cursor_key)
+        query = newest_first(query, model)
+    else:
+        query = query.where(key > cursor_key).order_by(model.created_at.asc(), model.id.asc())
+
+    # one extra row tells whether there is another page in the direction of the scan
+    return query.limit(size + 1), direction, cursor_key
+
+
+async def keyset_page(db, query, model, size, cursor):
+    """ This function fetches the rows of the query which come after or before the cursor."""
+    query, direction, cursor_key = keyset_query(query, model, size, cursor)
+    rows = (await db.execute(query)).scalars().all()
+    has_more = len(rows) > size
+    items = list(rows[:size])
+
+    if direction == CURSOR_NEXT:
+        next_cursor, previous_cursor = page_cursors(items, has_more, cursor_key is not None)
+    else:
+        items.reverse()
+        next_cursor, previous_cursor = page_cursors(items, True, has_more)
+
+    return KeysetPage(items, next_cursor, previous_cursor)
+
+
+def with_query(url, **params):
+    """ This function appends the query parameters to the url, which may already have a query."""
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}{urlencode(params)}"
+
+
+def page_links(url, page, size, has_next_page):
+    """ This function creates the links of the next and the previous page numbers."""
+    next_page = with_query(url, page=page + 1, size=size) if has_next_page else None
+    previous_page = with_query(url, page=page - 1, size=size) if page > 1 else None
+    return next_page, previous_page
+
+
+def offset_query(query, page, size):
+    """ This function returns the query of the rows of the page number, with one extra row which tells
+        whether a next page exists, so the rest of the result is neither counted nor loaded."""
+    return query.offset((page - 1) * size).limit(size + 1)
+
+
+async def offset_page(db, query, page, size):
+    """ This function fetches the rows of the page number."""
+    rows = (await db.execute(offset_query(query, page, size))).scalars().all()
+    return list(rows[:size]), len(rows) > size
+
+
+async def paginate(db, query, model, url, page, size, cursor = None):
+    """ This function fetches one page of the query newest first, by page number or by cursor,
+        with the links and the cursors of the pages around it."""
+    if cursor:
+        items, next_cursor, previous_cursor = await keyset_page(db, query, model, size, cursor)
+        next_page = with_query(url, size=size, cursor=next_cursor) if next_cursor else None
+        previous_page = with_query(url, size=size, cursor=previous_cursor) if previous_cursor else None
+
+    else:
+        items, has_next_page = await offset_page(db, newest_first(query, model), page, size)
+        next_page, previous_page = page_links(url, page, size, has_next_page)
+        next_cursor, previous_cursor = page_cursors(items, has_next_page, page > 1)
+
+    return Page(items, next_page, previous_page, next_cursor, previous_cursor)
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from datetime import timedelta
+from typing import NamedTuple, Any
+from sqlalchemy import select, func, and_
+from core.config import settings
+from core.constant import SLOT_MINUTES, SLOTS_PER_DAY
+from core.slot_occupancy import slot_index
+from core.validations import validate_turf_state
+from models.address_model import Address
+from models.discount_model import Discount
+from models.turf_model import Turf
+from models.turf_pricing_rule_model import TurfPricingRule
+
+SLOT_DURATION = timedelta(minutes=SLOT_MINUTES)
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+PRICE_TABLE_CACHE_SIZE = settings.price_table_cache_size
+
+
+class TurfPricing(NamedTuple):
+    discount_amount: int
+    # city and game of the turf, which scope the searches its bookings change
+    city_id: int | None
+    game_id: Any
+    # price of every half-hour slot of the week in hundredths, monday 00:00 first
+    price_table: tuple
+
+
+class PriceTableCache:
+    """ LRU cache of the compiled price tables of the turfs. A table is stored with the version of the price
+        and rules it was compiled from, which is read along with the turf, so a change made by any worker
+        is seen on the next booking without a ttl."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def get(self, turf_id, version):
+        """ This method returns the price table of the turf, None if it is missing or of another version."""
+        entry = self.entries.get(turf_id)
+        if entry is None or entry[0] != version:
+            return None
+
+        self.entries.move_to_end(turf_id)
+        return entry[1]
+
+    def set(self, turf_id, version, price_table):
+        """ This method caches the price table of the turf and evicts the least recently used one."""
+        self.entries[turf_id] = (version, price_table)
+        self.entries.move_to_end(turf_id)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """ This method empties the cache."""
+        self.entries.clear()
+
+
+price_tables = PriceTableCache(PRICE_TABLE_CACHE_SIZE)
+
+
+def compile_price_table(booking_price, rules):
+    """
+        This function compiles the pricing rules of the turf into the price of every half-hour slot of the week,
+        in hundredths so the sums stay exact. A slot which no rule covers costs half the hourly price and
+        where rules overlap the one added last wins.
+    """
+    price_percents = [100] * WEEK_SLOTS
+    for rule in rules:
+        for weekday in range(7):
+            if rule.weekdays >> weekday & 1:
+                first_slot = weekday * SLOTS_PER_DAY
+                price_percents[first_slot + rule.start_slot:first_slot + rule.end_slot] = (
+                    [rule.price_percent] * (rule.end_slot - rule.start_slot)
+                )
+    return tuple(booking_price * price_percent // SLOTS_PER_HOUR for price_percent in price_percents)
+
+
+async def load_turf_pricing(db, turf_id, for_update = False):
+    """
+        This function reads the state, price, active discount, city, game and pricing rules version of the turf
+        in one statement, and compiles its price table only when the cached one is of another version.
+        With for_update the turf row stays locked until the transaction ends, so bookings of the
+        turf wait for each other and the slot conflict check which follows cannot miss one.
+    """
+    active_discount = (
+        select(Discount.discount_amount)
+        .where(and_(Discount.turf_id == Turf.id, Discount.is_active == True))
+        .limit(1)
+        .scalar_subquery()
+    )
+    turf_city = select(Address.city_id).where(Address.id == Turf.address_id).scalar_subquery()
+    pricing_query = (
+        select(
+            Turf.is_active,
+            Turf.is_verified,
+            Turf.booking_price,
+            func.coalesce(active_discount, 0).label("discount_amount"),
+            Turf.pricing_version,
+            turf_city.label("city_id"),
+            Turf.game_id
+        )
+        .where(Turf.id == turf_id)
+    )
+    if for_update:
+        pricing_query = pricing_query.with_for_update(of=Turf)
+
+    turf_data = validate_turf_state((await db.execute(pricing_query)).first())
+
+    version = (turf_data.booking_price, turf_data.pricing_version)
+    price_table = price_tables.get(turf_id, version)
+    if price_table is None:
+        rules = (await db.execute(
+            select(TurfPricingRule)
+            .where(and_(TurfPricingRule.turf_id == turf_id, TurfPricingRule.is_active == True))
+            .order_by(TurfPricingRule.created_at, TurfPricingRule.id)
+        )).scalars().all()
+        price_table = compile_price_table(turf_data.booking_price, rules)
+        price_tables.set(turf_id, version, price_table)
+
+    return TurfPricing(
+        discount_amount = turf_data.discount_amount,
+        city_id = turf_data.city_id,
+        game_id = turf_data.game_id,
+        price_table = price_table
+    )
+
+
+def week_slot(slot_time):
+    """ This function returns the index of the half-hour slot of the week which starts at the given time."""
+    return slot_time.weekday() * SLOTS_PER_DAY + slot_index(slot_time)
+
+
+def slot_count(start_time, end_time):
+    """ This function returns the number of half-hour slots between the start and end time."""
+    return (end_time - start_time) // SLOT_DURATION
+
+
+def day_slot_prices(turf_pricing, slot_date):
+    """ This function returns the price of every half-hour slot of the day."""
+    first_slot = slot_date.weekday() * SLOTS_PER_DAY
+    return [price / 100 for price in turf_pricing.price_table[first_slot:first_slot + SLOTS_PER_DAY]]
+
+
+def quote_amount(turf_pricing, start_time, end_time):
+    """ This function returns the amount of one booking, the sum of the prices of its half-hour slots
+        less the active discount of the turf."""
+    first_slot = week_slot(start_time)
+    slots_price = sum(
+        turf_pricing.price_table[(first_slot + slot) % WEEK_SLOTS] for slot in range(slot_count(start_time, end_time))
+    )
+    return slots_price // 100 - turf_pricing.discount_amount
+
+
+def quote_slots(turf_pricing, slots):
+    """ This function returns the amounts of many candidate bookings of the turf, priced from one load."""
+    return [quote_amount(turf_pricing, start_time, end_time) for start_time, end_time in slots]
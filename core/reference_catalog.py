@@ -0,0 +1,87 @@
+import time
+from typing import NamedTuple
+from sqlalchemy import select
+from core.config import settings
+from models.city_model import City
+from models.game_model import Game
+from models.roles_model import Roles
+from models.state_model import State
+
+REFERENCE_CATALOG_SYNC_SECONDS = settings.reference_catalog_sync_seconds
+
+
+class ReferenceData(NamedTuple):
+    version: int
+    games: dict
+    cities: dict
+    states: dict
+    roles: dict
+
+
+class ReferenceCatalog:
+    """
+        In-memory copy of the games, cities, states and roles, which change a handful of times a year,
+        so validating and listing them needs no database round-trip. Each change made by this worker bumps
+        the version and the copy is reloaded on the next lookup, the changes of other workers are picked up
+        by the periodic reload or, for new rows, by the reload on a miss.
+    """
+
+    def __init__(self, sync_seconds):
+        self.sync_seconds = sync_seconds
+        self.version = 0
+        self.data = None
+        self.synced_at = None
+
+    def is_stale(self):
+        """ This method checks whether the catalog has to be reloaded from the database."""
+        return (self.data is None or self.data.version != self.version
+                or time.monotonic() - self.synced_at >= self.sync_seconds)
+
+    async def load(self, db):
+        """ This method reloads the reference tables, The whole copy is replaced at once,
+            so a concurrent lookup sees either the previous or the new tables."""
+        version = self.version
+        games = (await db.execute(select(Game.id, Game.game_name, Game.is_active))).all()
+        cities = (await db.execute(select(City.id, City.city_name, City.state_id))).all()
+        states = (await db.execute(select(State.id, State.state_name))).all()
+        roles = (await db.execute(select(Roles.id, Roles.role_name))).all()
+
+        # a change made while loading keeps the catalog stale, as the loaded version is the previous one
+        self.data = ReferenceData(
+            version = version,
+            games = {game.id: game for game in games},
+            cities = {city.id: city for city in cities},
+            states = {state.id: state for state in states},
+            roles = {role.id: role for role in roles}
+        )
+        self.synced_at = time.monotonic()
+        return self.data
+
+    async def get(self, db):
+        """ This method returns the reference tables, reloading them when they are stale."""
+        if self.is_stale():
+            return await self.load(db)
+        return self.data
+
+    async def lookup(self, db, table, key):
+        """ This method returns the row of the reference table with the key, None if it does not exist.
+            A missing key reloads the catalog once, as the row may have been added by another worker."""
+        is_reloaded = self.is_stale()
+        data = await self.get(db)
+        row = getattr(data, table).get(key)
+
+        if row is None and not is_reloaded:
+            row = getattr(await self.load(db), table).get(key)
+        return row
+
+    def invalidate(self):
+        """ This method marks the catalog as changed, after a reference table is updated."""
+        self.version += 1
+
+    def clear(self):
+        """ This method empties the catalog, It will be reloaded on the next lookup."""
+        self.data = None
+        self.synced_at = None
+
+
+reference_catalog = ReferenceCatalog(REFERENCE_CATALOG_SYNC_SECONDS)
@@ -0,0 +1,121 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from sqlalchemy import select
+from core.config import settings
+from core.slot_occupancy import slot_masks
+from models.address_model import Address
+from models.turf_model import Turf
+
+SEARCH_CACHE_SIZE = settings.search_cache_size
+SEARCH_CACHE_TTL_SECONDS = settings.search_cache_ttl_seconds
+
+
+class SearchCacheBackend(ABC):
+    """ Storage of the free turfs of the searches, An implementation shared by the workers (e.g. redis)
+        can replace the in-process one by assigning it to search_cache.backend."""
+
+    @abstractmethod
+    def get(self, key):
+        """ This method returns the cached free turfs of the search, None if they are not cached."""
+
+    @abstractmethod
+    def set(self, key, free_turfs, scopes):
+        """ This method caches the free turfs of the search with the (city, game, day) scopes it covers."""
+
+    @abstractmethod
+    def invalidate(self, scopes):
+        """ This method removes the cached searches which cover any of the given scopes."""
+
+    @abstractmethod
+    def clear(self):
+        """ This method empties the cache."""
+
+
+class InMemorySearchCacheBackend(SearchCacheBackend):
+    """ Short lived LRU cache of the free turfs of the searches in this worker, indexed by their scopes."""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """ This method returns the cached free turfs, None if they are missing or expired."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        free_turfs, scopes, cached_at = entry
+        if time.monotonic() - cached_at >= self.ttl_seconds:
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return free_turfs
+
+    def set(self, key, free_turfs, scopes):
+        """ This method caches the free turfs and evicts the least recently used searches."""
+        self.entries[key] = (free_turfs, frozenset(scopes), time.monotonic())
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, scopes):
+        """ This method removes the cached searches which cover any of the given scopes."""
+        scopes = set(scopes)
+        for key in [key for key, (_, entry_scopes, _) in self.entries.items() if entry_scopes & scopes]:
+            del self.entries[key]
+
+    def clear(self):
+        """ This method empties the cache."""
+        self.entries.clear()
+
+
+class SearchCache:
+    """
+        Cache of the turfs which are free for a search of a city, game and time range. They do not depend on
+        the customer, so they are shared and only ordered by the distance of each customer in the search query.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def key(city_id, game_id, start_time, end_time, window_minutes):
+        return f"{city_id}:{game_id}:{start_time.isoformat()}:{end_time.isoformat()}:{window_minutes}"
+
+    @staticmethod
+    def scopes(city_id, game_id, start_time, end_time):
+        """ This method returns the (city, game, day) scopes of the time range, the parts of a search key
+            which a booking of a turf can change."""
+        return [(str(city_id), str(game_id), slot_date) for slot_date in slot_masks(start_time, end_time)]
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, free_turfs, city_id, game_id, start_time, end_time):
+        self.backend.set(key, free_turfs, self.scopes(city_id, game_id, start_time, end_time))
+
+    def invalidate_turf(self, city_id, game_id, start_time, end_time):
+        """ This method drops the searches of the city and game of the booked turf on the days the booking covers.
+            Freeing a slot can add the turf to a search it is not cached in, so the searches are dropped
+            and not only the turf."""
+        self.backend.invalidate(self.scopes(city_id, game_id, start_time, end_time))
+
+    def clear(self):
+        self.backend.clear()
+
+
+search_cache = SearchCache(InMemorySearchCacheBackend(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL_SECONDS))
+
+
+async def load_search_scope(db, turf_id):
+    """ This function returns the city and game of the turf, which scope the searches its bookings change."""
+    return (await db.execute(
+        select(Address.city_id, Turf.game_id)
+        .select_from(Turf)
+        .outerjoin(Address, Turf.address_id == Address.id)
+        .where(Turf.id == turf_id)
+    )).first()
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from sqlalchemy import exists, and_, or_, func
+from sqlalchemy.orm import aliased
+from core.constant import SLOT_MINUTES, SLOTS_PER_DAY
+from models.turf_slot_occupancy_model import TurfSlotOccupancy
+
+
+def slot_index(value):
+    """ This function returns the index of the half-hour slot of the day which starts at the given time."""
+    return (value.hour * 60 + value.minute) // SLOT_MINUTES
+
+
+def slot_masks(start_time, end_time):
+    """ This function returns the bitmask of the slots between start and end time for every day they cover."""
+    masks = {}
+    slot_time = start_time
+    while slot_time < end_time:
+        masks[slot_time.date()] = masks.get(slot_time.date(), 0) | (1 << slot_index(slot_time))
+        slot_time += timedelta(minutes=SLOT_MINUTES)
+    return masks
+
+
+def elapsed_slots_mask(now):
+    """ This function returns the bitmask of the slots of the day which have already started."""
+    return (1 << (slot_index(now) + 1)) - 1
+
+
+def slot_grid(occupied_mask):
+    """ This function expands the bitmask of the occupied slots into the availability of every slot of the day."""
+    return [not occupied_mask >> slot & 1 for slot in range(SLOTS_PER_DAY)]
+
+
+def is_turf_free(turf_id, start_time, end_time):
+    """ This function returns the condition that none of the slots between start and end time is occupied."""
+    return and_(*(
+        ~exists().where(
+            TurfSlotOccupancy.turf_id == turf_id,
+            TurfSlotOccupancy.slot_date == slot_date,
+            TurfSlotOccupancy.occupied.op("&")(slot_mask) != 0
+        )
+        for slot_date, slot_mask in slot_masks(start_time, end_time).items()
+    ))
+
+
+def candidate_windows(start_time, end_time, window_minutes):
+    """ This function returns every window of the given length between start and end time, starting on a slot."""
+    windows = []
+    window_start = start_time
+    while window_start + timedelta(minutes=window_minutes) <= end_time:
+        windows.append((window_start, window_start + timedelta(minutes=window_minutes)))
+        window_start += timedelta(minutes=SLOT_MINUTES)
+    return windows
+
+
+def occupied_slots_joins(turf_id, start_time, end_time):
+    """ This function returns an outer join of the occupancy of the turf for every day between start and
+        end time along with its occupied slots column, so the masks are fetched with the turfs in one statement."""
+    joins, occupied_columns = [], {}
+    for slot_date in slot_masks(start_time, end_time):
+        day_occupancy = aliased(TurfSlotOccupancy)
+        joins.append((day_occupancy, and_(day_occupancy.turf_id == turf_id, day_occupancy.slot_date == slot_date)))
+        occupied_columns[slot_date] = func.coalesce(day_occupancy.occupied, 0)
+    return joins, occupied_columns
+
+
+def has_free_window(occupied_columns, windows):
+    """ This function returns the condition that at least one of the windows has no occupied slot."""
+    return or_(*(
+        and_(*(
+            occupied_columns[slot_date].op("&")(slot_mask) == 0
+            for slot_date, slot_mask in slot_masks(window_start, window_end).items()
+        ))
+        for window_start, window_end in windows
+    ))
+
+
+def free_windows(occupied_masks, windows):
+    """ This function returns the windows which have no occupied slot in the given masks of the days."""
+    return [
+        (window_start, window_end)
+        for window_start, window_end in windows
+        if all(occupied_masks.get(slot_date, 0) & slot_mask == 0
+               for slot_date, slot_mask in slot_masks(window_start, window_end).items())
+    ]
@@ -2,24 +2,23 @@ import re
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select
 from starlette import status
 
+from authentication.principal_cache import get_principal
 from core.constant import INVALID_EMAIL, INVALID_PASSWORD, INVALID_NAME, USER_ALREADY_EXISTS, INVALID_CONTACT, \
     INVALID_ROLE_ID, INVALID_CITY_ID, INVALID_GAME_ID, INVALID_TURF_OWNER_ID, INVALID_STRING_INPUT, INVALID_AMOUNT, \
     INVALID_FILE_TYPE, MINIMUM_MEDIA, INVALID_ADDRESS_ID, TURF_NAME_ALREADY_EXISTS, INVALID_USER, USER_NOT_FOUND, \
     INVALID_TURF_ID, INACTIVE_TURF, INVALID_DATE_TIME_FORMAT, INVALID_DATE, PAST_TIME_ERROR, \
     INVALID_END_TIME, INVALID_BOOKING_TIME, MAXIMUM_ADVANCE_DAYS_ERROR, INVALID_END_TIME_OVERNIGHT, INVALID_SLOT_TIME, \
     END_TIME_UPDATE_NOT_ALLOWED, BOOKING_NOT_FOUND, STATUS_CANCELLED, UPDATE_NOT_ALLOWED, NOT_ALLOWED_TO_UPDATE, \
-    INVALID_ADDRESS_SELECTION, INVALID_START_TIME
+    INVALID_ADDRESS_SELECTION, INVALID_START_TIME, EXCLUSION_VIOLATION, TURF_SLOT_ALREADY_BOOKED, ERROR_MESSAGE
+from core.reference_catalog import reference_catalog
 from models.address_model import Address
-from models.city_model import City
-from models.game_model import Game
-from models.roles_model import Roles
-from models.turf_booking import TurfBooking
+from models.turf_booking import TurfBooking, SLOT_EXCLUSION_CONSTRAINT
 from models.turf_model import Turf
 from models.user_model import User
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time
 
 
 def is_valid_string(string, min_length=1, max_length=255
@@ -32,13 +31,13 @@ def is_valid_string(string, min_length=1, max_length=255
         return False
     return True
 
-def validate_email(email: str, db=None, is_exception = False):
+async def validate_email(email: str, db=None, is_exception = False):
     """ This function validate email input"""
     if not re.fullmatch(r'^[\w.-]+@[\w.-]+\.\w{2,4}$', email):
         return False
     else:
         if is_exception:
-            user_data = db.query(User).filter(User.email == email).first()
+            user_data = (await db.execute(select(User).where(User.email == email))).scalars().first()
             if user_data:
                 raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE,
                                 detail=USER_ALREADY_EXISTS.format(email))
@@ -57,27 +56,27 @@ def validate_contact_no(contact_no: int):
         return False
     return True
 
-def validate_role_id(role_id: UUID, db):
+async def validate_role_id(role_id: UUID, db):
     """ This function validate role id."""
-    is_role =  db.query(Roles).filter(Roles.id == role_id).first()
+    is_role = await reference_catalog.lookup(db, "roles", role_id)
     if not is_role:
         return False
     return True
 
-def validate_city_id(city_id: int, db):
+async def validate_city_id(city_id: int, db):
     """ This function validate city id."""
-    is_city = db.query(City).filter(City.id == city_id).first()
+    is_city = await reference_catalog.lookup(db, "cities", city_id)
     if not is_city:
         return False
     return True
 
-def validate_input(values, db):
+async def validate_input(values, db):
     """ This function validate input data."""
     print("Sign Up Payload", values)
     if not is_valid_string(values.name):
         raise HTTPException(status_code=400, detail = INVALID_NAME)
 
-    if not validate_email(values.email, db, is_exception=True):
+    if not await validate_email(values.email, db, is_exception=True):
         raise HTTPException(status_code=400, detail = INVALID_EMAIL)
 
     if not validate_contact_no(values.contact_no):
@@ -86,33 +85,33 @@ def validate_input(values, db):
     if not validate_password(values.password):
         raise HTTPException(status_code=400, detail = INVALID_PASSWORD)
 
-    if not validate_role_id(values.role_id, db):
+    if not await validate_role_id(values.role_id, db):
         raise HTTPException(status_code=404, detail = INVALID_ROLE_ID)
 
-    if not validate_city_id(values.city_id, db):
+    if not await validate_city_id(values.city_id, db):
         raise HTTPException(status_code=404, detail = INVALID_CITY_ID)
 
     return True
 
-def validate_login_input(email: str, password: str):
+async def validate_login_input(email: str, password: str):
     """ This function validate login input data."""
-    if not validate_email(email):
+    if not await validate_email(email):
         raise HTTPException(status_code=400, detail=INVALID_EMAIL)
     if not validate_password(password):
         raise HTTPException(status_code=400, detail=INVALID_PASSWORD)
     return True
 
-def is_valid_game(db,game_id):
+async def is_valid_game(db,game_id):
     """ This method check if game_id is valid."""
-    game_data = db.query(Game).filter(Game.id == game_id).first()
+    game_data = await reference_catalog.lookup(db, "games", game_id)
 
     if not game_data:
         return False
     return game_data
 
-def is_valid_user(db, user_id, is_exception = True):
+async def is_valid_user(db, user_id, is_exception = True):
     """ This function check for turf owner id is valid or not. """
-    user_data = db.query(User).filter(User.id == user_id).first()
+    user_data = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
 
     if not user_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -124,6 +123,20 @@ def is_valid_user(db, user_id, is_exception = True):
     return user_data
 
 
+async def is_active_user(db, user_id):
+    """ This function check the user is active and verified from the cached principal. """
+    principal = await get_principal(db, user_id)
+
+    if not principal:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=USER_NOT_FOUND)
+
+    if not principal.is_active or not principal.is_verified:
+        raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED, detail = INVALID_USER)
+
+    return principal
+
+
 def is_valid_string_input(string):
     """ This function validate string input for not having any special characters."""
     regex = re.compile(r'[^a-zA-Z0-9\s\/\-,\.]')
@@ -160,9 +173,9 @@ def is_valid_media(medias):
 
     return True
 
-def is_valid_address_id(db, address_id, turf_owner_id):
+async def is_valid_address_id(db, address_id, turf_owner_id):
     """ This function check if address_id is valid."""
-    address_data = db.query(Address).filter(Address.id == address_id).first()
+    address_data = (await db.execute(select(Address).where(Address.id == address_id))).scalars().first()
 
     if not address_data:
         return False
@@ -172,30 +185,30 @@ def is_valid_address_id(db, address_id, turf_owner_id):
 
     return True
 
-def is_turf_name_exist(db, address_id, turf_name):
+async def is_turf_name_exist(db, address_id, turf_name):
     """ This function check if turf name exist on same address. """
-    is_exist = db.query(Turf).filter(
+    is_exist = (await db.execute(select(Turf).where(
         and_(
             func.lower(Turf.turf_name) == func.lower(turf_name),
             Turf.address_id == address_id
         )
-    ).first()
+    ))).scalars().first()
 
     if is_exist:
         return True
 
     return False
 
-def validate_turf_data(db, request_data, turf_owner_id):
+async def validate_turf_data(db, request_data, turf_owner_id):
     """ This function validate turf data."""
 
-    if not is_valid_game(db, request_data.game_id):
+    if not await is_valid_game(db, request_data.game_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=INVALID_GAME_ID)
 
     if not is_valid_string_input(request_data.turf_name):
         raise HTTPException(status_code=400, detail=INVALID_STRING_INPUT)
     else:
-        if is_turf_name_exist(db, request_data.address_id, request_data.turf_name):
+        if await is_turf_name_exist(db, request_data.address_id, request_data.turf_name):
             raise HTTPException(status_code=400, detail = TURF_NAME_ALREADY_EXISTS)
 
     if not is_valid_string_input(request_data.description):
@@ -213,13 +226,13 @@ def validate_turf_data(db, request_data, turf_owner_id):
     if not is_valid_amount(request_data.amount):
         raise HTTPException(status_code=400, detail=INVALID_AMOUNT)
 
-    if not is_valid_address_id(db,request_data.address_id, turf_owner_id):
+    if not await is_valid_address_id(db,request_data.address_id, turf_owner_id):
         raise HTTPException(status_code=404, detail=INVALID_ADDRESS_ID)
 
     return True
 
 
-def validate_address_data(db, request_data):
+async def validate_address_data(db, request_data):
     """ This function validate address data."""
 
     if not is_valid_string_input(request_data.street_address):
@@ -228,18 +241,18 @@ def validate_address_data(db, request_data):
     if not is_valid_string_input(request_data.area):
         raise HTTPException(status_code=400, detail=INVALID_STRING_INPUT)
 
-    if not validate_city_id(request_data.city_id, db):
+    if not await validate_city_id(request_data.city_id, db):
         raise HTTPException(status_code=404, detail=INVALID_CITY_ID)
 
     return True
 
-def verify_turf_name(db, address_id, turf_name):
+async def verify_turf_name(db, address_id, turf_name):
     """ This function verify the turf name."""
 
     if not is_valid_string_input(turf_name):
         raise HTTPException(status_code=400, detail=INVALID_STRING_INPUT)
     else:
-        if is_turf_name_exist(db, address_id, turf_name):
+        if await is_turf_name_exist(db, address_id, turf_name):
             raise HTTPException(status_code=400, detail=TURF_NAME_ALREADY_EXISTS)
 
     return True
@@ -265,18 +278,16 @@ def verify_turf_booking_price(booking_price):
         raise HTTPException(status_code=400, detail=INVALID_AMOUNT)
     return True
 
-def is_turf(db, turf_id):
+async def is_turf(db, turf_id):
     """ This function check whether the turf exist or not. if exist then return turf data."""
-    turf_data = db.query(Turf).filter(Turf.id ==  turf_id).first()
+    turf_data = (await db.execute(select(Turf).where(Turf.id == turf_id))).scalars().first()
 
     if not turf_data:
         return False
     return turf_data
 
-def is_valid_turf(db, turf_id):
-    """ This function check for the turf id is valid or not. """
-    turf_data = db.query(Turf).filter(Turf.id == turf_id).first()
-
+def validate_turf_state(turf_data):
+    """ This function check the turf exists and is active and verified. """
     if not turf_data:
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND,
                             detail = INVALID_TURF_ID)
@@ -286,6 +297,11 @@ def is_valid_turf(db, turf_id):
                                 detail = INACTIVE_TURF)
     return turf_data
 
+async def is_valid_turf(db, turf_id):
+    """ This function check for the turf id is valid or not. """
+    turf_data = (await db.execute(select(Turf).where(Turf.id == turf_id))).scalars().first()
+    return validate_turf_state(turf_data)
+
 
 def validate_reservation(reservation_date, start_time, end_time):
     """
@@ -402,12 +418,12 @@ def validate_extend_reservation(turf_booking_data, extend_booking_data):
 
     return True
 
-def is_turf_booking(db,booking_id, current_user):
+async def is_turf_booking(db,booking_id, current_user):
     """ This function validates the turf booking by turf booking id."""
-    turf_booking_data = (
-        db.query(TurfBooking)
-        .filter(TurfBooking.id == booking_id).
-        first())
+    turf_booking_data = (await db.execute(
+        select(TurfBooking)
+        .where(TurfBooking.id == booking_id))
+    ).scalars().first()
 
     if not turf_booking_data:
         raise HTTPException(status_code = 404, detail = BOOKING_NOT_FOUND)
@@ -421,3 +437,23 @@ def is_turf_booking(db,booking_id, current_user):
     return turf_booking_data
 
 
+def start_of_day(value):
+    """ This function convert date or datetime into midnight datetime to compare with timestamp columns."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return datetime.combine(value, time.min)
+
+
+def is_slot_conflict(integrity_error):
+    """ This function checks whether the integrity error is raised by overlapping bookings of a turf."""
+    return (getattr(integrity_error.orig, "sqlstate", None) == EXCLUSION_VIOLATION
+            and SLOT_EXCLUSION_CONSTRAINT in str(integrity_error.orig))
+
+
+async def raise_booking_integrity_error(db, integrity_error):
+    """ This function rolls back the booking which violated an integrity constraint, and raises slot already
+        booked when overlapping bookings of the turf were rejected by the database, an error otherwise."""
+    await db.rollback()
+    if is_slot_conflict(integrity_error):
+        raise HTTPException(status_code=400, detail=TURF_SLOT_ALREADY_BOOKED)
+    raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(integrity_error)))
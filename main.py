@@ -1,17 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from core.database import engine
+from authentication.revocation_cache import revocation_cache, purge_expired_revocations_periodically
+from core.database import engine, app_db_session
+from core.reference_catalog import reference_catalog
 from core.seed_data import seed_data
 from models import (
     blacklist_token_model, state_model, city_model, address_model, roles_model, user_model, game_model, discount_model,
     admin_revenue_model, turf_model, media_model, manage_turf_manager_model, turf_booking,
-    revenue_model, feedback_model)
+    turf_slot_occupancy_model, turf_pricing_rule_model, revenue_model, feedback_model)
 from core.constant import MESSAGE, WELCOME_MSG
 from routers import users, admin, turf_owner, token, customer, turf_manager
 from fastapi.staticfiles import StaticFiles
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """ Load the reference data and the revoked tokens, and run the background jobs for the lifetime
+        of the application."""
+    db_session = app_db_session(app)
+    async with db_session() as db:
+        await reference_catalog.load(db)
+        await revocation_cache.sync(db)
+    purge_task = asyncio.create_task(purge_expired_revocations_periodically(db_session))
+    yield
+    purge_task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.add_middleware(
@@ -25,7 +43,7 @@ app.add_middleware(
 models = [
     blacklist_token_model, state_model, city_model, address_model, roles_model, user_model, game_model, discount_model,
     admin_revenue_model, turf_model, media_model, manage_turf_manager_model, turf_booking,
-    revenue_model, feedback_model
+    turf_slot_occupancy_model, turf_pricing_rule_model, revenue_model, feedback_model
 ]
 
 # Create all tables using a loop
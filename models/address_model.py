@@ -1,15 +1,19 @@
 from uuid import uuid4
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Float, Index, cast
 from sqlalchemy.orm import relationship
 from core.database import Base
 from sqlalchemy.dialects.postgresql import UUID
-from geoalchemy2 import Geometry
+from geoalchemy2 import Geometry, Geography
 
 from models.base_declarative_model import BaseDeclarativeModel
 
 
 class Address(Base, BaseDeclarativeModel):
     __tablename__ = "address"
+    __table_args__ = (
+        # GiST index serves the radius lookups of the nearby turf search
+        Index("idx_address_geom", "geom", postgresql_using="gist"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     street_address = Column(String, nullable=False)
     area = Column(String, nullable=False)
@@ -19,9 +23,16 @@ class Address(Base, BaseDeclarativeModel):
 
     lat = Column(Float, nullable=False)
     long = Column(Float, nullable=False)
-    geom = Column(Geometry("POINT", srid=4326), nullable=False)
+    geom = Column(Geometry("POINT", srid=4326, spatial_index=False), nullable=False)
 
     # relationship
     turf = relationship("Turf", back_populates = "addresses")
     city = relationship("City", back_populates = "addresses")
-    users = relationship("User", back_populates = "addresses")
\ No newline at end of file
+    users = relationship("User", back_populates = "addresses")
+
+
+GEOGRAPHY = Geography(geometry_type=None)
+
+# <-> of the geometry points is a planar distance in degrees, which stretches the east-west distances
+# away from the equator, so the nearby turfs are ordered by the KNN of their geography on the sphere
+Index("idx_address_geography", cast(Address.geom, GEOGRAPHY), postgresql_using="gist")
@@ -1,13 +1,34 @@
 from uuid import uuid4
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, ARRAY
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, ARRAY, Index, DDL, event, func, column, literal
 from sqlalchemy.orm import relationship
+from core.constant import STATUS_CANCELLED
 from core.database import Base
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 
 from models.base_declarative_model import BaseDeclarativeModel
 
+SLOT_EXCLUSION_CONSTRAINT = "excl_turf_booking_slot"
+
 class TurfBooking(Base, BaseDeclarativeModel):
     __tablename__ = 'turf_booking'
+    __table_args__ = (
+        # the database rejects overlapping bookings of a turf, even when concurrent requests pass the conflict check
+        ExcludeConstraint(
+            ("turf_id", "="),
+            (func.tsrange(column("start_time"), column("end_time")), "&&"),
+            name=SLOT_EXCLUSION_CONSTRAINT,
+            using="gist",
+            where=column("booking_status") != STATUS_CANCELLED
+        ),
+        # slot overlap checks only look at the bookings which are not cancelled
+        Index("ix_turf_booking_active_slot", "turf_id", "reservation_date", "start_time", "end_time",
+              postgresql_where=column("booking_status") != STATUS_CANCELLED),
+        # date range listings of a turf, which show the cancelled bookings as well
+        Index("ix_turf_booking_turf_date", "turf_id", "reservation_date"),
+        # keyset pagination of the booking lists seeks on (created_at, id) per customer and per turf
+        Index("ix_turf_booking_customer_created", "customer_id", "created_at", "id"),
+        Index("ix_turf_booking_turf_created", "turf_id", "created_at", "id"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     reservation_date = Column(DateTime, nullable=False)
     start_time = Column(DateTime, nullable=False)
@@ -30,3 +51,10 @@ class TurfBooking(Base, BaseDeclarativeModel):
 
     revenue = relationship('Revenue', back_populates='turf_booking')
     feedback = relationship('Feedback', back_populates='turf_booking')
+
+
+# cancelled bookings release their slot, the status is rendered inline so that the planner matches the partial index
+ACTIVE_BOOKING = TurfBooking.booking_status != literal(STATUS_CANCELLED, literal_execute=True)
+
+# gist operator class for the equality on turf_id in the exclusion constraint
+event.listen(TurfBooking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
@@ -19,6 +19,8 @@ class Turf(Base, BaseDeclarativeModel):
     booking_price = Column(Integer, nullable=False)
     is_active = Column(Boolean, nullable=False)
     is_verified = Column(Boolean, nullable=False)
+    # bumped with every change of the pricing rules of the turf, the version of its cached price table
+    pricing_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     turf_owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     game_id = Column(UUID(as_uuid=True), ForeignKey("game.id"))
@@ -0,0 +1,23 @@
+from uuid import uuid4
+from sqlalchemy import Column, ForeignKey, Boolean, SmallInteger, Index
+from core.database import Base
+from sqlalchemy.dialects.postgresql import UUID
+
+from models.base_declarative_model import BaseDeclarativeModel
+
+
+class TurfPricingRule(Base, BaseDeclarativeModel):
+    """ Price of a weekly band of half-hour slots of a turf, as a percentage of its booking price.
+        Bit n of weekdays stands for the weekday n, monday is 0, and the band covers the slots
+        from start_slot up to end_slot, slot n starting at n * 30 minutes."""
+    __tablename__ = 'turf_pricing_rule'
+    __table_args__ = (
+        Index("ix_turf_pricing_rule_turf", "turf_id"),
+    )
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    turf_id = Column(UUID(as_uuid=True), ForeignKey("turf.id", ondelete="CASCADE"), nullable=False)
+    weekdays = Column(SmallInteger, nullable=False)
+    start_slot = Column(SmallInteger, nullable=False)
+    end_slot = Column(SmallInteger, nullable=False)
+    price_percent = Column(SmallInteger, nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True)
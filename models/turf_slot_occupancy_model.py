@@ -0,0 +1,87 @@
+from sqlalchemy import Column, ForeignKey, Date, BigInteger, DDL, event
+from core.constant import STATUS_CANCELLED
+from core.database import Base
+from sqlalchemy.dialects.postgresql import UUID
+
+from models.turf_booking import TurfBooking
+
+class TurfSlotOccupancy(Base):
+    """ Occupied half-hour slots of a turf on one day, bit n of occupied stands for the slot starting at n * 30 minutes.
+        The rows are maintained by a trigger on turf_booking in the same transaction as the booking change."""
+    __tablename__ = 'turf_slot_occupancy'
+    turf_id = Column(UUID(as_uuid=True), ForeignKey('turf.id', ondelete="CASCADE"), primary_key=True)
+    slot_date = Column(Date, primary_key=True)
+    occupied = Column(BigInteger, nullable=False, default=0)
+
+
+# the trigger and the backfill read turf_booking, so it has to be created first
+TurfSlotOccupancy.__table__.add_is_dependent_on(TurfBooking.__table__)
+
+# active bookings of a turf never overlap because of the exclusion constraint, so a booking owns its bits
+# and they can be set and cleared incrementally, without recomputing the day from all of its bookings
+MARK_TURF_SLOTS_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION mark_turf_slots(p_turf_id uuid, p_start timestamp, p_end timestamp, p_occupied boolean)
+RETURNS void AS $$
+DECLARE
+    slot_day date;
+    slot_mask bigint;
+BEGIN
+    FOR slot_day, slot_mask IN
+        SELECT slot::date, bit_or(1::bigint << (extract(hour FROM slot) * 2 + floor(extract(minute FROM slot) / 30))::int)
+        FROM generate_series(p_start, p_end - interval '30 minutes', interval '30 minutes') AS slot
+        GROUP BY slot::date
+    LOOP
+        IF p_occupied THEN
+            INSERT INTO turf_slot_occupancy (turf_id, slot_date, occupied)
+            VALUES (p_turf_id, slot_day, slot_mask)
+            ON CONFLICT (turf_id, slot_date)
+            DO UPDATE SET occupied = turf_slot_occupancy.occupied | EXCLUDED.occupied;
+        ELSE
+            UPDATE turf_slot_occupancy SET occupied = occupied & ~slot_mask
+            WHERE turf_id = p_turf_id AND slot_date = slot_day;
+        END IF;
+    END LOOP;
+END
+$$ LANGUAGE plpgsql
+""")
+
+SYNC_TURF_SLOTS_FUNCTION = DDL(f"""
+CREATE OR REPLACE FUNCTION sync_turf_slot_occupancy()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF OLD.turf_id IS NOT NULL AND OLD.booking_status != '{STATUS_CANCELLED}' THEN
+            PERFORM mark_turf_slots(OLD.turf_id, OLD.start_time, OLD.end_time, false);
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF NEW.turf_id IS NOT NULL AND NEW.booking_status != '{STATUS_CANCELLED}' THEN
+            PERFORM mark_turf_slots(NEW.turf_id, NEW.start_time, NEW.end_time, true);
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+
+DROP_TURF_SLOTS_TRIGGER = DDL("DROP TRIGGER IF EXISTS turf_booking_slot_occupancy ON turf_booking")
+
+CREATE_TURF_SLOTS_TRIGGER = DDL("""
+CREATE TRIGGER turf_booking_slot_occupancy
+AFTER INSERT OR DELETE OR UPDATE OF turf_id, start_time, end_time, booking_status ON turf_booking
+FOR EACH ROW EXECUTE FUNCTION sync_turf_slot_occupancy()
+""")
+
+# fill the table from the bookings which exist already when it is created
+BACKFILL_TURF_SLOTS = DDL(f"""
+INSERT INTO turf_slot_occupancy (turf_id, slot_date, occupied)
+SELECT turf_id, slot::date, bit_or(1::bigint << (extract(hour FROM slot) * 2 + floor(extract(minute FROM slot) / 30))::int)
+FROM turf_booking
+CROSS JOIN LATERAL generate_series(start_time, end_time - interval '30 minutes', interval '30 minutes') AS slot
+WHERE turf_id IS NOT NULL AND booking_status != '{STATUS_CANCELLED}'
+GROUP BY turf_id, slot::date
+""")
+
+for ddl in (MARK_TURF_SLOTS_FUNCTION, SYNC_TURF_SLOTS_FUNCTION, DROP_TURF_SLOTS_TRIGGER,
+            CREATE_TURF_SLOTS_TRIGGER, BACKFILL_TURF_SLOTS):
+    event.listen(TurfSlotOccupancy.__table__, "after_create", ddl)
@@ -1,6 +1,6 @@
 from uuid import uuid4
 from geoalchemy2 import Geometry
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, BigInteger, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, BigInteger, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from core.database import Base
@@ -8,6 +8,9 @@ from models.base_declarative_model import BaseDeclarativeModel
 
 class User(Base, BaseDeclarativeModel):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("idx_users_geom", "geom", postgresql_using="gist"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String, nullable=False)
     contact_no = Column(BigInteger, nullable=False)
@@ -18,7 +21,7 @@ class User(Base, BaseDeclarativeModel):
 
     lat = Column(Float, nullable=False)
     long = Column(Float, nullable=False)
-    geom = Column(Geometry("POINT", srid=4326), nullable=False)
+    geom = Column(Geometry("POINT", srid=4326, spatial_index=False), nullable=False)
 
     role_id = Column(UUID(as_uuid=True), ForeignKey("roles.id"))
     city_id = Column(Integer, ForeignKey("city.id"))
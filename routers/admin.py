@@ -4,13 +4,14 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from authentication.oauth2 import get_current_user, oauth2_scheme
 from authentication.role_checker import pre_authorize
 from core.constant import ADMIN_ROLE
 from core.database import get_db
-from schemas.admin_schemas import GameSchema, UpdateGameSchema, IdInputSchema, RevenueResponse, ShowTurfBooking
+from schemas.admin_schemas import GameSchema, UpdateGameSchema, IdInputSchema, RevenueResponse, ShowTurfBooking, \
+    PoolStatusSchema
 from schemas.user_schemas import TokenData
 from services.admin_service import AdminService
 
@@ -22,7 +23,7 @@ router = APIRouter(
 @router.post("/add-game")
 @pre_authorize(authorized_roles=[ADMIN_ROLE])
 async def add_game(request_data: GameSchema,
-             db: Session = Depends(get_db),
+             db: AsyncSession = Depends(get_db),
              current_user: TokenData = Depends(get_current_user)):
     """ API end point to add game."""
 
@@ -34,7 +35,7 @@ async def add_game(request_data: GameSchema,
 async def update_games(
                 game_id: UUID,
                 request_data: UpdateGameSchema,
-                db: Session = Depends(get_db),
+                db: AsyncSession = Depends(get_db),
                 current_user: TokenData = Depends(get_current_user)):
     """API end point to update game."""
 
@@ -44,7 +45,7 @@ async def update_games(
 
 @router.get("/get-games", response_model=List[GameSchema])
 @pre_authorize(authorized_roles=[ADMIN_ROLE])
-async def get_games(db: Session = Depends(get_db),
+async def get_games(db: AsyncSession = Depends(get_db),
               current_user: TokenData = Depends(get_current_user)):
     """ API end point to get all games."""
 
@@ -55,7 +56,7 @@ async def get_games(db: Session = Depends(get_db),
 @pre_authorize(authorized_roles=[ADMIN_ROLE])
 async def approve_turf_owner(
             request_data: IdInputSchema,
-            db: Session = Depends(get_db),
+            db: AsyncSession = Depends(get_db),
             current_user: TokenData = Depends(get_current_user)):
     """ API end point to approve turf owner."""
 
@@ -66,7 +67,7 @@ async def approve_turf_owner(
 @pre_authorize(authorized_roles=[ADMIN_ROLE])
 async def approve_turf_owner(
             request_data: IdInputSchema,
-            db: Session = Depends(get_db),
+            db: AsyncSession = Depends(get_db),
             current_user: TokenData = Depends(get_current_user)):
     """ API end point to approve turf owner."""
 
@@ -78,7 +79,7 @@ async def approve_turf_owner(
 @pre_authorize(authorized_roles=[ADMIN_ROLE])
 async def approve_turf(
             request_data: IdInputSchema,
-            db: Session = Depends(get_db),
+            db: AsyncSession = Depends(get_db),
             current_user: TokenData = Depends(get_current_user)):
     """ API endpoint for approving the turf. """
     admin_service = AdminService(db)
@@ -89,7 +90,7 @@ async def approve_turf(
 @pre_authorize(authorized_roles=[ADMIN_ROLE])
 async def deactivate_turf(
             request_data: IdInputSchema,
-            db: Session = Depends(get_db),
+            db: AsyncSession = Depends(get_db),
             current_user: TokenData = Depends(get_current_user)):
     """ API endpoint for approving the turf. """
     admin_service = AdminService(db)
@@ -101,7 +102,7 @@ async def get_revenue_data(
             turf_owner_id : UUID,
             start_date: Optional[date],
             end_date: Optional[date],
-            db: Session = Depends(get_db),
+            db: AsyncSession = Depends(get_db),
             current_user: TokenData = Depends(get_current_user)
 ):
     """ API endpoint for approving the turf. """
@@ -114,11 +115,22 @@ async def get_booking_data(
             turf_id : UUID,
             start_date: Optional[date],
             end_date: Optional[date],
-            db: Session = Depends(get_db),
+            db: AsyncSession = Depends(get_db),
             current_user: TokenData = Depends(get_current_user),
             page: int = 1,
-            size: int = 5
+            size: int = 5,
+            cursor: Optional[str] = None
 
 ):
     admin_service = AdminService(db)
-    return await admin_service.get_booking_data(turf_id, current_user, start_date, end_date, page, size)
+    return await admin_service.get_booking_data(turf_id, current_user, start_date, end_date, page, size, cursor)
+
+@router.get("/pool-stats", response_model = PoolStatusSchema)
+@pre_authorize(authorized_roles=[ADMIN_ROLE])
+async def get_pool_stats(
+            db: AsyncSession = Depends(get_db),
+            current_user: TokenData = Depends(get_current_user)
+):
+    """ API endpoint to get database connection pool statistics. """
+    admin_service = AdminService(db)
+    return await admin_service.get_pool_status()
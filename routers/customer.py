@@ -1,17 +1,17 @@
 from datetime import date, datetime
-from typing import List
+from typing import List, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from authentication.oauth2 import get_current_user
 from authentication.role_checker import pre_authorize
-from core.constant import CUSTOMER_ROLE
+from core.constant import CUSTOMER_ROLE, SEARCH_MODE_COUNT, SEARCH_MODE_HAS_MORE
 from core.database import get_db
 from schemas.admin_schemas import IdInputSchema
 from schemas.customer_schemas import AvailableTurf, BookTurfSchema, UpdateBookingSchema, ShowBookingSchema, \
-    ExtendBooking, FeedbackSchema
+    ExtendBooking, FeedbackSchema, TurfAvailabilitySchema, TurfQuoteRequestSchema, TurfQuoteSchema
 from schemas.user_schemas import TokenData
 from services.customer_service import CustomerService
 
@@ -27,19 +27,44 @@ async def show_turf_data(
         booking_date : date,
         start_time : datetime,
         end_time : datetime,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user),
         page: int = 1,
-        size: int = 5
+        size: int = 5,
+        radius_km: float | None = None,
+        search_mode: Literal[SEARCH_MODE_COUNT, SEARCH_MODE_HAS_MORE] = SEARCH_MODE_COUNT,
+        window_minutes: int | None = None
 ):
     customer_service = CustomerService(db)
     return await customer_service.show_available_turfs(game_id,booking_date,
-                                                 start_time,end_time,current_user,page, size)
+                                                 start_time,end_time,current_user,page, size, radius_km,
+                                                 search_mode, window_minutes)
+
+@router.get("/turf-availability/{turf_id}", response_model=TurfAvailabilitySchema)
+async def show_turf_availability(
+        turf_id: UUID,
+        db: AsyncSession = Depends(get_db),
+        current_user: TokenData = Depends(get_current_user),
+        start_date: date | None = None,
+        days: int = 7,
+        if_none_match: str | None = Header(default=None)
+):
+    customer_service = CustomerService(db)
+    return await customer_service.show_turf_availability(turf_id, start_date, days, if_none_match)
+
+@router.post("/turf-quote", response_model=TurfQuoteSchema)
+async def quote_turf(
+        quote_data: TurfQuoteRequestSchema,
+        db: AsyncSession = Depends(get_db),
+        current_user: TokenData = Depends(get_current_user)
+):
+    customer_service = CustomerService(db)
+    return await customer_service.quote_turf_slots(quote_data)
 
 @router.post("/book-turf")
 async def reserve_turf(
         booking_data: BookTurfSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     customer_service = CustomerService(db)
@@ -47,7 +72,7 @@ async def reserve_turf(
 @router.put("/update-turf-booking")
 async def update_booking(
         update_booking_data: UpdateBookingSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     customer_service = CustomerService(db)
@@ -55,19 +80,20 @@ async def update_booking(
 
 @router.get("/show-turf-booking", response_model = ShowBookingSchema)
 async def show_booking(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user),
         page: int = 1,
-        size: int = 5
+        size: int = 5,
+        cursor: str | None = None
 
 ):
     customer_service = CustomerService(db)
-    return await customer_service.show_turf_booking_history(current_user, page, size)
+    return await customer_service.show_turf_booking_history(current_user, page, size, cursor)
 
 @router.post("/extend-bookings")
 async def extend_booking(
         extend_booking_data: ExtendBooking,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     customer_service = CustomerService(db)
@@ -76,7 +102,7 @@ async def extend_booking(
 @router.post("/cancel-bookings")
 async def cancel_booking(
         turf_booking_data: IdInputSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     customer_service = CustomerService(db)
@@ -86,7 +112,7 @@ async def cancel_booking(
 @pre_authorize(authorized_roles=[CUSTOMER_ROLE])
 async def add_feedback(
         feedback_data: FeedbackSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     customer_service = CustomerService(db)
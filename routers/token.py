@@ -1,7 +1,7 @@
 from datetime import timedelta
 
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from starlette.responses import JSONResponse
 
@@ -19,7 +19,7 @@ router = APIRouter(
 @router.post("/verify-access-token")
 async def verify_token(
         token_data : TokenSchema,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """ API endpoint for verifying access"""
     credentials_exception = HTTPException(
@@ -27,7 +27,7 @@ async def verify_token(
         detail = INVALID_ACCESS_TOKEN,
         headers = {"WWW-Authenticate": "Bearer"},
     )
-    if verify_access_token(db, token_data.token, credentials_exception):
+    if await verify_access_token(db, token_data.token, credentials_exception):
         return JSONResponse({
             DETAILS: VALID_ACCESS_TOKEN
         })
@@ -38,7 +38,7 @@ async def verify_token(
 @router.post("/create-access-token")
 async def create_token(
     refresh_token_data : TokenSchema,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """ API for creating a new access token."""
     credentials_exception = HTTPException(
@@ -47,7 +47,7 @@ async def create_token(
         headers = {"WWW-Authenticate": "Bearer"},
     )
 
-    token_data = verify_access_token(
+    token_data = await verify_access_token(
                                     db,refresh_token_data.token,
                                      credentials_exception,
                                      check_refresh = True
@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from authentication.oauth2 import get_current_user
 from authentication.role_checker import pre_authorize
@@ -20,21 +20,22 @@ router = APIRouter(
 @router.get("/get-turf-bookings", response_model = ShowTurfBooking)
 @pre_authorize(authorized_roles=[MANAGER_ROLE])
 async def get_booking_data(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user),
         start_date: datetime = datetime.now().date(),
         end_date: datetime =datetime.now().date(),
         page: int = 1,
-        size: int = 5
+        size: int = 5,
+        cursor: str | None = None
 ):
     manager_service = ManagerService(db)
-    return await manager_service.get_booking_data(current_user, start_date, end_date, page, size)
+    return await manager_service.get_booking_data(current_user, start_date, end_date, page, size, cursor)
 
 @router.post("/take-booking-payment")
 @pre_authorize(authorized_roles=[MANAGER_ROLE])
 async def take_booking(
         booking_data : IdInputSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     manager_service = ManagerService(db)
@@ -44,7 +45,7 @@ async def take_booking(
 @pre_authorize(authorized_roles=[MANAGER_ROLE])
 async def cancel_booking(
         cancel_booking_data : CancelBooking,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     manager_service = ManagerService(db)
@@ -3,7 +3,7 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Form, File, UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from authentication.oauth2 import get_current_user
 from authentication.role_checker import pre_authorize
@@ -11,7 +11,8 @@ from core.constant import OWNER_ROLE
 from core.database import get_db
 from schemas.admin_schemas import IdInputSchema
 from schemas.turf_owner_schema import TurfSchema, TurfAddressSchema, UpdateTurfDetailsSchema, TurfResponseSchema, \
-    TurfDiscountSchema, TurfManagerSchema, FeedbackResponseSchema, AddressSchema, ShowTurfBooking
+    TurfDiscountSchema, TurfManagerSchema, FeedbackResponseSchema, AddressSchema, ShowTurfBooking, \
+    TurfPricingRuleSchema
 from schemas.user_schemas import TokenData
 from services.turf_owner_services import TurfOwnerService
 
@@ -25,7 +26,7 @@ router = APIRouter(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def add_turf_address(
         address_data: TurfAddressSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -44,7 +45,7 @@ async def add_turf(
         revenue_mode: str = Form(...),
         amount: int = Form(...),
         address_id: UUID = Form(...),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_data = TurfSchema(
@@ -67,7 +68,7 @@ async def add_turf(
 async def update_turf(
         turf_id: UUID,
         update_turf_data: UpdateTurfDetailsSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -78,7 +79,7 @@ async def update_turf(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def deactivate_turf(
         data: IdInputSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -89,7 +90,7 @@ async def deactivate_turf(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def get_turf_details(
         turf_id: UUID,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -100,7 +101,7 @@ async def get_turf_details(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def add_discount(
         request_data: TurfDiscountSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -111,18 +112,40 @@ async def add_discount(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def discard_discount(
         request_data: IdInputSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
     return await turf_service.deactivate_turf_discount(request_data, current_user)
 
 
+@router.post("/add-pricing-rule")
+@pre_authorize(authorized_roles=[OWNER_ROLE])
+async def add_pricing_rule(
+        request_data: TurfPricingRuleSchema,
+        db: AsyncSession = Depends(get_db),
+        current_user: TokenData = Depends(get_current_user)
+):
+    turf_service = TurfOwnerService(db)
+    return await turf_service.add_turf_pricing_rule(request_data, current_user)
+
+
+@router.post("/deactivate-pricing-rule")
+@pre_authorize(authorized_roles=[OWNER_ROLE])
+async def discard_pricing_rule(
+        request_data: IdInputSchema,
+        db: AsyncSession = Depends(get_db),
+        current_user: TokenData = Depends(get_current_user)
+):
+    turf_service = TurfOwnerService(db)
+    return await turf_service.deactivate_turf_pricing_rule(request_data, current_user)
+
+
 @router.post("/add-turf-manager")
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def add_turf_manager(
         request_data: TurfManagerSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -133,7 +156,7 @@ async def add_turf_manager(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def activate_turf_manager(
         request_data: IdInputSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -144,7 +167,7 @@ async def activate_turf_manager(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def deactivate_turf_manager(
         request_data: IdInputSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -155,7 +178,7 @@ async def deactivate_turf_manager(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def get_feedback(
         turf_id: UUID,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -165,7 +188,7 @@ async def get_feedback(
 @router.get("/get-all-address", response_model=List[AddressSchema])
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def get_all_address(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -175,7 +198,7 @@ async def get_all_address(
 @router.get("/get-all-turfs", response_model=List[TurfResponseSchema])
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def get_all_turf(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)
 ):
     turf_service = TurfOwnerService(db)
@@ -186,12 +209,13 @@ async def get_all_turf(
 @pre_authorize(authorized_roles=[OWNER_ROLE])
 async def get_booking_data(
         turf_id: UUID,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user),
         start_date: datetime = datetime.now().date(),
         end_date: datetime = datetime.now().date(),
         page: int = 1,
-        size: int = 5
+        size: int = 5,
+        cursor: str | None = None
 ):
     turf_service = TurfOwnerService(db)
-    return await turf_service.get_bookings(turf_id, current_user, start_date, end_date, page, size)
\ No newline at end of file
+    return await turf_service.get_bookings(turf_id, current_user, start_date, end_date, page, size, cursor)
\ No newline at end of file
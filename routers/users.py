@@ -1,16 +1,15 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 from authentication.oauth2 import get_current_user, oauth2_scheme
+from core.config import settings
 from core.constant import SOCIAL_AUTH_REDIRECT_URL, PROMPT, CONSENT, ACCESS_TYPE, OFFLINE
 from core.database import get_db
 from schemas.user_schemas import UserSchema, TokenData, ResetPassword, ForgotPassword, UserMail, LoginSchema, \
     LogoutSchema, UserResponse, UpdateUserSchema
 from services.user_service import UserService
 from fastapi_sso.sso.google import GoogleSSO
-from  dotenv import load_dotenv
-import os
 
 router = APIRouter(
     tags = ["users"],
@@ -19,7 +18,7 @@ router = APIRouter(
 
 
 @router.post("/sign-up")
-async def create_user(request_data: UserSchema, db: Session = Depends(get_db)):
+async def create_user(request_data: UserSchema, db: AsyncSession = Depends(get_db)):
     """API end point to handle user sign-up."""
     user_service = UserService(db, None)
     return await user_service.add_user(request_data)
@@ -29,7 +28,7 @@ async def create_user(request_data: UserSchema, db: Session = Depends(get_db)):
 async def login_user(
         background_tasks: BackgroundTasks,
         login_data: LoginSchema,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """API end point to handle user login."""
     user_service = UserService(db, background_tasks)
@@ -41,7 +40,7 @@ async def reset_password(
         token: Annotated[str, Depends(oauth2_scheme)],
         request_data: ResetPassword,
         current_user: TokenData = Depends(get_current_user),
-        db: Session = Depends(get_db)):
+        db: AsyncSession = Depends(get_db)):
     """API end point to handle user password reset."""
     user_service = UserService(db, None)
     return await user_service.reset_user_password(token, request_data, current_user.email)
@@ -51,14 +50,14 @@ async def reset_password(
 async def forgot_password(
         request_data: UserMail,
         background_tasks: BackgroundTasks,
-        db: Session = Depends(get_db)):
+        db: AsyncSession = Depends(get_db)):
     """ API end point to handle forgot password functionality."""
     user_service = UserService(db, background_tasks)
     return await user_service.forgot_user_password(request_data)
 
 
 @router.post("/reset-forgot-password")
-async def reset_forgot_password(request_data: ForgotPassword, token, db: Session = Depends(get_db)):
+async def reset_forgot_password(request_data: ForgotPassword, token, db: AsyncSession = Depends(get_db)):
     """API end point to handle reset password after forgot password."""
     user_service = UserService(db, None)
     return await user_service.reset_forgot_user_password(request_data, token)
@@ -67,16 +66,15 @@ async def reset_forgot_password(request_data: ForgotPassword, token, db: Session
 @router.post("/logout")
 async def logout_user(
         tokens: LogoutSchema,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: TokenData = Depends(get_current_user)):
     """API end point to handle user logout."""
 
     user_service = UserService(db, None)
     return await user_service.logout_current_user(tokens)
 
-load_dotenv()
-GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
-GOOGLE_CLIENT_SECRET = os.environ.get("GOOGLE_CLIENT_SECRET")
+GOOGLE_CLIENT_ID = settings.google_client_id
+GOOGLE_CLIENT_SECRET = settings.google_client_secret
 
 google_sso = GoogleSSO(
     GOOGLE_CLIENT_ID,
@@ -94,7 +92,7 @@ async def google_login():
 async def google_callback(
         request: Request,
         background_tasks: BackgroundTasks,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """ API end point to handle Google SSO callback."""
     try:
@@ -108,7 +106,7 @@ async def google_callback(
 async def update_profile(
         update_data: UpdateUserSchema,
         current_user: TokenData = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """ API endpoint for updating a profile."""
     user_service = UserService(db, None)
@@ -117,7 +115,7 @@ async def update_profile(
 @router.get("/profile", response_model = UserResponse)
 async def show_profile(
         current_user: TokenData = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     user_service = UserService(db, None)
-    return await user_service.get_user(current_user.email)
+    return await user_service.get_user_profile(current_user.email)
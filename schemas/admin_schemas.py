@@ -52,5 +52,18 @@ class ShowTurfBooking(BaseModel):
     bookings : List[Booking]
     next_page: Optional[str] = None
     previous_page: Optional[str] = None
-
-
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+
+class PoolStatusSchema(BaseModel):
+    workers: int
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    waits: int
+    wait_time: float
+    timeout: float
+    recycle: int
+    pre_ping: bool
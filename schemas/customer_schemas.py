@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, date
 from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel, Field
@@ -11,6 +11,10 @@ class DiscountSchema(BaseModel):
     class Config:
         from_attributes = True
 
+class TimeWindowSchema(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
 class TurfResponse(BaseModel):
     turf_name : str
     description: str
@@ -21,6 +25,7 @@ class TurfResponse(BaseModel):
     addresses : AddressSchema
     discounts: List[DiscountSchema]
     distance_turf: float = Field(default=0.0)
+    free_windows: Optional[List[TimeWindowSchema]] = None
 
     class Config:
         from_attributes = True
@@ -28,12 +33,34 @@ class TurfResponse(BaseModel):
 
 class AvailableTurf(BaseModel):
     turf_data: List[TurfResponse] = Field(default_factory=list)
+    total_count: Optional[int] = None
     next_page: Optional[str] = None
     previous_page: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class DaySlotsSchema(BaseModel):
+    slot_date: date
+    slots: List[bool]
+    slot_prices: List[float]
+
+class TurfAvailabilitySchema(BaseModel):
+    turf_id: UUID
+    slot_minutes: int
+    days: List[DaySlotsSchema]
+
+class TurfQuoteRequestSchema(BaseModel):
+    turf_id: UUID
+    slots: List[TimeWindowSchema]
+
+class SlotQuoteSchema(TimeWindowSchema):
+    amount: int
+
+class TurfQuoteSchema(BaseModel):
+    turf_id: UUID
+    quotes: List[SlotQuoteSchema]
+
 class BookTurfSchema(BaseModel):
     turf_id: UUID
     reservation_date: datetime
@@ -68,6 +95,8 @@ class ShowBookingSchema(BaseModel):
     bookings : List[BookingSchema]
     next_page: Optional[str] = None
     previous_page: Optional[str] = None
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
 
 class ExtendBooking(BaseModel):
     booking_id: UUID
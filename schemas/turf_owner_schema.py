@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, time
 from typing import List, Optional
 from uuid import UUID
 from fastapi import UploadFile, File, Form
@@ -91,6 +91,13 @@ class TurfDiscountSchema(BaseModel):
     class Config:
         from_attributes = True
 
+class TurfPricingRuleSchema(BaseModel):
+    turf_id: UUID
+    weekdays: List[int]
+    start_time: time
+    end_time: time
+    price_percent: int
+
 class TurfResponseSchema(BaseModel):
     turf_name: str
     description: str
@@ -137,6 +144,8 @@ class ShowTurfBooking(BaseModel):
     bookings: List[Booking]
     next_page: Optional[str] = None
     previous_page: Optional[str] = None
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
 
 
 class CancelBooking(BaseModel):
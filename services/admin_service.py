@@ -1,23 +1,28 @@
-import os
 from datetime import datetime
 
-from dotenv import load_dotenv
 from fastapi import HTTPException
 from sqlalchemy import func, select, and_
+from sqlalchemy.orm import selectinload
 from starlette import status
 from starlette.responses import JSONResponse
 
-from core.constant import (DETAILS, NOT_ALLOWED, GAME_ADDED_SUCCESS, GAME_NAME_UPDATED,
+from authentication.principal_cache import principal_cache
+from core.constant import (BASE_URL, DETAILS, NOT_ALLOWED, GAME_ADDED_SUCCESS, GAME_NAME_UPDATED,
                            ERROR_MESSAGE, GAME_ALREADY_EXISTS, INVALID_TURF_OWNER_ID,
                            INVALID_GAME_ID, INVALID_TURF_ID,
                            TURF_ACTIVATION_UPDATED, TURF_OWNER_ACTIVATION_UPDATED, ADMIN_ROLE, NO_TURF_FOUND, BOOKINGS,
-                           NEXT_PAGE, PREV_PAGE, NO_DATA_FOUND, ID)
-from core.validations import is_valid_game, is_valid_user, is_turf
+                           NEXT_PAGE, PREV_PAGE, NO_DATA_FOUND, ID, NEXT_CURSOR, PREV_CURSOR)
+from core.database import get_pool_status
+from core.booking_queries import turf_bookings
+from core.pagination import paginate
+from core.reference_catalog import reference_catalog
+from core.validations import is_valid_user, is_active_user, is_turf, start_of_day
 from models.game_model import Game
 from models.revenue_model import Revenue
 from models.turf_booking import TurfBooking
 from models.turf_model import Turf
-from schemas.admin_schemas import RevenueDetails, RevenueResponse
+from models.user_model import User
+from schemas.admin_schemas import RevenueDetails, RevenueResponse, PoolStatusSchema
 
 
 class AdminService:
@@ -27,9 +32,10 @@ class AdminService:
     async def add_games(self, request_data, current_user):
         """ This method add games in system."""
         try:
-            is_game_exist = (self.db.query(Game).
-                             filter(func.lower(Game.game_name) == func.lower(request_data.game_name)).
-                             first())
+            is_game_exist = (await self.db.execute(
+                select(Game).
+                where(func.lower(Game.game_name) == func.lower(request_data.game_name))
+            )).scalars().first()
 
             if not is_game_exist:
                 game_data = Game(
@@ -39,8 +45,9 @@ class AdminService:
                 game_data.created_by = current_user.user_id
                 game_data.created_at = datetime.now()
                 self.db.add(game_data)
-                self.db.commit()
-                self.db.refresh(game_data)
+                await self.db.commit()
+                await self.db.refresh(game_data)
+                reference_catalog.invalidate()
                 return JSONResponse(
                     {
                         ID: str(game_data.id),
@@ -51,21 +58,22 @@ class AdminService:
                                     detail=GAME_ALREADY_EXISTS)
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def update_game(self, game_id, update_data, current_user):
         """ This method update game in system."""
         try:
-            game_data = is_valid_game(self.db, game_id)
+            game_data = await self.db.get(Game, game_id)
             if game_data:
-                is_game_exist = (self.db.query(Game).
-                                 filter(func.lower(Game.game_name) == func.lower(update_data.game_name)).
-                                 first())
+                is_game_exist = (await self.db.execute(
+                    select(Game).
+                    where(func.lower(Game.game_name) == func.lower(update_data.game_name))
+                )).scalars().first()
 
                 if is_game_exist:
                     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,8 +82,9 @@ class AdminService:
                 game_data.game_name = update_data.game_name
                 game_data.updated_by = current_user.user_id
                 game_data.updated_at = datetime.now()
-                self.db.commit()
-                self.db.refresh(game_data)
+                await self.db.commit()
+                await self.db.refresh(game_data)
+                reference_catalog.invalidate()
                 return JSONResponse(
                     {
                         DETAILS: GAME_NAME_UPDATED,
@@ -86,21 +95,21 @@ class AdminService:
 
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def get_all_games(self):
         """ API end point to get all games."""
         try:
-            games = self.db.query(Game).all()
-            return games
+            reference_data = await reference_catalog.get(self.db)
+            return list(reference_data.games.values())
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def update_activation_data(self, data_model, is_active, user_id):
@@ -115,13 +124,16 @@ class AdminService:
 
         data_model.updated_by = user_id
         data_model.updated_at = datetime.now()
-        self.db.commit()
-        self.db.refresh(data_model)
+        await self.db.commit()
+        await self.db.refresh(data_model)
+
+        if isinstance(data_model, User):
+            principal_cache.invalidate(data_model.id)
 
     async def activate_deactivate_turf_owner(self, request_data, current_user, is_active=False):
         """ This method approve the turf owner. """
         try:
-            turf_owner_data = is_valid_user(self.db, request_data.id, is_exception=False)
+            turf_owner_data = await is_valid_user(self.db, request_data.id, is_exception=False)
 
             if is_active:
                 await self.update_activation_data(turf_owner_data, is_active, current_user.user_id)
@@ -129,7 +141,9 @@ class AdminService:
                 await self.update_activation_data(turf_owner_data, is_active, current_user.user_id)
 
                 # Deactivate all the turf of turf owner after deactivate turf owner
-                turf_data = self.db.query(Turf).filter(Turf.turf_owner_id == request_data.id).all()
+                turf_data = (await self.db.execute(
+                    select(Turf).where(Turf.turf_owner_id == request_data.id)
+                )).scalars().all()
                 for turf in turf_data:
                     await self.update_activation_data(turf, is_active, current_user.user_id)
 
@@ -138,11 +152,11 @@ class AdminService:
             })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def activate_deactivate_turf(self, request_data, current_user, is_active=False):
@@ -151,7 +165,7 @@ class AdminService:
             If the is_active is true then activate the turf otherwise deactivate turf.
         """
         try:
-            turf_data = is_turf(self.db, request_data.id)
+            turf_data = await is_turf(self.db, request_data.id)
             if turf_data:
                 await self.update_activation_data(turf_data, is_active, current_user.user_id)
 
@@ -163,65 +177,55 @@ class AdminService:
                 raise HTTPException(status_code=404, detail=INVALID_TURF_ID)
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def get_revenue_data(self, turf_owner_id, current_user, start_date, end_date):
         """ This method get the revenue data."""
         try:
 
-            is_valid_user(self.db, turf_owner_id)
-
-            turfs = self.db.query(Turf).filter(Turf.turf_owner_id == turf_owner_id).all()
+            await is_active_user(self.db, turf_owner_id)
 
-            if not turfs:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail=NO_TURF_FOUND)
-            total_revenue = 0
-            revenue_details = []
-
-            turfs_with_revenue = (
-                self.db.query(Turf)
-                .join(TurfBooking)
-                .join(Revenue)
-                .filter(
-                    Revenue.turf_booking_id == TurfBooking.id,
-                    TurfBooking.turf_id == Turf.id,
-                    Turf.turf_owner_id == turf_owner_id
-                )
-                .distinct()
-                .all()
+            in_date_range = and_(
+                TurfBooking.reservation_date >= start_of_day(start_date),
+                TurfBooking.reservation_date <= start_of_day(end_date)
             )
-
-            # get revenue of each turf of turf owner
-            for turf in turfs_with_revenue:
-                bookings = (
-                    self.db.query(TurfBooking)
-                    .join(Revenue)
-                    .filter(
-                        Revenue.turf_booking_id == TurfBooking.id,
-                        TurfBooking.turf_id == turf.id,
-                        TurfBooking.reservation_date >= start_date,
-                        TurfBooking.reservation_date <= end_date
-                    )
-                    .all()
+            turf_revenue = func.coalesce(func.sum(Revenue.amount).filter(in_date_range), 0)
+
+            # one aggregate over the turfs of the owner, the bookings are summed by the database
+            turf_revenues = (await self.db.execute(
+                select(
+                    Turf.id,
+                    Turf.turf_name,
+                    turf_revenue.label("revenue_amount"),
+                    func.count(Revenue.id).label("revenue_count"),
+                    func.sum(turf_revenue).over().label("total_revenue")
                 )
+                .outerjoin(TurfBooking, TurfBooking.turf_id == Turf.id)
+                .outerjoin(Revenue, Revenue.turf_booking_id == TurfBooking.id)
+                .where(Turf.turf_owner_id == turf_owner_id)
+                .group_by(Turf.id)
+                .order_by(Turf.turf_name, Turf.id)
+            )).all()
+
+            if not turf_revenues:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                    detail=NO_TURF_FOUND)
 
-                turf_revenue = sum(
-                    sum(rev.amount for rev in booking.revenue) for booking in bookings if booking.revenue)
-                total_revenue += turf_revenue
-
-                revenue_details.append(
-                    RevenueDetails(
-                        turf_id=turf.id,
-                        turf_name=turf.turf_name,
-                        revenue_amount=turf_revenue
-                    )
+            total_revenue = int(turf_revenues[0].total_revenue)
+            # the turfs which never earned any revenue are left out
+            revenue_details = [
+                RevenueDetails(
+                    turf_id=turf.id,
+                    turf_name=turf.turf_name,
+                    revenue_amount=turf.revenue_amount
                 )
+                for turf in turf_revenues if turf.revenue_count
+            ]
 
             return RevenueResponse(
                 total_revenue=total_revenue,
@@ -229,82 +233,48 @@ class AdminService:
             )
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
-    async def get_booking_data(self, turf_id, current_user, start_date, end_date, page, size):
-        """ This method get booking data of particular turf """
+    async def get_booking_data(self, turf_id, current_user, start_date, end_date, page, size, cursor = None):
+        """ This method get booking data of particular turf, by page number or by cursor."""
         try:
-            turf_data = is_turf(self.db, turf_id)
+            turf_data = await is_turf(self.db, turf_id)
             if turf_data:
-                query = (
-                    select(
-                        TurfBooking
-                    )
-                    .where(
-                        and_(
-                            TurfBooking.turf_id == turf_id,
-                            TurfBooking.reservation_date >= start_date,
-                            TurfBooking.reservation_date <= end_date
-                        )
-                    )
-                    .order_by(TurfBooking.created_at.desc())
-                    .offset((page - 1) * size)
-                    .limit(size)
+                query = turf_bookings(turf_id, start_date, end_date).options(
+                    selectinload(TurfBooking.customer), selectinload(TurfBooking.turf)
                 )
-                result = self.db.execute(query)
-                turf_booking = result.scalars().all()
+                booking_url = (f"{BASE_URL}/api/v1/admin/get-booking-data?"
+                               f"turf_id={turf_id}&start_date={start_date}&end_date={end_date}")
+                booking_page = await paginate(self.db, query, TurfBooking, booking_url, page, size, cursor)
 
-                if not turf_booking:
+                if not booking_page.items:
                     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                         detail=NO_DATA_FOUND)
 
-                total_turf_booking = (
-                    self.db.query(TurfBooking)
-                    .filter(
-                        TurfBooking.turf_id == turf_id,
-                        TurfBooking.reservation_date >= start_date,
-                        TurfBooking.reservation_date <= end_date
-                    )
-                    .count()
-                )
-
-                # Load environment variables for host/port
-                load_dotenv()
-                HOST = os.environ.get("HOST")
-                PORT = os.environ.get("PORT")
-
-                next_page = (
-                    f"http://{HOST}:{PORT}/api/v1/admin/get-booking-data?"
-                    f"turf_id={turf_id}&start_date={start_date}&end_date={end_date}"
-                    f"&page={page + 1}&size={size}"
-                    if (page * size) < total_turf_booking else None
-                )
-
-                previous_page = (
-                    f"http://{HOST}:{PORT}/api/v1/admin/get-booking-data?"
-                    f"turf_id={turf_id}&start_date={start_date}&end_date={end_date}"
-                    f"&page={page - 1}&size={size}"
-                    if page > 1 else None
-                )
-
                 return {
-                    BOOKINGS: turf_booking,
-                    NEXT_PAGE: next_page,
-                    PREV_PAGE: previous_page
+                    BOOKINGS: booking_page.items,
+                    NEXT_PAGE: booking_page.next_page,
+                    PREV_PAGE: booking_page.previous_page,
+                    NEXT_CURSOR: booking_page.next_cursor,
+                    PREV_CURSOR: booking_page.previous_cursor
                 }
 
             else:
                 raise HTTPException(status_code=404, detail=INVALID_TURF_ID)
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
+
+    async def get_pool_status(self):
+        """ This method get the database connection pool statistics."""
+        return PoolStatusSchema(**get_pool_status())
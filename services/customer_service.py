@@ -1,123 +1,236 @@
-import os
+import hashlib
+import json
 from datetime import datetime, timedelta
+from math import cos, radians
 
-from dotenv import load_dotenv
 from fastapi import HTTPException
-from geoalchemy2.functions import ST_DistanceSphere
-from sqlalchemy import select, exists, and_, func
-from sqlalchemy.orm import aliased
+from geoalchemy2.functions import ST_DistanceSphere, ST_DWithin
+from sqlalchemy import select, and_, func, insert, cast
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, selectinload, contains_eager, joinedload
 from starlette import status
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
-from core.constant import CUSTOMER_ROLE, ERROR_MESSAGE, DETAILS, TURF_BOOKED, \
+from core.constant import BASE_URL, CUSTOMER_ROLE, ERROR_MESSAGE, DETAILS, TURF_BOOKED, \
     TURF_SLOT_ALREADY_BOOKED, TURF_UPDATE_SUCCESS, NO_BOOKING_FOUND, \
     PAYMENT_STATUS_UNPAID, STATUS_RESERVED, STATUS_CANCELLED, UPDATE_BEFORE_ONE_HOUR, \
     NOT_ALLOWED_TO_CANCEL, BOOKING_ACTION_NOT_ALLOWED, BOOKING_CANCELLED, BOOKINGS, NEXT_PAGE, PREV_PAGE, NOT_ALLOWED, \
-    INVALID_FEEDBACK_INPUT, FEEDBACK_ADDED, STATUS_CONFIRM, FEEDBACK_NOT_ALLOWED, INVALID_GAME_ID, ID
-from core.validations import is_valid_turf, validate_reservation, validate_extend_reservation, is_turf_booking, \
-    is_valid_string, is_valid_game
-from models.address_model import Address
-from models.discount_model import Discount
+    INVALID_FEEDBACK_INPUT, FEEDBACK_ADDED, STATUS_CONFIRM, FEEDBACK_NOT_ALLOWED, INVALID_GAME_ID, ID, INVALID_RADIUS, \
+    KM_PER_DEGREE, MIN_LATITUDE_COS, SEARCH_MODE_COUNT, SEARCH_MODE_HAS_MORE, NEXT_CURSOR, PREV_CURSOR, \
+    SLOT_MINUTES, MAXIMUM_ADVANCE_DAYS, INVALID_AVAILABILITY_DAYS, INVALID_DATE, INVALID_WINDOW, \
+    MAXIMUM_QUOTE_SLOTS, INVALID_QUOTE_SLOTS, INVALID_SLOT_TIME, INVALID_BOOKING_TIME
+from core.booking_queries import conflicting_bookings, customer_bookings
+from core.pagination import paginate, page_links, with_query
+from core.pricing import load_turf_pricing, quote_amount, quote_slots, day_slot_prices
+from core.search_cache import search_cache, load_search_scope
+from core.slot_occupancy import is_turf_free, slot_grid, elapsed_slots_mask, candidate_windows, \
+    occupied_slots_joins, has_free_window, free_windows
+from core.validations import validate_reservation, validate_extend_reservation, is_turf_booking, \
+    is_valid_string, is_valid_game, start_of_day, raise_booking_integrity_error
+from models.address_model import Address, GEOGRAPHY
+from models.city_model import City
 from models.feedback_model import Feedback
-from models.turf_booking import TurfBooking
+from models.turf_booking import TurfBooking, ACTIVE_BOOKING
 from models.turf_model import Turf
+from models.turf_slot_occupancy_model import TurfSlotOccupancy
 from models.user_model import User
-from schemas.customer_schemas import AvailableTurf, TurfResponse
+from schemas.customer_schemas import AvailableTurf, TurfResponse, TurfAvailabilitySchema, DaySlotsSchema, \
+    TimeWindowSchema, TurfQuoteSchema, SlotQuoteSchema
 
 
 class CustomerService:
     def __init__(self, db):
         self.db = db
 
-    def get_customer_data(self, user_id):
+    async def get_customer_data(self, user_id):
         """ This method get customer data."""
 
-        return self.db.query(User).filter(User.id == user_id).first()
+        return (await self.db.execute(select(User).where(User.id == user_id))).scalars().first()
+
+    @staticmethod
+    def within_radius(address_geom, customer_data, radius_km):
+        """ This method returns the filter of addresses within the radius of the customer."""
+
+        # degree box is wide enough for the radius in every direction, so the GiST index
+        # prunes the addresses first and the exact sphere distance is checked on the rest only
+        radius_degrees = radius_km / (KM_PER_DEGREE * max(cos(radians(customer_data.lat)), MIN_LATITUDE_COS))
+        return and_(
+            ST_DWithin(address_geom, customer_data.geom, radius_degrees),
+            ST_DistanceSphere(address_geom, customer_data.geom) <= radius_km * 1000
+        )
+
+    @staticmethod
+    def search_result_options(address_alias):
+        """
+            This method return loader options for relationships used by turf search response.
+            Many-to-one relationships are loaded by the search statement itself, reusing its address join,
+            and each collection by one query for the whole page, so the query count does not grow with page size.
+        """
+        return (
+            contains_eager(Turf.addresses.of_type(address_alias)).joinedload(address_alias.city).joinedload(City.state),
+            joinedload(Turf.game),
+            selectinload(Turf.media),
+            selectinload(Turf.discounts)
+        )
+
+    @staticmethod
+    def turf_free_windows(turf_row, occupied_columns, windows):
+        """ This method returns the free windows of the turf from the occupied slots fetched with it."""
+        occupied_masks = {
+            slot_date: getattr(turf_row, f"occupied_{day}") for day, slot_date in enumerate(occupied_columns)
+        }
+        return [
+            TimeWindowSchema(start_time = window_start, end_time = window_end)
+            for window_start, window_end in free_windows(occupied_masks, windows)
+        ]
+
+    async def search_free_turfs(self, game_id, city_id, start_time, end_time, window_minutes = None):
+        """
+            This method returns the ids of the active turfs of the game in the city which are free between start
+            and end time, with their free windows when window_minutes is given. They are the same for every
+            customer of the city, so they are cached until a booking of a turf of that city, game and day
+            changes them or the short ttl of the search cache expires.
+        """
+        cache_key = search_cache.key(city_id, game_id, start_time, end_time, window_minutes)
+        free_turfs = search_cache.get(cache_key)
+        if free_turfs is not None:
+            return free_turfs
+
+        search_filters = [
+            Turf.is_active == True,
+            Turf.is_verified == True,
+            Turf.game_id == game_id,
+            Address.city_id == city_id
+        ]
+        # free slots come from the occupancy bitmap instead of an anti-join over the bookings
+        columns = [Turf.id]
+        occupancy_joins = []
+        if window_minutes is None:
+            search_filters.append(is_turf_free(Turf.id, start_time, end_time))
+        else:
+            windows = candidate_windows(start_time, end_time, window_minutes)
+            occupancy_joins, occupied_columns = occupied_slots_joins(Turf.id, start_time, end_time)
+            search_filters.append(has_free_window(occupied_columns, windows))
+            columns.extend(
+                occupied.label(f"occupied_{day}") for day, occupied in enumerate(occupied_columns.values())
+            )
+
+        query = select(*columns).join(Address, Turf.address_id == Address.id)
+        for day_occupancy, on_clause in occupancy_joins:
+            query = query.outerjoin(day_occupancy, on_clause)
+
+        free_turfs = {
+            turf_row.id: self.turf_free_windows(turf_row, occupied_columns, windows)
+            if window_minutes is not None else None
+            for turf_row in (await self.db.execute(query.where(*search_filters))).all()
+        }
+
+        search_cache.set(cache_key, free_turfs, city_id, game_id, start_time, end_time)
+        return free_turfs
 
     async def show_available_turfs(self, game_id, booking_date, start_time, end_time,
-                                   current_user, page, size):
-        """ This method shows available turfs nearby the customer's location based on data and time."""
+                                   current_user, page, size, radius_km = None, search_mode = SEARCH_MODE_COUNT,
+                                   window_minutes = None):
+        """
+            This method shows available turfs nearby the customer's location based on data and time.
+            The free turfs come from the search cache and the page and the total are fetched in a single
+            statement, with search_mode count the total is a window count over the matching turfs and with
+            has_more one extra row is fetched instead. With window_minutes every window of that length between
+            start and end time is a candidate, and each turf is returned with its free windows.
+        """
         try:
-            customer_data = self.get_customer_data(current_user.user_id)
+            customer_data = await self.get_customer_data(current_user.user_id)
             customer_geom = customer_data.geom
 
-            if not is_valid_game(self.db, game_id):
+            if not await is_valid_game(self.db, game_id):
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=INVALID_GAME_ID)
 
+            if radius_km is not None and radius_km <= 0:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_RADIUS)
+
+            if window_minutes is not None and (window_minutes < 60 or window_minutes % SLOT_MINUTES
+                                               or start_time + timedelta(minutes=window_minutes) > end_time):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_WINDOW)
+
             if validate_reservation(booking_date, start_time, end_time):
 
-                booked_turf_subquery = (
-                    select(TurfBooking.turf_id)
-                    .where(
-                        TurfBooking.reservation_date == booking_date,
-                        TurfBooking.start_time < end_time,
-                        TurfBooking.end_time > start_time
-                    )
+                free_turfs = await self.search_free_turfs(
+                    game_id, customer_data.city_id, start_time, end_time, window_minutes
                 )
 
-                address_alias = aliased(Address)
+                total_turf = []
+                if free_turfs:
+                    address_alias = aliased(Address)
 
-                query = (
-                    select(
+                    search_filters = [Turf.id.in_(list(free_turfs))]
+                    if radius_km is not None:
+                        search_filters.append(self.within_radius(address_alias.geom, customer_data, radius_km))
+
+                    columns = [
                         Turf,
                         (ST_DistanceSphere(address_alias.geom, customer_geom) / 1000).label("distance_km")
+                    ]
+                    if search_mode == SEARCH_MODE_COUNT:
+                        # window is evaluated before offset and limit, so every row carries the total
+                        columns.append(func.count().over().label("total_count"))
+
+                    query = (
+                        select(*columns)
+                        .join(address_alias, Turf.address_id == address_alias.id)
+                        .where(*search_filters)
+                        .options(*self.search_result_options(address_alias))
+                        # KNN ordering on the sphere is served by the geography GiST index
+                        # instead of sorting every distance
+                        .order_by(
+                            cast(address_alias.geom, GEOGRAPHY).distance_centroid(cast(customer_geom, GEOGRAPHY)),
+                            Turf.id
+                        )
+                        .offset((page - 1) * size)
+                        .limit(size + 1 if search_mode == SEARCH_MODE_HAS_MORE else size)
                     )
-                    .join(address_alias, Turf.address_id == address_alias.id)
-                    .where(
-                        Turf.is_active == True,
-                        Turf.is_verified == True,
-                        Turf.game_id == game_id,
-                        address_alias.city_id == customer_data.city_id,
-                        ~exists(booked_turf_subquery.where(TurfBooking.turf_id == Turf.id))
-                    )
-                    .order_by("distance_km")
-                    .offset((page - 1) * size)
-                    .limit(size)
-                )
 
-                result = self.db.execute(query)
-                total_turf = result.all()
+                    total_turf = (await self.db.execute(query)).all()
+
+                total_count = None
+                if search_mode == SEARCH_MODE_HAS_MORE:
+                    has_more = len(total_turf) > size
+                    total_turf = total_turf[:size]
+                else:
+                    # an empty page past the first one does not tell the total
+                    total_count = total_turf[0].total_count if total_turf else (0 if page == 1 else None)
+                    has_more = total_count is not None and (page * size) < total_count
 
                 turfs = [
                     TurfResponse(
-                        turf_name = turf.turf_name,
-                        description = turf.description,
-                        amenities = turf.amenities,
-                        booking_price = turf.booking_price,
-                        game = turf.game,
-                        media = turf.media,
-                        addresses = turf.addresses,
-                        discounts = turf.discounts,
-                        distance_turf = distance
+                        turf_name = turf_row.Turf.turf_name,
+                        description = turf_row.Turf.description,
+                        amenities = turf_row.Turf.amenities,
+                        booking_price = turf_row.Turf.booking_price,
+                        game = turf_row.Turf.game,
+                        media = turf_row.Turf.media,
+                        addresses = turf_row.Turf.addresses,
+                        discounts = turf_row.Turf.discounts,
+                        distance_turf = turf_row.distance_km,
+                        free_windows = free_turfs[turf_row.Turf.id]
                     )
-                    for turf, distance in total_turf
+                    for turf_row in total_turf
                 ]
 
-                total_count_query = select(func.count()).select_from(
-                    select(Turf)
-                    .join(address_alias, Turf.address_id == address_alias.id)
-                    .where(
-                        Turf.is_active == True,
-                        Turf.is_verified == True,
-                        Turf.game_id == game_id,
-                        address_alias.city_id == customer_data.city_id,
-                        ~exists(booked_turf_subquery.where(TurfBooking.turf_id == Turf.id))
-                    ).subquery()
-                )
-                total_count = self.db.execute(total_count_query).scalar()
-
-                load_dotenv()
-                HOST = os.environ.get("HOST")
-                PORT = os.environ.get("PORT")
+                search_params = {"radius_km": radius_km} if radius_km is not None else {}
+                if search_mode != SEARCH_MODE_COUNT:
+                    search_params["search_mode"] = search_mode
+                if window_minutes is not None:
+                    search_params["window_minutes"] = window_minutes
 
-                next_page = (f"http://{HOST}:{PORT}/api/v1/customer/get-turf-data/{game_id}/{booking_date}/{start_time}/"
-                             f"{end_time}?page={page + 1}&size={size}") if (page * size) < total_count else None
-
-                previous_page = (f"http://{HOST}:{PORT}/api/v1/customer/get-turf-data/{game_id}/{booking_date}/"
-                                 f"{start_time}/{end_time}?page={page - 1}&size={size}") if page > 1 else None
+                next_page, previous_page = page_links(
+                    with_query(f"{BASE_URL}/api/v1/customer/get-turf-data/{game_id}/{booking_date}/"
+                               f"{start_time}/{end_time}", **search_params),
+                    page, size, has_more
+                )
 
                 return_data = AvailableTurf(
                     turf_data = turfs,
+                    total_count = total_count,
                     next_page = next_page,
                     previous_page = previous_page
                 )
@@ -125,24 +238,109 @@ class CustomerService:
                 return return_data
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
-    def validate_booking_data(self, turf_id, reservation_date, end_time, start_time, user_id = None):
-        """ This method validates the bookings data of turf."""
-        conflicting_bookings_query = select(TurfBooking).where(
-            and_(
-                TurfBooking.turf_id == turf_id,
-                TurfBooking.reservation_date == reservation_date,
-                TurfBooking.start_time < end_time,
-                TurfBooking.end_time > start_time
+    async def show_turf_availability(self, turf_id, start_date, days, if_none_match = None):
+        """
+            This method shows the half-hour slot grid of the turf for the given days, read from the slot
+            occupancy bitmap in one range query and priced from the compiled price table of the turf.
+            The ETag of the grid lets the client re-poll with If-None-Match.
+        """
+        try:
+            turf_pricing = await load_turf_pricing(self.db, turf_id)
+
+            now = datetime.now()
+            start_date = start_date or now.date()
+            if start_date < now.date():
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_DATE)
+
+            end_date = start_date + timedelta(days=days)
+            if days < 1 or (end_date - now.date()).days > MAXIMUM_ADVANCE_DAYS + 1:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_AVAILABILITY_DAYS)
+
+            occupied = dict((await self.db.execute(
+                select(TurfSlotOccupancy.slot_date, TurfSlotOccupancy.occupied)
+                .where(
+                    TurfSlotOccupancy.turf_id == turf_id,
+                    TurfSlotOccupancy.slot_date >= start_date,
+                    TurfSlotOccupancy.slot_date < end_date
+                )
+            )).all())
+
+            day_slots = []
+            for day in range(days):
+                slot_date = start_date + timedelta(days=day)
+                occupied_mask = occupied.get(slot_date, 0)
+                if slot_date == now.date():
+                    occupied_mask |= elapsed_slots_mask(now)
+                day_slots.append(DaySlotsSchema(
+                    slot_date=slot_date,
+                    slots=slot_grid(occupied_mask),
+                    slot_prices=day_slot_prices(turf_pricing, slot_date)
+                ))
+
+            availability = TurfAvailabilitySchema(
+                turf_id = turf_id,
+                slot_minutes = SLOT_MINUTES,
+                days = day_slots
+            ).model_dump(mode="json")
+
+            etag = '"{0}"'.format(hashlib.sha1(json.dumps(availability, sort_keys=True).encode()).hexdigest())
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+            return JSONResponse(availability, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        except HTTPException as http_exc:
+            await self.db.rollback()
+            raise http_exc
+
+        except Exception as e:
+            await self.db.rollback()
+            raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
+
+    async def quote_turf_slots(self, quote_data):
+        """ This method prices the candidate slots of the turf without booking them, from one load of its pricing."""
+        try:
+            if not 0 < len(quote_data.slots) <= MAXIMUM_QUOTE_SLOTS:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_QUOTE_SLOTS)
+
+            for slot in quote_data.slots:
+                if (slot.start_time.minute % SLOT_MINUTES or slot.end_time.minute % SLOT_MINUTES
+                        or slot.start_time.second or slot.end_time.second):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_SLOT_TIME)
+                if slot.end_time < slot.start_time + timedelta(hours=1):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_BOOKING_TIME)
+
+            turf_pricing = await load_turf_pricing(self.db, quote_data.turf_id)
+            amounts = quote_slots(turf_pricing, [(slot.start_time, slot.end_time) for slot in quote_data.slots])
+
+            return TurfQuoteSchema(
+                turf_id = quote_data.turf_id,
+                quotes = [
+                    SlotQuoteSchema(start_time = slot.start_time, end_time = slot.end_time, amount = amount)
+                    for slot, amount in zip(quote_data.slots, amounts)
+                ]
             )
-        )
-        conflict_exists = self.db.execute(conflicting_bookings_query).first()
+
+        except HTTPException as http_exc:
+            await self.db.rollback()
+            raise http_exc
+
+        except Exception as e:
+            await self.db.rollback()
+            raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
+
+    async def validate_booking_data(self, turf_id, reservation_date, end_time, start_time, user_id = None):
+        """ This method validates the bookings data of turf."""
+        conflict_exists = (await self.db.execute(
+            conflicting_bookings(turf_id, reservation_date, start_time, end_time)
+        )).first()
 
         if conflict_exists:
             if conflict_exists[0].customer_id == user_id:
@@ -151,69 +349,68 @@ class CustomerService:
 
 
     async def book_turf(self, booking_data, current_user):
-        """ This method book the turf."""
+        """
+            This method book the turf in one transaction, The turf row is locked while the slot is checked,
+            its price and discount are read with the lock and the booking is inserted returning its id.
+        """
         try:
-            turf_data = is_valid_turf(self.db, booking_data.turf_id)
+            turf_data = await load_turf_pricing(self.db, booking_data.turf_id, for_update = True)
 
             if validate_reservation(booking_data.reservation_date, booking_data.start_time, booking_data.end_time):
 
-                self.validate_booking_data(
+                await self.validate_booking_data(
                                            booking_data.turf_id,
                                            booking_data.reservation_date,
                                            booking_data.end_time,
                                            booking_data.start_time
                                            )
 
-                discount =  (
-                              self.db.query(Discount).
-                             filter(and_(Discount.turf_id == booking_data.turf_id, Discount.is_active == True)).
-                             first()
-                )
-
-                discount_amount = discount.discount_amount if discount else 0
-                duration = booking_data.end_time - booking_data.start_time
-                duration_in_s = duration.total_seconds()
-                total_hour =  divmod(duration_in_s, 3600)[0]
-
-                total_amount = total_hour * turf_data.booking_price - discount_amount
-
-                turf_booking_data = TurfBooking(
-                    reservation_date = booking_data.reservation_date.date(),
-                    start_time = booking_data.start_time,
-                    end_time = booking_data.end_time,
-                    total_amount = total_amount,
-                    payment_status = PAYMENT_STATUS_UNPAID,
-                    booking_status = STATUS_RESERVED,
-                    turf_id = booking_data.turf_id,
-                    customer_id = current_user.user_id
+                booking_id = (await self.db.execute(
+                    insert(TurfBooking)
+                    .values(
+                        reservation_date = start_of_day(booking_data.reservation_date),
+                        start_time = booking_data.start_time,
+                        end_time = booking_data.end_time,
+                        total_amount = quote_amount(turf_data, booking_data.start_time, booking_data.end_time),
+                        payment_status = PAYMENT_STATUS_UNPAID,
+                        booking_status = STATUS_RESERVED,
+                        turf_id = booking_data.turf_id,
+                        customer_id = current_user.user_id,
+                        created_by = current_user.user_id
+                    )
+                    .returning(TurfBooking.id)
+                )).scalar_one()
+                await self.db.commit()
+                search_cache.invalidate_turf(
+                    turf_data.city_id, turf_data.game_id, booking_data.start_time, booking_data.end_time
                 )
-                turf_booking_data.created_by = current_user.user_id
-                self.db.add(turf_booking_data)
-                self.db.commit()
-                self.db.refresh(turf_booking_data)
 
                 return JSONResponse({
-                    ID: str(turf_booking_data.id),
+                    ID: str(booking_id),
                     DETAILS: TURF_BOOKED
                 })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
+        except IntegrityError as integrity_error:
+            await raise_booking_integrity_error(self.db, integrity_error)
+
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail = ERROR_MESSAGE.format(str(e)))
 
     async def update_turf_booking(self, update_booking_data, current_user):
-        """ This method update the turf booking data."""
+        """ This method update the turf booking data, in one transaction with the turf row locked like book_turf."""
         try:
             if validate_reservation(update_booking_data.reservation_date,
                                     update_booking_data.start_time, update_booking_data.end_time):
 
-                turf_booking_data = is_turf_booking(self.db, update_booking_data.booking_id, current_user)
+                turf_booking_data = await is_turf_booking(self.db, update_booking_data.booking_id, current_user)
+                turf_data = await load_turf_pricing(self.db, turf_booking_data.turf_id, for_update = True)
 
-                self.validate_booking_data(
+                await self.validate_booking_data(
                     turf_booking_data.turf_id,
                     update_booking_data.reservation_date,
                     update_booking_data.end_time,
@@ -227,162 +424,153 @@ class CustomerService:
                 if datetime.now() > (turf_booking_data.start_time - timedelta(hours=1)):
                     raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail = UPDATE_BEFORE_ONE_HOUR)
 
-                discount = self.db.query(Discount).filter(
-                    and_(Discount.turf_id == turf_booking_data.turf_id, Discount.is_active == True)).first()
-
-                discount_amount = discount.discount_amount if discount else 0
-                duration = update_booking_data.end_time - update_booking_data.start_time
-                duration_in_s = duration.total_seconds()
-                total_hour = divmod(duration_in_s, 3600)[0]
-
-                turf_data = is_valid_turf(self.db, turf_booking_data.turf_id)
-                total_amount = total_hour * turf_data.booking_price - discount_amount
-
-                turf_booking_data.reservation_date = update_booking_data.reservation_date.date()
+                previous_start_time, previous_end_time = turf_booking_data.start_time, turf_booking_data.end_time
+                turf_booking_data.reservation_date = start_of_day(update_booking_data.reservation_date)
                 turf_booking_data.start_time = update_booking_data.start_time
                 turf_booking_data.end_time = update_booking_data.end_time
                 turf_booking_data.updated_by = current_user.user_id
                 turf_booking_data.updated_at = datetime.now()
-                turf_booking_data.total_amount = total_amount
+                turf_booking_data.total_amount = quote_amount(
+                    turf_data, update_booking_data.start_time, update_booking_data.end_time
+                )
 
-                self.db.commit()
-                self.db.refresh(turf_booking_data)
+                await self.db.commit()
+                # both the slots which are released and the ones which are taken change the search results
+                search_cache.invalidate_turf(
+                    turf_data.city_id, turf_data.game_id, previous_start_time, previous_end_time
+                )
+                search_cache.invalidate_turf(
+                    turf_data.city_id, turf_data.game_id, turf_booking_data.start_time, turf_booking_data.end_time
+                )
 
                 return JSONResponse({
                     DETAILS: TURF_UPDATE_SUCCESS
                 })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
+        except IntegrityError as integrity_error:
+            await raise_booking_integrity_error(self.db, integrity_error)
+
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail = ERROR_MESSAGE.format(str(e)))
 
-    async def show_turf_booking_history(self, current_user, page, size):
-        """ This method shows the turf booking history of customer."""
+    async def show_turf_booking_history(self, current_user, page, size, cursor = None):
+        """ This method shows the turf booking history of customer, by page number or by cursor."""
         try:
-            turf_booking_data = (self.db.query(TurfBooking).
-                                 filter(TurfBooking.customer_id == current_user.user_id)
-                                 .order_by(TurfBooking.created_at.desc())
-                                 .offset((page - 1) * size).limit(size)
-                                 .all()
-                                 )
-
-            if not turf_booking_data:
-                raise HTTPException(status_code = 404, detail = NO_BOOKING_FOUND)
-
-            load_dotenv()
-            HOST = os.environ.get("HOST")
-            PORT = os.environ.get("PORT")
-
-            total_turf_booking = (self.db.query(TurfBooking).
-                                  filter(TurfBooking.customer_id == current_user.user_id).all())
-
-            next_page = f"http://{HOST}:{PORT}/api/v1/customer/show-turf-booking?page={page + 1}&size={size}"\
-                if (page * size) < len(total_turf_booking) else None
+            booking_query = customer_bookings(current_user.user_id).options(selectinload(TurfBooking.turf))
+            booking_page = await paginate(self.db, booking_query, TurfBooking,
+                                          f"{BASE_URL}/api/v1/customer/show-turf-booking", page, size, cursor)
 
-            previous_page = f"http://{HOST}:{PORT}/api/v1/customer/show-turf-booking?page={page - 1}&size={size}"\
-                if page > 1 else None
+            if not booking_page.items:
+                raise HTTPException(status_code = 404, detail = NO_BOOKING_FOUND)
 
             return {
-                BOOKINGS : turf_booking_data,
-                NEXT_PAGE : next_page,
-                PREV_PAGE : previous_page
+                BOOKINGS : booking_page.items,
+                NEXT_PAGE : booking_page.next_page,
+                PREV_PAGE : booking_page.previous_page,
+                NEXT_CURSOR : booking_page.next_cursor,
+                PREV_CURSOR : booking_page.previous_cursor
             }
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code = 500, detail = ERROR_MESSAGE.format(str(e)))
 
     async def extend_turf_booking(self, extend_booking_data, current_user):
-        """ This method extends the turf booking."""
+        """ This method extends the turf booking, in one transaction with the turf row locked like book_turf."""
         try:
-            turf_booking_data = is_turf_booking(self.db, extend_booking_data.booking_id, current_user)
+            turf_booking_data = await is_turf_booking(self.db, extend_booking_data.booking_id, current_user)
             if validate_extend_reservation(turf_booking_data, extend_booking_data):
 
                 if turf_booking_data.reservation_date.date() < datetime.now().date():
                     raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail= BOOKING_ACTION_NOT_ALLOWED)
 
+                turf_data = await load_turf_pricing(self.db, turf_booking_data.turf_id, for_update = True)
+
                 conflicting_bookings_query = select(TurfBooking).where(
                     and_(
                         TurfBooking.turf_id == turf_booking_data.turf_id,
-                        TurfBooking.reservation_date == extend_booking_data.reservation_date,
+                        TurfBooking.reservation_date == start_of_day(extend_booking_data.reservation_date),
                         TurfBooking.start_time < extend_booking_data.end_time,
+                        ACTIVE_BOOKING
                     )
                 )
-                conflict_exists = self.db.execute(conflicting_bookings_query).first()
+                conflict_exists = (await self.db.execute(conflicting_bookings_query)).first()
 
                 if conflict_exists and conflict_exists[0].customer_id != current_user.user_id:
                     raise HTTPException(status_code=400, detail=TURF_SLOT_ALREADY_BOOKED)
 
-                discount = self.db.query(Discount).filter(
-                    and_(Discount.turf_id == turf_booking_data.turf_id, Discount.is_active == True)).first()
-
-                discount_amount = discount.discount_amount if discount else 0
-                duration = extend_booking_data.end_time - turf_booking_data.start_time
-                duration_in_s = duration.total_seconds()
-                total_hour = divmod(duration_in_s, 3600)[0]
-                turf_data = is_valid_turf(self.db, turf_booking_data.turf_id)
-                total_amount = total_hour * turf_data.booking_price - discount_amount
-
                 turf_booking_data.end_time = extend_booking_data.end_time
                 turf_booking_data.updated_by = current_user.user_id
                 turf_booking_data.updated_at = datetime.now()
-                turf_booking_data.total_amount = total_amount
+                turf_booking_data.total_amount = quote_amount(
+                    turf_data, turf_booking_data.start_time, extend_booking_data.end_time
+                )
 
-                self.db.commit()
-                self.db.refresh(turf_booking_data)
+                await self.db.commit()
+                search_cache.invalidate_turf(
+                    turf_data.city_id, turf_data.game_id, turf_booking_data.start_time, turf_booking_data.end_time
+                )
 
                 return JSONResponse({
                     DETAILS: TURF_UPDATE_SUCCESS
                 })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
+        except IntegrityError as integrity_error:
+            await raise_booking_integrity_error(self.db, integrity_error)
+
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def cancel_booking(self, booking_data, current_user):
         """ This method cancel the booking of turf."""
         try:
-            turf_booking_data = is_turf_booking(self.db, booking_data.id, current_user)
+            turf_booking_data = await is_turf_booking(self.db, booking_data.id, current_user)
             if turf_booking_data.reservation_date.date() < datetime.now().date():
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail = BOOKING_ACTION_NOT_ALLOWED)
 
             if turf_booking_data.start_time < datetime.now() + timedelta(hours = 5):
                 raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail = NOT_ALLOWED_TO_CANCEL)
 
+            search_scope = await load_search_scope(self.db, turf_booking_data.turf_id)
             turf_booking_data.booking_status = STATUS_CANCELLED
             turf_booking_data.cancelled_by = current_user.user_id
-            self.db.commit()
-            self.db.refresh(turf_booking_data)
+            await self.db.commit()
+            await self.db.refresh(turf_booking_data)
+            search_cache.invalidate_turf(
+                search_scope.city_id, search_scope.game_id, turf_booking_data.start_time, turf_booking_data.end_time
+            )
 
             return JSONResponse({
                 DETAILS: BOOKING_CANCELLED
             })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
 
     async def add_feedback_turf(self, feedback_data, current_user):
         """ This method add feedback for turf bookings."""
         try:
-            turf_booking_data = is_turf_booking(self.db, feedback_data.turf_booking_id, current_user)
+            turf_booking_data = await is_turf_booking(self.db, feedback_data.turf_booking_id, current_user)
 
             if turf_booking_data.booking_status != STATUS_CONFIRM:
                 raise HTTPException(status_code=400, detail=FEEDBACK_NOT_ALLOWED)
@@ -395,8 +583,8 @@ class CustomerService:
                     customer_id = current_user.user_id
                 )
                 self.db.add(feedback_data)
-                self.db.commit()
-                self.db.refresh(feedback_data)
+                await self.db.commit()
+                await self.db.refresh(feedback_data)
 
                 return JSONResponse({
                     ID: str(feedback_data.id),
@@ -407,11 +595,11 @@ class CustomerService:
                                     detail=INVALID_FEEDBACK_INPUT)
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
 
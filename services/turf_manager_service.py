@@ -1,16 +1,18 @@
-import os
 from datetime import datetime
 
-from dotenv import load_dotenv
 from fastapi import HTTPException
-from sqlalchemy import select, and_
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from starlette import status
 from starlette.responses import JSONResponse
 
 from core.constant import OWNER_ROLE, MANAGER_ROLE, ERROR_MESSAGE, NOT_ALLOWED, INVALID_DATES, BOOKINGS, NEXT_PAGE, \
     PREV_PAGE, NO_DATA_FOUND, NO_BOOKING_FOUND, PAYMENT_STATUS_PAID, STATUS_CONFIRM, FIXED_REVENUE, DETAILS, \
-    PAYMENT_SUCCESSFUL, BOOKING_ALREADY_CANCELLED, STATUS_CANCELLED, BOOKING_CANCELLED
-from core.validations import is_valid_user
+    PAYMENT_SUCCESSFUL, BOOKING_ALREADY_CANCELLED, STATUS_CANCELLED, BOOKING_CANCELLED, BASE_URL, NEXT_CURSOR, PREV_CURSOR
+from core.booking_queries import turf_bookings
+from core.pagination import paginate
+from core.search_cache import search_cache, load_search_scope
+from core.validations import is_active_user
 from models.admin_revenue_model import AdminRevenue
 from models.manage_turf_manager_model import ManageTurfManager
 from models.revenue_model import Revenue
@@ -23,71 +25,49 @@ class ManagerService:
 
     async def get_turf_id(self, current_user):
         """ This method return turf manager's turf data."""
-        manager_data = (self.db.query(ManageTurfManager).
-                    filter(ManageTurfManager.turf_manager_id == current_user.user_id).first())
+        manager_data = (await self.db.execute(
+            select(ManageTurfManager).
+            where(ManageTurfManager.turf_manager_id == current_user.user_id)
+        )).scalars().first()
 
         return  manager_data.turf_id
 
 
-    async def get_booking_data(self,current_user, start_date, end_date, page, size):
-        """ This method get turf booking data."""
+    async def get_booking_data(self,current_user, start_date, end_date, page, size, cursor = None):
+        """ This method get turf booking data, by page number or by cursor."""
         try:
-            is_valid_user(self.db, current_user.user_id)
+            await is_active_user(self.db, current_user.user_id)
             turf_id = await self.get_turf_id(current_user)
-            query = (
-                    select(
-                        TurfBooking
-                    )
-                    .where(
-                        and_(
-                            TurfBooking.turf_id == turf_id,
-                            TurfBooking.reservation_date >= start_date,
-                            TurfBooking.reservation_date <= end_date
-                        )
-                    )
-                    .order_by(TurfBooking.created_at.desc())
-                    .offset((page - 1) * size)
-                    .limit(size)
-            )
-            result = self.db.execute(query)
-            turf_booking = result.scalars().all()
+            query = turf_bookings(turf_id, start_date, end_date).options(selectinload(TurfBooking.customer))
+            booking_url = (f"{BASE_URL}/api/v1/manager/get-turf-bookings?"
+                           f"start_date={start_date.date()}&end_date={end_date.date()}")
+            booking_page = await paginate(self.db, query, TurfBooking, booking_url, page, size, cursor)
 
-            if not turf_booking:
+            if not booking_page.items:
                 raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST,
                                     detail = NO_DATA_FOUND)
 
-            load_dotenv()
-            HOST = os.environ.get("HOST")
-            PORT = os.environ.get("PORT")
-
-            total_turf_booking = (self.db.query(TurfBooking).
-                                  filter(TurfBooking.turf_id == turf_id).all())
-
-            next_page = (f"http://{HOST}:{PORT}/api/v1/manager/get-turf-bookings?{start_date.date()}&{end_date.date()}?"
-                         f"page={page + 1}&size={size}") \
-                if (page * size) < len(total_turf_booking) else None
-
-            previous_page = (f"http://{HOST}:{PORT}/api/v1/manager/get-turf-bookings?{start_date.date()}&{end_date.date()}"
-                             f"page={page - 1}&size={size}") \
-                if page > 1 else None
-
             return {
-                BOOKINGS: turf_booking,
-                NEXT_PAGE: next_page,
-                PREV_PAGE: previous_page
+                BOOKINGS: booking_page.items,
+                NEXT_PAGE: booking_page.next_page,
+                PREV_PAGE: booking_page.previous_page,
+                NEXT_CURSOR: booking_page.next_cursor,
+                PREV_CURSOR: booking_page.previous_cursor
             }
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail = ERROR_MESSAGE.format(str(e)))
 
-    def is_booking_data(self, booking_id):
+    async def is_booking_data(self, booking_id):
         try:
-            booking_data = self.db.query(TurfBooking).filter(TurfBooking.id == booking_id).first()
+            booking_data = (await self.db.execute(
+                select(TurfBooking).where(TurfBooking.id == booking_id)
+            )).scalars().first()
 
             if not booking_data:
                 raise HTTPException(status_code=404, detail = NO_BOOKING_FOUND)
@@ -98,21 +78,21 @@ class ManagerService:
             return booking_data
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
 
     async def take_payment(self, booking_data, current_user):
         """ this method implements the payment of booking and add revenue to admin."""
         try:
-            is_valid_user(self.db, current_user.user_id)
+            await is_active_user(self.db, current_user.user_id)
             turf_id =  await self.get_turf_id(current_user)
 
-            turf_booking_data = self.is_booking_data(booking_data.id)
+            turf_booking_data = await self.is_booking_data(booking_data.id)
 
             turf_booking_data.payment_status = PAYMENT_STATUS_PAID
             turf_booking_data.booking_status = STATUS_CONFIRM
@@ -120,8 +100,9 @@ class ManagerService:
             turf_booking_data.updated_by = current_user.user_id
 
 
-            admin_revenue_data = (self.db.query(AdminRevenue).
-                                  filter(AdminRevenue.turf_id == turf_id)).first()
+            admin_revenue_data = (await self.db.execute(
+                select(AdminRevenue).where(AdminRevenue.turf_id == turf_id)
+            )).scalars().first()
 
             revenue_mode = admin_revenue_data.revenue_mode
             amount = admin_revenue_data.amount
@@ -136,44 +117,48 @@ class ManagerService:
                 amount = admin_revenue
             )
             self.db.add(revenue)
-            self.db.commit()
-            self.db.refresh(turf_booking_data)
-            self.db.refresh(revenue)
+            await self.db.commit()
+            await self.db.refresh(turf_booking_data)
+            await self.db.refresh(revenue)
 
             return JSONResponse({
                 DETAILS: PAYMENT_SUCCESSFUL
             })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def cancel_booking(self, cancel_booking_data, current_user):
         """ This method cancel booking of turf."""
         try:
-            is_valid_user(self.db, current_user.user_id)
-            turf_booking_data = self.is_booking_data(cancel_booking_data.booking_id)
+            await is_active_user(self.db, current_user.user_id)
+            turf_booking_data = await self.is_booking_data(cancel_booking_data.booking_id)
 
+            search_scope = await load_search_scope(self.db, turf_booking_data.turf_id)
             turf_booking_data.booking_status = STATUS_CANCELLED
             turf_booking_data.cancelled_by = current_user.user_id
             turf_booking_data.cancel_reason = cancel_booking_data.cancel_reason
 
-            self.db.commit()
-            self.db.refresh(turf_booking_data)
+            await self.db.commit()
+            await self.db.refresh(turf_booking_data)
+            search_cache.invalidate_turf(
+                search_scope.city_id, search_scope.game_id, turf_booking_data.start_time, turf_booking_data.end_time
+            )
 
             return JSONResponse({
                 DETAILS: BOOKING_CANCELLED
             })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
@@ -1,27 +1,34 @@
-import os
 import shutil
 from datetime import datetime
 from pathlib import Path
 
-from dotenv import load_dotenv
 from fastapi import HTTPException
 from geoalchemy2.shape import from_shape
 from shapely.geometry.point import Point
-from sqlalchemy import select, and_
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from starlette import status
 from starlette.responses import JSONResponse
 
 from authentication.hashing import Hash
-from core.constant import (NOT_ALLOWED, ERROR_MESSAGE, DETAILS, TURF_ADDRESS_ADDED, TURF_ADDED_SUCCESS,
+from authentication.principal_cache import principal_cache
+from core.constant import (BASE_URL, NOT_ALLOWED, ERROR_MESSAGE, DETAILS, TURF_ADDRESS_ADDED, TURF_ADDED_SUCCESS,
                            NO_DATA_TO_UPDATE, TURF_DATA_UPDATED, TURF_DEACTIVATED, OWNER_ROLE,
                            TURF_DISCOUNT_ADDED, INVALID_DISCOUNT_ID, DISCOUNT_EXPIRED, INVALID_DISCOUNT_AMOUNT,
                            TURF_DISCOUNT_DEACTIVATED, TURF_MANAGER_ADDED, MANAGER_ACTIVATION_UPDATED, USER_NOT_FOUND,
                            ID, MANAGER_ROLE, INVALID_USER_ACTION, MANAGER_ACTION_NOT_ALLOWED, NO_DATA_FOUND, BOOKINGS,
-                           NEXT_PAGE, PREV_PAGE, INVALID_END_TIME)
+                           NEXT_PAGE, PREV_PAGE, INVALID_END_TIME, NEXT_CURSOR, PREV_CURSOR, SLOT_MINUTES,
+                           SLOTS_PER_DAY, MINIMUM_PRICE_PERCENT, MAXIMUM_PRICE_PERCENT, INVALID_PRICING_RULE,
+                           INVALID_PRICING_RULE_ID, PRICING_RULE_INACTIVE, PRICING_RULE_ADDED,
+                           PRICING_RULE_DEACTIVATED)
+from core.booking_queries import turf_bookings
+from core.pagination import paginate
+from core.slot_occupancy import slot_index
 from core.validations import validate_turf_data, validate_address_data, verify_turf_name, verify_turf_description, \
-    validate_turf_amenities, verify_turf_booking_price, is_valid_user, is_valid_turf, validate_input
+    validate_turf_amenities, verify_turf_booking_price, is_valid_user, is_active_user, is_valid_turf, validate_input
 from models.address_model import Address
 from models.admin_revenue_model import AdminRevenue
+from models.city_model import City
 from models.discount_model import Discount
 from models.feedback_model import Feedback
 from models.manage_turf_manager_model import ManageTurfManager
@@ -29,6 +36,7 @@ from models.media_model import Media
 from models.roles_model import Roles
 from models.turf_booking import TurfBooking
 from models.turf_model import Turf
+from models.turf_pricing_rule_model import TurfPricingRule
 from models.user_model import User
 from schemas.turf_owner_schema import FeedbackResponseSchema
 
@@ -38,7 +46,7 @@ class TurfOwnerService:
         self.db = db
         self.upload_dir = Path("media")
 
-    def upload_images(self, media, turf_id, user_id):
+    async def upload_images(self, media, turf_id, user_id):
         """ This method upload images to the database."""
         media_url = self.upload_dir / media
         media_url_str = "/" + str(media_url).replace("\\", "/")
@@ -50,15 +58,15 @@ class TurfOwnerService:
         media_data.created_by = user_id
         media_data.created_at = datetime.now()
         self.db.add(media_data)
-        self.db.commit()
-        self.db.refresh(media_data)
+        await self.db.commit()
+        await self.db.refresh(media_data)
 
     async def add_turf_address(self, request_data, current_user):
         """ This method adds a turf address to the database."""
         try:
-            is_valid_user(self.db, current_user.user_id)
+            await is_active_user(self.db, current_user.user_id)
 
-            if validate_address_data(self.db, request_data):
+            if await validate_address_data(self.db, request_data):
                 turf_address = Address(
                     street_address=request_data.street_address,
                     area=request_data.area,
@@ -72,8 +80,8 @@ class TurfOwnerService:
                 turf_address.created_by = current_user.user_id
                 turf_address.created_at = datetime.now()
                 self.db.add(turf_address)
-                self.db.commit()
-                self.db.refresh(turf_address)
+                await self.db.commit()
+                await self.db.refresh(turf_address)
 
                 return JSONResponse({
                     ID: str(turf_address.id),
@@ -81,19 +89,19 @@ class TurfOwnerService:
                 })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def add_turfs(self, request_data, login_user):
         """ This method adds a turf to the database."""
         try:
-            is_valid_user(self.db, login_user.user_id)
+            await is_active_user(self.db, login_user.user_id)
 
-            if validate_turf_data(self.db, request_data, login_user.user_id):
+            if await validate_turf_data(self.db, request_data, login_user.user_id):
 
                 turf_data = Turf(
                     turf_name=request_data.turf_name,
@@ -110,7 +118,7 @@ class TurfOwnerService:
                 turf_data.created_at = datetime.now()
 
                 self.db.add(turf_data)
-                self.db.flush()
+                await self.db.flush()
 
                 turf_id = turf_data.id
 
@@ -130,11 +138,11 @@ class TurfOwnerService:
                 )
 
                 self.db.add(admin_revenue_data)
-                self.db.commit()
+                await self.db.commit()
 
                 # Adding media into database.
                 for filename in media_paths:
-                    self.upload_images(filename, turf_id, login_user.user_id)
+                    await self.upload_images(filename, turf_id, login_user.user_id)
 
                 return JSONResponse({
                     ID: str(turf_id),
@@ -142,13 +150,32 @@ class TurfOwnerService:
                 })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
+    @staticmethod
+    def turf_detail_options():
+        """ This method return loader options for relationships used by turf response."""
+        return (
+            selectinload(Turf.game),
+            selectinload(Turf.media),
+            selectinload(Turf.discounts),
+            selectinload(Turf.addresses).selectinload(Address.city).selectinload(City.state)
+        )
+
+    async def get_turf_details(self, turf_id):
+        """ This method get turf with its game, media, address and discount data."""
+        return (await self.db.execute(
+            select(Turf)
+            .where(Turf.id == turf_id)
+            .options(*self.turf_detail_options())
+            .execution_options(populate_existing=True)
+        )).scalars().first()
+
     def valid_owner_request(self, turf_data, current_user):
         """ This method validates the ownership of turf owner."""
         if turf_data.turf_owner_id != current_user.user_id:
@@ -157,14 +184,14 @@ class TurfOwnerService:
     async def update_turf_details(self, turf_id, update_turf_data, current_user):
         """ This method update turf details based on turf_id."""
         try:
-            turf_data = is_valid_turf(self.db, turf_id)
-            is_valid_user(self.db, current_user.user_id)
+            turf_data = await is_valid_turf(self.db, turf_id)
+            await is_active_user(self.db, current_user.user_id)
             self.valid_owner_request(turf_data, current_user)
 
             if update_turf_data:
 
                 if update_turf_data.turf_name:
-                    if verify_turf_name(self.db, turf_data.address_id, update_turf_data.turf_name):
+                    if await verify_turf_name(self.db, turf_data.address_id, update_turf_data.turf_name):
                         turf_data.turf_name = update_turf_data.turf_name
 
                 if update_turf_data.description:
@@ -182,69 +209,69 @@ class TurfOwnerService:
                 turf_data.updated_by = current_user.user_id
                 turf_data.updated_at = datetime.now()
 
-                self.db.commit()
-                self.db.refresh(turf_data)
+                await self.db.commit()
+                await self.db.refresh(turf_data)
 
                 return JSONResponse({
                     DETAILS: TURF_DATA_UPDATED
                 })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def show_turf_details(self, turf_id, current_user):
         """ This method show turf details based on turf_id."""
         try:
-            turf_data = is_valid_turf(self.db, turf_id)
-            is_valid_user(self.db, current_user.user_id)
+            turf_data = await is_valid_turf(self.db, turf_id)
+            await is_active_user(self.db, current_user.user_id)
             self.valid_owner_request(turf_data, current_user)
 
-            return turf_data
+            return await self.get_turf_details(turf_id)
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def deactivate_turf(self, data, current_user):
         """ This method deactivates the turf if valid turf owner."""
         try:
-            turf_data = is_valid_turf(self.db, data.id)
-            is_valid_user(self.db, current_user.user_id)
+            turf_data = await is_valid_turf(self.db, data.id)
+            await is_active_user(self.db, current_user.user_id)
             self.valid_owner_request(turf_data, current_user)
 
             turf_data.is_active = False
             turf_data.updated_by = current_user.user_id
             turf_data.updated_at = datetime.now()
 
-            self.db.commit()
-            self.db.refresh(turf_data)
+            await self.db.commit()
+            await self.db.refresh(turf_data)
 
             return JSONResponse({
                 DETAILS: TURF_DEACTIVATED
             })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def add_turf_discount(self, request_data, current_user):
         """ This method adds a turf discount."""
         try:
-            turf_data = is_valid_turf(self.db, request_data.turf_id)
-            is_valid_user(self.db, current_user.user_id)
+            turf_data = await is_valid_turf(self.db, request_data.turf_id)
+            await is_active_user(self.db, current_user.user_id)
             self.valid_owner_request(turf_data, current_user)
 
             if request_data.discount_amount < 0 or request_data.discount_amount < 100:
@@ -257,8 +284,8 @@ class TurfOwnerService:
             )
 
             self.db.add(discount_data)
-            self.db.commit()
-            self.db.refresh(discount_data)
+            await self.db.commit()
+            await self.db.refresh(discount_data)
 
             return JSONResponse({
                 ID: str(discount_data.id),
@@ -266,18 +293,20 @@ class TurfOwnerService:
             })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def deactivate_turf_discount(self, request_data, current_user):
         """ This method deactivates the turf discount."""
         try:
-            discount_data = self.db.query(Discount).filter(Discount.id == request_data.id).first()
-            is_valid_user(self.db, current_user.user_id)
+            discount_data = (await self.db.execute(
+                select(Discount).where(Discount.id == request_data.id)
+            )).scalars().first()
+            await is_active_user(self.db, current_user.user_id)
             if not discount_data:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail=INVALID_DISCOUNT_ID)
@@ -286,35 +315,121 @@ class TurfOwnerService:
                     raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE,
                                         detail=DISCOUNT_EXPIRED)
 
-            turf_data = is_valid_turf(self.db, discount_data.turf_id)
+            turf_data = await is_valid_turf(self.db, discount_data.turf_id)
             self.valid_owner_request(turf_data, current_user)
             discount_data.is_active = False
             discount_data.updated_by = current_user.user_id
             discount_data.updated_at = datetime.now()
 
-            self.db.commit()
-            self.db.refresh(discount_data)
+            await self.db.commit()
+            await self.db.refresh(discount_data)
 
             return JSONResponse({
                 DETAILS: TURF_DISCOUNT_DEACTIVATED
             })
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
+            raise http_exc
+
+        except Exception as e:
+            await self.db.rollback()
+            raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
+
+    @staticmethod
+    def pricing_rule_slots(request_data):
+        """ This method validates the pricing rule and returns its weekdays bitmask and slot band."""
+        start_slot = slot_index(request_data.start_time)
+        # a band which ends at midnight covers the day up to its last slot
+        end_slot = slot_index(request_data.end_time) or SLOTS_PER_DAY
+
+        if (not request_data.weekdays or any(weekday not in range(7) for weekday in request_data.weekdays)
+                or request_data.start_time.minute % SLOT_MINUTES or request_data.end_time.minute % SLOT_MINUTES
+                or request_data.start_time.second or request_data.end_time.second
+                or end_slot <= start_slot
+                or not MINIMUM_PRICE_PERCENT <= request_data.price_percent <= MAXIMUM_PRICE_PERCENT):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_PRICING_RULE)
+
+        weekdays = sum(1 << weekday for weekday in set(request_data.weekdays))
+        return weekdays, start_slot, end_slot
+
+    async def add_turf_pricing_rule(self, request_data, current_user):
+        """ This method adds a pricing rule for a weekly band of slots of the turf."""
+        try:
+            turf_data = await is_valid_turf(self.db, request_data.turf_id)
+            await is_active_user(self.db, current_user.user_id)
+            self.valid_owner_request(turf_data, current_user)
+
+            weekdays, start_slot, end_slot = self.pricing_rule_slots(request_data)
+
+            pricing_rule = TurfPricingRule(
+                turf_id=request_data.turf_id,
+                weekdays=weekdays,
+                start_slot=start_slot,
+                end_slot=end_slot,
+                price_percent=request_data.price_percent,
+                is_active=True
+            )
+            pricing_rule.created_by = current_user.user_id
+            # the price tables cached by every worker are compiled again from the new version
+            turf_data.pricing_version = Turf.pricing_version + 1
+
+            self.db.add(pricing_rule)
+            await self.db.commit()
+
+            return JSONResponse({
+                ID: str(pricing_rule.id),
+                DETAILS: PRICING_RULE_ADDED
+            })
+
+        except HTTPException as http_exc:
+            await self.db.rollback()
+            raise http_exc
+
+        except Exception as e:
+            await self.db.rollback()
+            raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
+
+    async def deactivate_turf_pricing_rule(self, request_data, current_user):
+        """ This method deactivates the pricing rule of the turf."""
+        try:
+            pricing_rule = await self.db.get(TurfPricingRule, request_data.id)
+            await is_active_user(self.db, current_user.user_id)
+            if not pricing_rule:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=INVALID_PRICING_RULE_ID)
+            else:
+                if not pricing_rule.is_active:
+                    raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=PRICING_RULE_INACTIVE)
+
+            turf_data = await is_valid_turf(self.db, pricing_rule.turf_id)
+            self.valid_owner_request(turf_data, current_user)
+            pricing_rule.is_active = False
+            pricing_rule.updated_by = current_user.user_id
+            pricing_rule.updated_at = datetime.now()
+            turf_data.pricing_version = Turf.pricing_version + 1
+
+            await self.db.commit()
+
+            return JSONResponse({
+                DETAILS: PRICING_RULE_DEACTIVATED
+            })
+
+        except HTTPException as http_exc:
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def add_turf_manager(self, request_data, current_user):
         """ This method register turf manager for the specified turf."""
         try:
-            turf_data = is_valid_turf(self.db, request_data.turf_id)
+            turf_data = await is_valid_turf(self.db, request_data.turf_id)
             self.valid_owner_request(turf_data, current_user)
 
-            if validate_input(request_data, self.db):
-                encrypted_password = Hash.encrypt(request_data.password)
+            if await validate_input(request_data, self.db):
+                encrypted_password = await Hash.async_encrypt(request_data.password)
                 user_data = User(
                     name=request_data.name,
                     contact_no=request_data.contact_no,
@@ -329,8 +444,8 @@ class TurfOwnerService:
                     geom=from_shape(Point(request_data.long, request_data.lat), srid=4326)
                 )
                 self.db.add(user_data)
-                self.db.commit()
-                self.db.refresh(user_data)
+                await self.db.commit()
+                await self.db.refresh(user_data)
 
                 turf_manager_data = ManageTurfManager(
                     turf_id=request_data.turf_id,
@@ -340,32 +455,35 @@ class TurfOwnerService:
 
                 turf_manager_data.created_by = current_user.user_id
                 self.db.add(turf_manager_data)
-                self.db.commit()
-                self.db.refresh(turf_manager_data)
+                await self.db.commit()
+                await self.db.refresh(turf_manager_data)
 
                 return JSONResponse(
                     {
                         DETAILS: TURF_MANAGER_ADDED,
                     })
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def activate_deactivate_manager(self, request_data, current_user, is_active=False):
         """ This method deactivates the turf manager."""
         try:
-            turf_manager_data = is_valid_user(self.db, request_data.id, is_exception=False)
+            turf_manager_data = await is_valid_user(self.db, request_data.id, is_exception=False)
 
-            user_role = self.db.query(Roles).filter(Roles.id == turf_manager_data.role_id).first()
+            user_role = (await self.db.execute(
+                select(Roles).where(Roles.id == turf_manager_data.role_id)
+            )).scalars().first()
             if user_role.role_name != MANAGER_ROLE:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_USER_ACTION)
 
-            valid_turf_details = self.db.query(Turf).join(ManageTurfManager,
-                                                          ManageTurfManager.turf_id == Turf.id).first()
+            valid_turf_details = (await self.db.execute(
+                select(Turf).join(ManageTurfManager, ManageTurfManager.turf_id == Turf.id)
+            )).scalars().first()
 
             if valid_turf_details.turf_owner_id != current_user.user_id:
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=MANAGER_ACTION_NOT_ALLOWED)
@@ -379,8 +497,9 @@ class TurfOwnerService:
             turf_manager_data.updated_by = current_user.user_id
             turf_manager_data.updated_at = datetime.now()
 
-            self.db.commit()
-            self.db.refresh(turf_manager_data)
+            await self.db.commit()
+            await self.db.refresh(turf_manager_data)
+            principal_cache.invalidate(turf_manager_data.id)
 
             return JSONResponse(
                 {
@@ -389,135 +508,103 @@ class TurfOwnerService:
             )
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def get_turf_feedbacks(self, turf_id, current_user):
         """ This method get all the feedback of turf"""
         try:
-            turf_data = is_valid_turf(self.db, turf_id)
+            turf_data = await is_valid_turf(self.db, turf_id)
             self.valid_owner_request(turf_data, current_user)
 
-            feedbacks = (
-                self.db.query(Feedback)
+            feedbacks = (await self.db.execute(
+                select(Feedback)
                 .join(TurfBooking)
-                .filter(TurfBooking.turf_id == turf_id)
+                .where(TurfBooking.turf_id == turf_id)
+                .options(selectinload(Feedback.customer))
                 .order_by(Feedback.created_at)
-                .all()
-            )
+            )).scalars().all()
 
             return feedbacks
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def get_addresses(self, current_user):
         """ This method get all the addresses added by the turf owner."""
         try:
-            addresses = self.db.query(Address).filter(Address.turf_owner_id == current_user.user_id).all()
+            addresses = (await self.db.execute(
+                select(Address)
+                .where(Address.turf_owner_id == current_user.user_id)
+                .options(selectinload(Address.city).selectinload(City.state))
+            )).scalars().all()
 
             return addresses
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
     async def get_turfs(self, current_user):
         try:
-            turfs = self.db.query(Turf).filter(Turf.turf_owner_id == current_user.user_id).all()
+            turfs = (await self.db.execute(
+                select(Turf)
+                .where(Turf.turf_owner_id == current_user.user_id)
+                .options(*self.turf_detail_options())
+            )).scalars().all()
             return turfs
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
 
-    async def get_bookings(self,turf_id, current_user, start_date, end_date, page, size):
+    async def get_bookings(self,turf_id, current_user, start_date, end_date, page, size, cursor = None):
         try:
-            turf_data = is_valid_turf(self.db, turf_id)
-            is_valid_user(self.db, current_user.user_id)
+            turf_data = await is_valid_turf(self.db, turf_id)
+            await is_active_user(self.db, current_user.user_id)
             self.valid_owner_request(turf_data, current_user)
 
             if start_date > end_date:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_END_TIME)
 
-            query = (
-                select(
-                    TurfBooking
-                )
-                .where(
-                    and_(
-                        TurfBooking.turf_id == turf_id,
-                        TurfBooking.reservation_date >= start_date,
-                        TurfBooking.reservation_date <= end_date
-                    )
-                )
-                .order_by(TurfBooking.created_at.desc())
-                .offset((page - 1) * size)
-                .limit(size)
-            )
-            result = self.db.execute(query)
-            turf_booking = result.scalars().all()
+            query = turf_bookings(turf_id, start_date, end_date).options(selectinload(TurfBooking.customer))
+            booking_url = (f"{BASE_URL}/api/v1/turf-owner/get-turf-bookings/{turf_id}?"
+                           f"start_date={start_date.date()}&end_date={end_date.date()}")
+            booking_page = await paginate(self.db, query, TurfBooking, booking_url, page, size, cursor)
 
-            if not turf_booking:
+            if not booking_page.items:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                     detail=NO_DATA_FOUND)
 
-            total_turf_booking = (
-                self.db.query(TurfBooking)
-                .filter(
-                    TurfBooking.turf_id == turf_id,
-                    TurfBooking.reservation_date >= start_date,
-                    TurfBooking.reservation_date <= end_date
-                )
-                .count()
-            )
-
-            # Load environment variables for host/port
-            load_dotenv()
-            HOST = os.environ.get("HOST")
-            PORT = os.environ.get("PORT")
-
-            next_page = (
-                f"http://{HOST}:{PORT}/api/v1/turf-owner/get-bookings/"
-                f"turf_id={turf_id}&start_date={start_date}&end_date={end_date}"
-                f"&page={page + 1}&size={size}"
-                if (page * size) < total_turf_booking else None
-            )
-
-            previous_page = (
-                f"http://{HOST}:{PORT}/api/v1/admin/get-booking-data?"
-                f"turf_id={turf_id}&start_date={start_date}&end_date={end_date}"
-                f"&page={page - 1}&size={size}"
-                if page > 1 else None
-            )
-
             return {
-                BOOKINGS: turf_booking,
-                NEXT_PAGE: next_page,
-                PREV_PAGE: previous_page
+                BOOKINGS: booking_page.items,
+                NEXT_PAGE: booking_page.next_page,
+                PREV_PAGE: booking_page.previous_page,
+                NEXT_CURSOR: booking_page.next_cursor,
+                PREV_CURSOR: booking_page.previous_cursor
             }
 
         except HTTPException as http_exc:
-            self.db.rollback()
+            await self.db.rollback()
             raise http_exc
 
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail=ERROR_MESSAGE.format(str(e)))
\ No newline at end of file
@@ -1,15 +1,17 @@
-import os
 from datetime import timedelta, datetime
 
-from dotenv import load_dotenv
 from fastapi import BackgroundTasks, HTTPException
 from geoalchemy2.shape import from_shape
 from shapely.geometry.point import Point
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import selectinload
 from starlette import status
 from starlette.responses import JSONResponse
 from authentication.hashing import Hash
-from authentication.token_management import create_access_token, verify_access_token
+from authentication.principal_cache import get_principal
+from authentication.revocation_cache import revocation_cache
+from authentication.token_management import create_access_token, verify_access_token, revocation_claims
 from core.constant import (LOGIN_SUB, LOGIN_CONTENT, INVALID_PASSWORD, DETAILS, \
     USER_CREATED, SING_IN, SING_IN_URL, USER_NOT_FOUND, TOKEN_SUB, TOKEN_USER_ID, TOKEN_TYPE, PASSWORD_DOES_NOT_MATCH, \
     PASSWORD_SHOULD_NOT_BE_SAME, PASSWORD_CHANGED, FORGOT_PASSWORD_URL, \
@@ -20,7 +22,7 @@ from core.validations import validate_input, validate_password, validate_login_i
     is_valid_string
 from mail.mail import send_mail
 from models.blacklist_token_model import BlackListToken
-from models.roles_model import Roles
+from models.city_model import City
 from models.user_model import User
 from schemas.user_schemas import Token
 
@@ -33,7 +35,7 @@ class UserService:
     async def get_user(self, email_id, is_exception=True):
         """ This method check user exist or not. If not exist then raise exception"""
 
-        user_data = self.db.query(User).filter(User.email == email_id).first()
+        user_data = (await self.db.execute(select(User).where(User.email == email_id))).scalars().first()
 
         if not user_data and is_exception:
             raise HTTPException(status_code = status.HTTP_404_NOT_FOUND,
@@ -44,10 +46,28 @@ class UserService:
 
         return user_data
 
+    async def get_user_profile(self, email_id):
+        """ This method get user profile along with role and city details."""
+
+        user_data = (await self.db.execute(
+            select(User)
+            .where(User.email == email_id)
+            .options(selectinload(User.role), selectinload(User.city).selectinload(City.state))
+        )).scalars().first()
+
+        if not user_data:
+            raise HTTPException(status_code = status.HTTP_404_NOT_FOUND,
+                                detail = USER_NOT_FOUND)
+
+        if not user_data.is_verified or not user_data.is_active:
+            raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=INVALID_USER)
+
+        return user_data
+
     async def add_user(self, request_data):
         """This method add a new user to the database."""
-        if validate_input(request_data, self.db):
-            encrypted_password = Hash.encrypt(request_data.password)
+        if await validate_input(request_data, self.db):
+            encrypted_password = await Hash.async_encrypt(request_data.password)
             user_data = User(
                 name = request_data.name,
                 contact_no = request_data.contact_no,
@@ -62,8 +82,8 @@ class UserService:
                 geom = from_shape(Point(request_data.long, request_data.lat), srid=4326)
             )
             self.db.add(user_data)
-            self.db.commit()
-            self.db.refresh(user_data)
+            await self.db.commit()
+            await self.db.refresh(user_data)
             return JSONResponse(
                 {
                     DETAILS: USER_CREATED,
@@ -71,27 +91,29 @@ class UserService:
                 }
             )
 
-    def get_role(self, user_id):
+    async def get_role(self, user_id):
         """ This method get role type of user. """
-        query = (
-            select(Roles.role_name)
-            .join(User, User.role_id == Roles.id)
-            .where(User.id == user_id)
-        )
-        result = self.db.execute(query).fetchone()
-        if result:
-            return result[0]
+        principal = await get_principal(self.db, user_id)
+        if principal:
+            return principal.role
 
     async def user_login(self, login_data):
         """ This method authenticate a user and generate an access token."""
         input_email = login_data.username
         input_password = login_data.password
 
-        if validate_login_input(input_email, input_password):
+        if await validate_login_input(input_email, input_password):
             user_data = await self.get_user(input_email)
-            role = self.get_role(user_data.id)
+            role = await self.get_role(user_data.id)
 
-            if Hash.verify_password(input_password, user_data.password):
+            is_valid_password, new_password_hash = await Hash.async_verify_and_update(input_password,
+                                                                                     user_data.password)
+            if is_valid_password:
+
+                # rehash the password if it was hashed with an outdated bcrypt cost
+                if new_password_hash:
+                    user_data.password = new_password_hash
+                    await self.db.commit()
 
                 access_token = create_access_token(
                     data = {
@@ -130,14 +152,14 @@ class UserService:
                 raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST,
                                     detail = PASSWORD_DOES_NOT_MATCH)
 
-            if Hash.verify_password(request_data.current_password, user_data.password):
+            if await Hash.async_verify_password(request_data.current_password, user_data.password):
 
                 if request_data.new_password == request_data.current_password:
                     raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST,
                                         detail = PASSWORD_SHOULD_NOT_BE_SAME)
 
-                self.update_user_password(user_data, request_data.new_password)
-                self.blacklist_token(token)
+                await self.update_user_password(user_data, request_data.new_password)
+                await self.blacklist_token(token)
 
                 return JSONResponse(
                     {
@@ -156,7 +178,7 @@ class UserService:
         """This method handle the forgot password process."""
 
         user_data = await self.get_user(request_data.email)
-        role = self.get_role(user_data.id)
+        role = await self.get_role(user_data.id)
 
         access_token_expires = timedelta(minutes = 3)
         access_token = create_access_token(
@@ -178,21 +200,27 @@ class UserService:
         })
 
 
-    def update_user_password(self, user_data, new_password):
+    async def update_user_password(self, user_data, new_password):
         """ This method updates the user password"""
-        user_data.password = Hash.encrypt(new_password)
-        self.db.commit()
-        self.db.refresh(user_data)
-
-    def blacklist_token(self, token):
-        """ This method blacklist the token by adding it into the database."""
-
-        access_token = BlackListToken(
-            token=token
+        user_data.password = await Hash.async_encrypt(new_password)
+        await self.db.commit()
+        await self.db.refresh(user_data)
+
+    async def blacklist_token(self, token):
+        """ This method revokes the token by storing its id and expiry into the database."""
+
+        claims = revocation_claims(token)
+        if claims is None:
+            return
+
+        jti, expires_at = claims
+        await self.db.execute(
+            insert(BlackListToken)
+            .values(jti = jti, expires_at = expires_at)
+            .on_conflict_do_nothing(index_elements = [BlackListToken.jti])
         )
-        self.db.add(access_token)
-        self.db.commit()
-        self.db.refresh(access_token)
+        await self.db.commit()
+        revocation_cache.add(jti)
 
 
 
@@ -205,15 +233,15 @@ class UserService:
             headers = {WWW_AUTHENTICATE : TOKEN_TYPE},
         )
 
-        token_data = verify_access_token(self.db, token, token_exception)
+        token_data = await verify_access_token(self.db, token, token_exception)
 
         if validate_password(request_data.new_password) and validate_password(request_data.confirm_password):
 
             if request_data.new_password == request_data.confirm_password:
                 user_data = await self.get_user(token_data.email)
 
-                self.update_user_password(user_data, request_data.new_password)
-                self.blacklist_token(token)
+                await self.update_user_password(user_data, request_data.new_password)
+                await self.blacklist_token(token)
 
                 return JSONResponse(
                     {
@@ -228,8 +256,8 @@ class UserService:
 
     async def logout_current_user(self, tokens):
         """ This method logout the current user."""
-        self.blacklist_token(tokens.access_token)
-        self.blacklist_token(tokens.refresh_token)
+        await self.blacklist_token(tokens.access_token)
+        await self.blacklist_token(tokens.refresh_token)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -256,7 +284,7 @@ class UserService:
             data={
                     TOKEN_SUB: user_data.email,
                     TOKEN_USER_ID: str(user_data.id),
-                    ROLE_TYPE: self.get_role(user_data.id)
+                    ROLE_TYPE: await self.get_role(user_data.id)
             },
             expires_delta=access_token_expires
         )
@@ -265,7 +293,7 @@ class UserService:
             data={
                 TOKEN_SUB: user_data.email,
                 TOKEN_USER_ID: str(user_data.id),
-                ROLE_TYPE: self.get_role(user_data.id)
+                ROLE_TYPE: await self.get_role(user_data.id)
             }
         )
 
@@ -301,8 +329,8 @@ class UserService:
 
             user_data.updated_by = current_user.user_id
             user_data.updated_at = datetime.now()
-            self.db.commit()
-            self.db.refresh(user_data)
+            await self.db.commit()
+            await self.db.refresh(user_data)
 
             return JSONResponse(
                 {
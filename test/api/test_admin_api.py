@@ -1,14 +1,17 @@
+import asyncio
 import uuid
 from datetime import date, datetime
 from unittest.mock import patch
 
 import pytest
+from fastapi import HTTPException
 from sqlalchemy import select, and_
 
 from core.constant import GAME_ADDED_SUCCESS, GAME_ALREADY_EXISTS, NOT_ALLOWED, GAME_NAME_UPDATED, INVALID_GAME_ID, \
     TURF_OWNER_ACTIVATION_UPDATED, USER_NOT_FOUND, TURF_ACTIVATION_UPDATED, INVALID_TURF_ID, \
     NO_TURF_FOUND, NO_DATA_FOUND
-from core.database import TestSessionLocal
+from core.database import TestSessionLocal, TestAsyncSessionLocal, DB_POOL_SIZE, DB_MAX_OVERFLOW
+from core.validations import is_active_user
 from models.game_model import Game
 from models.revenue_model import Revenue
 from models.turf_booking import TurfBooking
@@ -148,6 +151,27 @@ def test_get_all_games(client, header, admin_token):
                 assert resp_item == expected_item
 
 
+def test_get_all_games_from_reference_catalog(client, header, admin_token, query_counter):
+    """ This function test get all games API reads the reference catalog, which is reloaded after a game is added."""
+    header["Authorization"] = f"Bearer {admin_token}"
+    assert client.get("/api/v1/admin/get-games", headers=header).status_code == 200
+
+    query_counter.clear()
+    assert client.get("/api/v1/admin/get-games", headers=header).status_code == 200
+    assert not [statement for statement in query_counter if "FROM game" in statement]
+
+    response = client.post("/api/v1/admin/add-game", json={"game_name": "squash", "is_active": True}, headers=header)
+    assert response.status_code == 200, response.text
+
+    response = client.get("/api/v1/admin/get-games", headers=header)
+    assert response.status_code == 200
+    assert {"game_name": "squash", "is_active": True} in response.json()
+
+    with TestSessionLocal() as db_session:
+        db_session.query(Game).filter(Game.game_name == "squash").delete()
+        db_session.commit()
+
+
 def test_get_all_games_with_customer_token(client, header, customer_token):
     """ This function test get all games API with customer token. """
     header["Authorization"] = f"Bearer {customer_token}"
@@ -210,6 +234,13 @@ def test_approve_turf_owner_with_customer_token(client, header, customer_token,
 def test_deactivate_turf_owner(client, header, admin_token, create_turf_owner):
     """ This function test deactivate turf owner API."""
 
+    async def check_turf_owner():
+        async with TestAsyncSessionLocal() as db:
+            return await is_active_user(db, create_turf_owner[2].id)
+
+    # cache the active turf owner before deactivation
+    assert asyncio.run(check_turf_owner()).is_active
+
     header["Authorization"] = f"Bearer {admin_token}"
     payload = {"id" : f"{create_turf_owner[2].id}"}
 
@@ -224,6 +255,11 @@ def test_deactivate_turf_owner(client, header, admin_token, create_turf_owner):
     if response.status_code == 200:
         assert response.json()["Details"] == TURF_OWNER_ACTIVATION_UPDATED
 
+    # deactivation must not be hidden by the cached principal
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_turf_owner())
+    assert exc_info.value.status_code == 401
+
 
 def test_approve_turf(client, header, admin_token, second_turf):
     """ This function test approve turf API. """
@@ -525,3 +561,30 @@ def test_update_game_data_with_exception_to_check_db_rollback(client, admin_toke
         with TestSessionLocal() as db_session:
             game_data = db_session.query(Game).filter(Game.id == game.id).one()
             assert game_data.game_name != update_game_payload["game_name"]
+
+
+def test_get_pool_stats(client, header, admin_token):
+    """ This function test get database pool statistics API. """
+    header["Authorization"] = f"Bearer {admin_token}"
+    response = client.get(
+        "/api/v1/admin/pool-stats",
+        headers=header
+    )
+    assert response.status_code == 200, response.text
+
+    data = response.json()
+    assert data["pool_size"] == DB_POOL_SIZE
+    assert data["max_overflow"] == DB_MAX_OVERFLOW
+    assert data["checked_out"] >= 0
+    assert data["waits"] >= 0
+
+
+def test_get_pool_stats_with_customer_token(client, header, customer_token):
+    """ This function test get database pool statistics API with customer's token. """
+    header["Authorization"] = f"Bearer {customer_token}"
+    response = client.get(
+        "/api/v1/admin/pool-stats",
+        headers=header
+    )
+    assert response.status_code == 401
+    assert response.json()["detail"] == NOT_ALLOWED
@@ -1,31 +1,40 @@
 import os
 import uuid
-from datetime import date, datetime
-from unittest.mock import patch
+from datetime import date, datetime, timedelta
+from unittest.mock import patch, AsyncMock
 from uuid import UUID
 
 import jwt
 import pytest
 from dotenv import load_dotenv
 from geoalchemy2.functions import ST_DistanceSphere
-from sqlalchemy import select, exists
+from geoalchemy2.shape import from_shape
+from shapely.geometry.point import Point
+from sqlalchemy import select, exists, delete
 from sqlalchemy.orm import aliased
 
-from core.constant import INVALID_GAME_ID, INVALID_START_TIME, INVALID_END_TIME_OVERNIGHT, \
+from core.constant import INVALID_GAME_ID, INVALID_RADIUS, INVALID_WINDOW, INVALID_START_TIME, INVALID_END_TIME_OVERNIGHT, \
     INVALID_DATE, MAXIMUM_ADVANCE_DAYS_ERROR, TURF_BOOKED, INVALID_TURF_ID, INVALID_SLOT_TIME, INVALID_END_TIME, \
     INVALID_BOOKING_TIME, TURF_SLOT_ALREADY_BOOKED, TURF_UPDATE_SUCCESS, NOT_ALLOWED_TO_UPDATE, BOOKING_NOT_FOUND, \
     BOOKING_ACTION_NOT_ALLOWED, UPDATE_NOT_ALLOWED, UPDATE_BEFORE_ONE_HOUR, NO_BOOKING_FOUND, \
     END_TIME_UPDATE_NOT_ALLOWED, BOOKING_CANCELLED, NOT_ALLOWED_TO_CANCEL, FEEDBACK_ADDED, INVALID_FEEDBACK_INPUT, \
-    NOT_ALLOWED, FEEDBACK_NOT_ALLOWED
+    NOT_ALLOWED, FEEDBACK_NOT_ALLOWED, INVALID_CURSOR
 from core.database import TestSessionLocal
+from core.search_cache import search_cache
 from models.address_model import Address
+from models.discount_model import Discount
 from models.feedback_model import Feedback
+from models.game_model import Game
+from models.media_model import Media
 from models.turf_booking import TurfBooking
+from models.turf_slot_occupancy_model import TurfSlotOccupancy
 from models.turf_model import Turf
 from models.user_model import User
 from schemas.customer_schemas import BookingSchema
 from services.customer_service import CustomerService
 from test.api.conftest import header
+from test.test_data.owner_json_data import address_valid_payload, turf_api_data
+from test.test_data.user_json_data import user_data_payload
 from test.test_data.customer_json_data import valid_turf_booking_payload, turf_booking_payload_invalid_turf_id, \
     turf_booking_payload_with_past_reservation_date, turf_booking_payload_with_date_more_than_30_days, \
     turf_booking_payload_with_start_time_not_in_format, turf_booking_payload_with_past_start_time, \
@@ -99,7 +108,7 @@ def test_show_turf_data(test_db, client, customer_token, header):
                 address_alias.city_id == customer_data.city_id,
                 ~exists(booked_turf_subquery.where(TurfBooking.turf_id == Turf.id)),
             )
-            .order_by("distance_km")
+            .order_by(ST_DistanceSphere(address_alias.geom, customer_geom), Turf.id)
             .offset((page - 1) * size)
             .limit(size)
         )
@@ -122,6 +131,266 @@ def test_show_turf_data(test_db, client, customer_token, header):
             assert round(returned_turf["distance_turf"], 2) == round(expected_distance, 2)
 
 
+@pytest.mark.parametrize(
+    "radius_km, is_turf_found",
+    [
+        (50, True),
+        (0.5, False)
+    ]
+)
+def test_show_turf_data_within_radius(client, customer_token, header, turf, radius_km, is_turf_found):
+    """ Test the show turf API only returns the turfs within the given radius of the customer."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    booking_date = date.today() + timedelta(days=1)
+
+    response = client.get(
+        f"/api/v1/customer/get-turf-data/{turf.game_id}"
+        f"/{booking_date}/{booking_date} 16:00:00/{booking_date} 20:00:00"
+        f"?page=1&size=3&radius_km={radius_km}",
+        headers=header,
+    )
+
+    assert response.status_code == 200, response.text
+    turf_names = [turf_data["turf_name"] for turf_data in response.json()["turf_data"]]
+    assert (turf.turf_name in turf_names) == is_turf_found
+    assert all(turf_data["distance_turf"] <= radius_km for turf_data in response.json()["turf_data"])
+
+
+@pytest.fixture
+def north_and_east_turfs(create_turf_owner, turf):
+    """ Add a turf 0.1 degree north and one 0.105 degree east of the customer, the east one is the nearer on the
+        sphere while the north one is the nearer in degrees."""
+    with TestSessionLocal() as db_session:
+        turfs = {}
+        for direction, lat, long in [
+            ("north", user_data_payload["lat"] + 0.1, user_data_payload["long"]),
+            ("east", user_data_payload["lat"], user_data_payload["long"] + 0.105)
+        ]:
+            address_data = Address(**{
+                **address_valid_payload, "lat": lat, "long": long, "turf_owner_id": str(create_turf_owner[0].id)
+            })
+            address_data.geom = from_shape(Point(long, lat), srid=4326)
+            db_session.add(address_data)
+            db_session.flush()
+
+            turfs[direction] = Turf(**{
+                **turf_api_data, "turf_name": f"Turf {direction}", "game_id": turf.game_id,
+                "address_id": address_data.id, "turf_owner_id": create_turf_owner[0].id
+            })
+            db_session.add(turfs[direction])
+        db_session.commit()
+
+    yield turfs
+
+    with TestSessionLocal() as db_session:
+        db_session.execute(delete(Turf).where(Turf.id.in_([turf_data.id for turf_data in turfs.values()])))
+        db_session.execute(delete(Address).where(Address.id.in_([turf_data.address_id for turf_data in turfs.values()])))
+        db_session.commit()
+
+
+def test_show_turf_data_ordered_by_sphere_distance(client, customer_token, header, north_and_east_turfs):
+    """ Test the show turf API orders the turfs by their distance on the sphere and not in degrees, which
+        stretches the east-west distances away from the equator."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    booking_date = date.today() + timedelta(days=1)
+
+    response = client.get(
+        f"/api/v1/customer/get-turf-data/{north_and_east_turfs['north'].game_id}"
+        f"/{booking_date}/{booking_date} 16:00:00/{booking_date} 20:00:00"
+        f"?page=1&size=100",
+        headers=header,
+    )
+
+    assert response.status_code == 200, response.text
+    turf_data = response.json()["turf_data"]
+    assert [turf["distance_turf"] for turf in turf_data] == sorted(turf["distance_turf"] for turf in turf_data)
+    turf_names = [turf["turf_name"] for turf in turf_data]
+    assert turf_names.index("Turf east") < turf_names.index("Turf north")
+
+
+@pytest.mark.parametrize("search_mode", ["count", "has_more"])
+def test_show_turf_data_search_modes(client, customer_token, header, turf, search_mode):
+    """ Test the show turf API returns the page and its pagination from a single search query."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    booking_date = date.today() + timedelta(days=1)
+
+    response = client.get(
+        f"/api/v1/customer/get-turf-data/{turf.game_id}"
+        f"/{booking_date}/{booking_date} 16:00:00/{booking_date} 20:00:00"
+        f"?page=1&size=1&search_mode={search_mode}",
+        headers=header,
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert len(data["turf_data"]) == 1
+    assert data["previous_page"] is None
+
+    if search_mode == "count":
+        assert data["total_count"] >= 1
+        assert (data["next_page"] is not None) == (data["total_count"] > 1)
+    else:
+        assert data["total_count"] is None
+        if data["next_page"]:
+            assert "search_mode=has_more" in data["next_page"]
+
+
+def test_show_turf_data_with_invalid_radius(client, customer_token, header, turf):
+    """ Test the show turf API with a radius which is not positive."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    booking_date = date.today() + timedelta(days=1)
+
+    response = client.get(
+        f"/api/v1/customer/get-turf-data/{turf.game_id}"
+        f"/{booking_date}/{booking_date} 16:00:00/{booking_date} 20:00:00"
+        f"?page=1&size=3&radius_km=0",
+        headers=header,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == INVALID_RADIUS
+
+
+def test_show_turf_data_free_windows(client, customer_token, create_customer, header, turf):
+    """ Test the show turf API returns the free windows of each turf for a flexible time range."""
+    booking_date = date.today() + timedelta(days=6)
+    with TestSessionLocal() as db_session:
+        db_session.add(TurfBooking(
+            customer_id=create_customer[1].id,
+            turf_id=turf.id,
+            reservation_date=datetime.combine(booking_date, datetime.min.time()),
+            start_time=datetime.combine(booking_date, datetime.min.time()) + timedelta(hours=19),
+            end_time=datetime.combine(booking_date, datetime.min.time()) + timedelta(hours=20),
+            booking_status="confirm",
+            payment_status="unpaid",
+            total_amount=1200
+        ))
+        db_session.commit()
+
+    header["Authorization"] = f"Bearer {customer_token}"
+    response = client.get(
+        f"/api/v1/customer/get-turf-data/{turf.game_id}"
+        f"/{booking_date}/{booking_date} 18:00:00/{booking_date} 23:00:00"
+        f"?page=1&size=10&window_minutes=120",
+        headers=header,
+    )
+
+    assert response.status_code == 200, response.text
+    turf_data = next(data for data in response.json()["turf_data"] if data["turf_name"] == turf.turf_name)
+    assert [window["start_time"] for window in turf_data["free_windows"]] == [
+        f"{booking_date}T20:00:00", f"{booking_date}T20:30:00", f"{booking_date}T21:00:00"
+    ]
+
+
+@pytest.mark.parametrize("window_minutes", [30, 105, 300])
+def test_show_turf_data_with_invalid_window(client, customer_token, header, turf, window_minutes):
+    """ Test the show turf API with a window which does not fit the slots or the time range."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    booking_date = date.today() + timedelta(days=1)
+
+    response = client.get(
+        f"/api/v1/customer/get-turf-data/{turf.game_id}"
+        f"/{booking_date}/{booking_date} 16:00:00/{booking_date} 20:00:00"
+        f"?page=1&size=3&window_minutes={window_minutes}",
+        headers=header,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == INVALID_WINDOW
+
+
+def test_show_turf_data_cache_invalidated_by_booking(client, customer_token, create_customer, header, turf):
+    """ Test the show turf API serves a repeated search from the cache until a booking of that day changes it."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    booking_date = date.today() + timedelta(days=9)
+    url = (f"/api/v1/customer/get-turf-data/{turf.game_id}"
+           f"/{booking_date}/{booking_date} 10:00:00/{booking_date} 12:00:00?page=1&size=10")
+
+    def found_turf_names():
+        response = client.get(url, headers=header)
+        assert response.status_code == 200, response.text
+        return [data["turf_name"] for data in response.json()["turf_data"]]
+
+    assert turf.turf_name in found_turf_names()
+
+    # a booking which does not go through the API is not seen until the cached search expires
+    with TestSessionLocal() as db_session:
+        db_session.add(TurfBooking(
+            customer_id=create_customer[1].id,
+            turf_id=turf.id,
+            reservation_date=datetime.combine(booking_date, datetime.min.time()),
+            start_time=datetime.combine(booking_date, datetime.min.time()) + timedelta(hours=10),
+            end_time=datetime.combine(booking_date, datetime.min.time()) + timedelta(hours=11),
+            booking_status="confirm",
+            payment_status="unpaid",
+            total_amount=1200
+        ))
+        db_session.commit()
+
+    assert turf.turf_name in found_turf_names()
+
+    response = client.post("/api/v1/customer/book-turf", headers=header, json={
+        "turf_id": str(turf.id),
+        "reservation_date": str(booking_date),
+        "start_time": f"{booking_date} 11:00:00",
+        "end_time": f"{booking_date} 12:00:00"
+    })
+    assert response.status_code == 200, response.text
+
+    assert turf.turf_name not in found_turf_names()
+
+
+def test_show_turf_data_cache_scoped_to_city_game_and_day(client, customer_token, header, turf, query_counter):
+    """ Test a repeated search skips the free turf query, and only a booking of a turf of the same city,
+        game and day drops the cached search."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    booking_date = date.today() + timedelta(days=11)
+    url = (f"/api/v1/customer/get-turf-data/{turf.game_id}"
+           f"/{booking_date}/{booking_date} 10:00:00/{booking_date} 12:00:00?page=1&size=10")
+
+    with TestSessionLocal() as db_session:
+        other_game = db_session.query(Game).filter(Game.id != turf.game_id).first()
+        other_game_turf = Turf(
+            turf_name="Other game turf",
+            description=turf.description,
+            amenities=turf.amenities,
+            booking_price=turf.booking_price,
+            is_active=True,
+            is_verified=True,
+            address_id=turf.address_id,
+            game_id=other_game.id,
+            turf_owner_id=turf.turf_owner_id
+        )
+        db_session.add(other_game_turf)
+        db_session.commit()
+        other_game_turf_id = other_game_turf.id
+
+    def search_statements():
+        query_counter.clear()
+        response = client.get(url, headers=header)
+        assert response.status_code == 200, response.text
+        return [statement for statement in query_counter if "turf_slot_occupancy" in statement]
+
+    assert len(search_statements()) == 1
+    assert search_statements() == []
+
+    def book(turf_id, hour):
+        response = client.post("/api/v1/customer/book-turf", headers=header, json={
+            "turf_id": str(turf_id),
+            "reservation_date": str(booking_date),
+            "start_time": f"{booking_date} {hour}:00:00",
+            "end_time": f"{booking_date} {hour + 1}:00:00"
+        })
+        assert response.status_code == 200, response.text
+
+    # a booking of another game in the same city and day keeps the cached search
+    book(other_game_turf_id, 10)
+    assert search_statements() == []
+
+    book(turf.id, 16)
+    assert len(search_statements()) == 1
+
+
 def test_show_turf_with_invalid_game_id(client, customer_token, header):
     """ Test the show turf API with invalid game id."""
 
@@ -234,6 +503,47 @@ def test_show_turf_with_booking_data_more_than_30_days(client, customer_token, h
     assert response.json()["detail"] == MAXIMUM_ADVANCE_DAYS_ERROR
 
 
+def test_turf_quote(client, customer_token, header, turf):
+    """ Test the turf quote API prices every slot by the half hour, less the active discount of the turf."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    quote_date = date.today() + timedelta(days=3)
+    slots = [
+        {"start_time": f"{quote_date}T10:00:00", "end_time": f"{quote_date}T11:00:00"},
+        {"start_time": f"{quote_date}T18:00:00", "end_time": f"{quote_date}T19:30:00"}
+    ]
+
+    response = client.post("/api/v1/customer/turf-quote", headers=header,
+                           json={"turf_id": str(turf.id), "slots": slots})
+
+    assert response.status_code == 200, response.text
+    with TestSessionLocal() as db_session:
+        discount = db_session.query(Discount).filter(Discount.turf_id == turf.id, Discount.is_active == True).first()
+    discount_amount = discount.discount_amount if discount else 0
+    assert [quote["amount"] for quote in response.json()["quotes"]] == [
+        turf.booking_price - discount_amount, int(1.5 * turf.booking_price) - discount_amount
+    ]
+
+
+@pytest.mark.parametrize(
+    "slot, expected_details",
+    [
+        ({"start_time": "10:15:00", "end_time": "11:15:00"}, INVALID_SLOT_TIME),
+        ({"start_time": "10:00:00", "end_time": "10:30:00"}, INVALID_BOOKING_TIME)
+    ]
+)
+def test_turf_quote_with_invalid_slot(client, customer_token, header, turf, slot, expected_details):
+    """ Test the turf quote API rejects the slots which could not be booked."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    quote_date = date.today() + timedelta(days=3)
+    slots = [{"start_time": f"{quote_date}T{slot['start_time']}", "end_time": f"{quote_date}T{slot['end_time']}"}]
+
+    response = client.post("/api/v1/customer/turf-quote", headers=header,
+                           json={"turf_id": str(turf.id), "slots": slots})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == expected_details
+
+
 @pytest.mark.parametrize(
     "booking_payload, expected_status, expected_details",
     [
@@ -275,6 +585,22 @@ def test_book_turf(client, turf, booking_payload, expected_status, expected_deta
         assert response.json()["detail"] == expected_details
 
 
+def test_book_turf_concurrent_slot_conflict(client, turf, header, customer_token):
+    """ test that the database rejects an overlapping booking which passed the conflict check of a concurrent request"""
+    header["Authorization"] = f"Bearer {customer_token}"
+    turf_booking_payload_with_already_booked_slot["turf_id"] = str(turf.id)
+
+    with patch("services.customer_service.CustomerService.validate_booking_data", new_callable=AsyncMock):
+        response = client.post(
+            "/api/v1/customer/book-turf",
+            headers=header,
+            json=turf_booking_payload_with_already_booked_slot,
+        )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == TURF_SLOT_ALREADY_BOOKED
+
+
 def test_turf_booking_with_invalid_turf_id(client, customer_token, header):
     """ This function test the turf booking API with invalid turf id """
 
@@ -422,6 +748,40 @@ def test_show_turf_booking_history(client, customer_token, header, turf_booking)
                 assert resp_item == expected_item
 
 
+def test_show_turf_booking_history_with_cursor(client, customer_token, header, turf_booking):
+    """ test walking the booking history forward and backward with the page cursors."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    url = "/api/v1/customer/show-turf-booking"
+    all_bookings = client.get(url, params={"size": 100}, headers=header).json()["bookings"]
+
+    response = client.get(url, params={"size": 1}, headers=header)
+    pages = [response.json()]
+    while pages[-1]["next_cursor"]:
+        response = client.get(url, params={"size": 1, "cursor": pages[-1]["next_cursor"]}, headers=header)
+        assert response.status_code == 200
+        pages.append(response.json())
+
+    assert [page["bookings"][0] for page in pages] == all_bookings
+    assert pages[0]["previous_cursor"] is None
+    assert pages[-1]["next_page"] is None
+
+    response = client.get(url, params={"size": 1, "cursor": pages[-1]["previous_cursor"]}, headers=header)
+    assert response.status_code == 200
+    assert response.json()["bookings"] == pages[-2]["bookings"]
+
+
+def test_show_turf_booking_history_with_invalid_cursor(client, customer_token, header, turf_booking):
+    """ test the show turf booking history API with a tampered cursor."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    response = client.get(
+        "/api/v1/customer/show-turf-booking",
+        params={"cursor": "not-a-cursor"},
+        headers=header
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == INVALID_CURSOR
+
+
 def test_show_turf_with_customer_not_having_booking(client, customer_2_token, header, turf_booking):
     """ test the show turf booking history API of customer not having any booking."""
     header["Authorization"] = f"Bearer {customer_2_token}"
@@ -510,6 +870,92 @@ def test_cancel_booking(client, customer_token, header, turf_booking):
 
 
 
+def test_book_cancelled_slot(client, customer_token, customer_2_token, header, turf):
+    """ test that a cancelled booking releases its slot for the other customers."""
+    reservation_date = (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d")
+    booking_payload = {
+        "turf_id": str(turf.id),
+        "reservation_date": reservation_date,
+        "start_time": f"{reservation_date} 06:00:00",
+        "end_time": f"{reservation_date} 08:00:00"
+    }
+
+    header["Authorization"] = f"Bearer {customer_token}"
+    response = client.post("/api/v1/customer/book-turf", headers=header, json=booking_payload)
+    assert response.status_code == 200
+
+    response = client.post("/api/v1/customer/cancel-bookings", headers=header, json={"id": response.json()["id"]})
+    assert response.status_code == 200
+
+    header["Authorization"] = f"Bearer {customer_2_token}"
+    response = client.post("/api/v1/customer/book-turf", headers=header, json=booking_payload)
+    assert response.status_code == 200
+    assert response.json()["Details"] == TURF_BOOKED
+
+
+def test_booking_updates_slot_occupancy(client, customer_token, header, turf):
+    """ test that booking and cancelling a turf sets and clears its slots in the occupancy bitmap."""
+    reservation_date = (datetime.now() + timedelta(days=4)).date()
+    header["Authorization"] = f"Bearer {customer_token}"
+    response = client.post("/api/v1/customer/book-turf", headers=header, json={
+        "turf_id": str(turf.id),
+        "reservation_date": str(reservation_date),
+        "start_time": f"{reservation_date} 09:00:00",
+        "end_time": f"{reservation_date} 10:30:00"
+    })
+    assert response.status_code == 200
+
+    def occupied_slots():
+        with TestSessionLocal() as db_session:
+            return db_session.query(TurfSlotOccupancy.occupied).filter(
+                TurfSlotOccupancy.turf_id == turf.id,
+                TurfSlotOccupancy.slot_date == reservation_date
+            ).scalar()
+
+    # slots 18, 19 and 20 start at 09:00, 09:30 and 10:00
+    assert occupied_slots() == 0b111 << 18
+
+    response = client.post("/api/v1/customer/cancel-bookings", headers=header, json={"id": response.json()["id"]})
+    assert response.status_code == 200
+    assert occupied_slots() == 0
+
+
+def test_show_turf_availability(client, customer_token, header, turf):
+    """ test the slot grid of a turf and re-polling it with the ETag."""
+    reservation_date = (datetime.now() + timedelta(days=5)).date()
+    header["Authorization"] = f"Bearer {customer_token}"
+    response = client.post("/api/v1/customer/book-turf", headers=header, json={
+        "turf_id": str(turf.id),
+        "reservation_date": str(reservation_date),
+        "start_time": f"{reservation_date} 20:00:00",
+        "end_time": f"{reservation_date} 21:00:00"
+    })
+    assert response.status_code == 200
+
+    url = f"/api/v1/customer/turf-availability/{turf.id}"
+    response = client.get(url, headers=header, params={"start_date": str(reservation_date), "days": 2})
+    assert response.status_code == 200
+    days = response.json()["days"]
+    assert [day["slot_date"] for day in days] == [str(reservation_date), str(reservation_date + timedelta(days=1))]
+    # slots 40 and 41 start at 20:00 and 20:30
+    assert [slot for slot, is_free in enumerate(days[0]["slots"]) if not is_free] == [40, 41]
+    assert all(days[1]["slots"])
+
+    response = client.get(url, headers={**header, "If-None-Match": response.headers["ETag"]},
+                          params={"start_date": str(reservation_date), "days": 2})
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize("start_date, days", [(date.today() - timedelta(days=1), 1), (date.today(), 0),
+                                              (date.today(), 32)])
+def test_show_turf_availability_with_invalid_range(client, customer_token, header, turf, start_date, days):
+    """ test the slot grid of a turf outside of the booking window."""
+    header["Authorization"] = f"Bearer {customer_token}"
+    response = client.get(f"/api/v1/customer/turf-availability/{turf.id}", headers=header,
+                          params={"start_date": str(start_date), "days": days})
+    assert response.status_code == 400
+
+
 def test_cancel_past_booking(client, customer_token, header, turf_booking):
     """ This function test the cancel booking with past booking id. """
     header["Authorization"] = f"Bearer {customer_token}"
@@ -718,7 +1164,7 @@ def test_unexpected_exception_handling_show_turf(client, customer_token, header)
 
 def test_unexpected_exception_book_turf(client, turf, customer_token, header):
 
-    with patch("services.customer_service.is_valid_turf", side_effect=Exception("Unexpected Error")):
+    with patch("services.customer_service.load_turf_pricing", side_effect=Exception("Unexpected Error")):
         header["Authorization"] = f"Bearer {customer_token}"
         valid_turf_booking_payload["turf_id"] = str(turf.id)
 
@@ -729,3 +1175,44 @@ def test_unexpected_exception_book_turf(client, turf, customer_token, header):
         )
     assert response.status_code == 500
     assert "Unexpected Error" in response.text
+
+
+def test_show_turf_data_query_count(client, customer_token, header, turf, query_counter):
+    """ Test the show turf API issues the same number of queries whatever the page size."""
+    with TestSessionLocal() as db_session:
+        for index in range(4):
+            nearby_turf = Turf(
+                turf_name=f"Nearby turf {index}",
+                description=turf.description,
+                amenities=turf.amenities,
+                booking_price=turf.booking_price,
+                is_active=True,
+                is_verified=True,
+                address_id=turf.address_id,
+                game_id=turf.game_id,
+                turf_owner_id=turf.turf_owner_id
+            )
+            db_session.add(nearby_turf)
+            db_session.flush()
+            db_session.add(Media(turf_id=nearby_turf.id, media_url=f"media/nearby_turf_{index}.jpg"))
+        db_session.commit()
+
+    header["Authorization"] = f"Bearer {customer_token}"
+    booking_date = date.today() + timedelta(days=1)
+    url = (f"/api/v1/customer/get-turf-data/{turf.game_id}"
+           f"/{booking_date}/{booking_date} 16:00:00/{booking_date} 20:00:00")
+
+    # warm up the authentication caches, so that only the search queries are compared
+    assert client.get(f"{url}?page=1&size=1", headers=header).status_code == 200
+
+    query_count = {}
+    for size in (1, 5):
+        # the warm up cached the free turfs, so the search query itself would not run
+        search_cache.clear()
+        query_counter.clear()
+        response = client.get(f"{url}?page=1&size={size}", headers=header)
+        assert response.status_code == 200, response.text
+        assert len(response.json()["turf_data"]) == min(size, response.json()["total_count"])
+        query_count[size] = len(query_counter)
+
+    assert query_count[1] == query_count[5]
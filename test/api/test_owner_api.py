@@ -1,6 +1,6 @@
 import os
 import uuid
-from datetime import date
+from datetime import date, timedelta
 from io import BytesIO
 from unittest.mock import patch
 import jwt
@@ -16,7 +16,8 @@ from core.constant import INVALID_AMOUNT, INVALID_STRING_INPUT, TURF_NAME_ALREAD
     INVALID_GAME_ID, TURF_ADDRESS_ADDED, INVALID_CITY_ID, TURF_DATA_UPDATED, INVALID_TURF_ID, NOT_ALLOWED, \
     TURF_DISCOUNT_DEACTIVATED, TURF_DISCOUNT_ADDED, INVALID_DISCOUNT_ID, TURF_DEACTIVATED, DETAILS, \
     MANAGER_ACTIVATION_UPDATED, INVALID_USER_ACTION, MANAGER_ACTION_NOT_ALLOWED, USER_NOT_FOUND, \
-    INVALID_ADDRESS_SELECTION, INVALID_ADDRESS_ID, INVALID_DISCOUNT_AMOUNT, DISCOUNT_EXPIRED
+    INVALID_ADDRESS_SELECTION, INVALID_ADDRESS_ID, INVALID_DISCOUNT_AMOUNT, DISCOUNT_EXPIRED, PRICING_RULE_ADDED, \
+    PRICING_RULE_DEACTIVATED, INVALID_PRICING_RULE
 from core.database import TestSessionLocal
 from models.address_model import Address
 from models.manage_turf_manager_model import ManageTurfManager
@@ -345,6 +346,76 @@ def test_add_discount_with_invalid_turf_id(client, owner_1_token, turf, header):
     assert response.status_code == 404, response.text
     assert response.json()["detail"] == INVALID_TURF_ID
 
+def test_pricing_rule_changes_quote(client, turf, owner_1_token, customer_token, header):
+    """ This function tests a pricing rule raises the price of the slots it covers until it is deactivated."""
+    quote_date = date.today() + timedelta(days=4)
+    quote_payload = {
+        "turf_id": str(turf.id),
+        "slots": [
+            {"start_time": f"{quote_date}T18:00:00", "end_time": f"{quote_date}T19:00:00"},
+            {"start_time": f"{quote_date}T10:00:00", "end_time": f"{quote_date}T11:00:00"}
+        ]
+    }
+
+    def quote_amounts():
+        header["Authorization"] = f"Bearer {customer_token}"
+        response = client.post("/api/v1/customer/turf-quote", json=quote_payload, headers=header)
+        assert response.status_code == 200, response.text
+        return [quote["amount"] for quote in response.json()["quotes"]]
+
+    def pricing_version():
+        with TestSessionLocal() as db_session:
+            return db_session.get(Turf, turf.id).pricing_version
+
+    base_amounts = quote_amounts()
+    base_version = pricing_version()
+
+    header["Authorization"] = f"Bearer {owner_1_token}"
+    response = client.post(
+        "/api/v1/turf-owner/add-pricing-rule",
+        json={"turf_id": str(turf.id), "weekdays": [quote_date.weekday()], "start_time": "17:00:00",
+              "end_time": "22:00:00", "price_percent": 150},
+        headers=header,
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["Details"] == PRICING_RULE_ADDED
+    pricing_rule_id = response.json()["id"]
+    assert pricing_version() == base_version + 1
+
+    prime_time_amount, morning_amount = quote_amounts()
+    assert prime_time_amount == base_amounts[0] + turf.booking_price // 2
+    assert morning_amount == base_amounts[1]
+
+    header["Authorization"] = f"Bearer {owner_1_token}"
+    response = client.post("/api/v1/turf-owner/deactivate-pricing-rule", json={"id": pricing_rule_id}, headers=header)
+    assert response.status_code == 200, response.text
+    assert response.json()["Details"] == PRICING_RULE_DEACTIVATED
+    assert pricing_version() == base_version + 2
+
+    assert quote_amounts() == base_amounts
+
+
+@pytest.mark.parametrize(
+    "rule_payload",
+    [
+        {"weekdays": [7], "start_time": "17:00:00", "end_time": "22:00:00", "price_percent": 150},
+        {"weekdays": [4], "start_time": "17:15:00", "end_time": "22:00:00", "price_percent": 150},
+        {"weekdays": [4], "start_time": "22:00:00", "end_time": "17:00:00", "price_percent": 150},
+        {"weekdays": [4], "start_time": "17:00:00", "end_time": "22:00:00", "price_percent": 5000}
+    ]
+)
+def test_add_invalid_pricing_rule(client, turf, owner_1_token, header, rule_payload):
+    """ This function tests the add pricing rule with invalid days, times or price."""
+    header["Authorization"] = f"Bearer {owner_1_token}"
+    response = client.post(
+        "/api/v1/turf-owner/add-pricing-rule",
+        json={"turf_id": str(turf.id), **rule_payload},
+        headers=header,
+    )
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == INVALID_PRICING_RULE
+
+
 def test_deactivate_discount_with_other_user_token(client, owner_2_token, discount, header):
     """ This function tests the deactivate turf discount with invalid token. """
     header["Authorization"] = f"Bearer {owner_2_token}"
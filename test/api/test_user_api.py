@@ -1,9 +1,15 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 import jwt
 import pytest
 import os
 from dotenv import load_dotenv
-from core.database import TestSessionLocal
+from passlib.hash import bcrypt
+from sqlalchemy import text
+from core.database import TestSessionLocal, TestAsyncSessionLocal
+from models.blacklist_token_model import BlackListToken
 from models.roles_model import Roles
 from models.user_model import User
 from test.conftest import test_db
@@ -14,7 +20,11 @@ from test.test_data.user_json_data import (user_data_payload, user_login_payload
                                            reset_password_payload, invalid_password_user_payload,
                                            invalid_contact_no_payload, invalid_mail_user_payload, invalid_role_id,
                                            invalid_city_id, user_data_api_payload)
-from authentication.hashing import Hash
+from authentication.hashing import Hash, BCRYPT_MIN_ROUNDS
+from authentication.revocation_cache import revocation_cache, purge_expired_revocations
+from authentication.token_management import create_access_token, backfill_legacy_revocations, \
+    LEGACY_REVOCATION_TABLE
+from core.constant import TOKEN_SUB, TOKEN_USER_ID, ROLE_TYPE
 
 
 @pytest.mark.parametrize(
@@ -86,6 +96,9 @@ def test_login_user(test_db, login_payload, create_customer, expected_status, cl
             assert login_payload.get("username") == refresh_token_payload.get("sub")
             assert refresh_token_payload.get("is_refresh") == True
 
+            # Each token carries its own id to revoke it
+            assert access_token_payload.get("jti") != refresh_token_payload.get("jti")
+
             # Checking roles in both token
             with TestSessionLocal() as db_session:
                 role_name = (
@@ -200,3 +213,123 @@ def test_reset_password(test_db, client, payload, expected_status, customer_toke
             "Details": "Password changed successfully !",
             "sign-in app": "http://localhost:8000/api/v1/user/sign-in"
         }
+
+
+def test_logout_user(test_db, client, create_customer, customer_2_token, header):
+    refresh_token = create_access_token(
+        data={
+            TOKEN_SUB: create_customer[1].email,
+            TOKEN_USER_ID: str(create_customer[1].id),
+            ROLE_TYPE: "Customer"
+        },
+        refresh=True
+    )
+    header["Authorization"] = f"Bearer {customer_2_token}"
+    response = client.post(
+        "/api/v1/user/logout",
+        json={"access_token": customer_2_token, "refresh_token": refresh_token},
+        headers=header
+    )
+    assert response.status_code == 200, response.text
+    token_payload = jwt.decode(customer_2_token, options={"verify_signature": False})
+    assert revocation_cache.is_revoked(token_payload.get("jti"))
+
+    response = client.get("/api/v1/user/profile", headers=header)
+    assert response.status_code == 401, response.text
+    assert response.json() == {"detail": "This token has expired"}
+
+    # revoked token must be rejected after the cache is reloaded from the database
+    revocation_cache.clear()
+    response = client.get("/api/v1/user/profile", headers=header)
+    assert response.status_code == 401, response.text
+
+
+def test_purge_expired_revocations(test_db):
+    with TestSessionLocal() as db_session:
+        db_session.add_all([
+            BlackListToken(jti="expired-token", expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)),
+            BlackListToken(jti="active-token", expires_at=datetime.now(timezone.utc) + timedelta(minutes=10))
+        ])
+        db_session.commit()
+
+    async def purge():
+        async with TestAsyncSessionLocal() as db:
+            return await purge_expired_revocations(db)
+
+    assert asyncio.run(purge()) >= 1
+
+    with TestSessionLocal() as db_session:
+        assert db_session.get(BlackListToken, "expired-token") is None
+        assert db_session.get(BlackListToken, "active-token") is not None
+
+
+def test_backfill_legacy_revocations(test_db):
+    """ Tokens revoked in the legacy blacklist_token table stay revoked after the backfill."""
+    load_dotenv()
+    SECRET_KEY = os.environ.get("HASH_KEY")
+    ALGORITHM = os.environ.get("HASH_ALGO")
+
+    # tokens issued before the jti claim are identified by their digest
+    revoked_token = jwt.encode(
+        {TOKEN_SUB: "legacy@gmail.com", "exp": datetime.now(timezone.utc) + timedelta(hours=1)}, SECRET_KEY, ALGORITHM
+    )
+    expired_token = jwt.encode(
+        {TOKEN_SUB: "legacy@gmail.com", "exp": datetime.now(timezone.utc) - timedelta(hours=1)}, SECRET_KEY, ALGORITHM
+    )
+    with TestSessionLocal() as db_session:
+        db_session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {LEGACY_REVOCATION_TABLE} (id UUID PRIMARY KEY, token VARCHAR NOT NULL)"
+        ))
+        db_session.execute(
+            text(f"INSERT INTO {LEGACY_REVOCATION_TABLE} (id, token) VALUES (gen_random_uuid(), :token)"),
+            [{"token": revoked_token}, {"token": revoked_token}, {"token": expired_token}]
+        )
+        db_session.commit()
+
+    async def backfill():
+        async with TestAsyncSessionLocal() as db:
+            return await backfill_legacy_revocations(db)
+
+    try:
+        assert asyncio.run(backfill()) == 1
+        assert asyncio.run(backfill()) == 0
+
+        with TestSessionLocal() as db_session:
+            assert db_session.get(BlackListToken, hashlib.sha256(revoked_token.encode()).hexdigest()) is not None
+            assert db_session.get(BlackListToken, hashlib.sha256(expired_token.encode()).hexdigest()) is None
+    finally:
+        with TestSessionLocal() as db_session:
+            db_session.execute(text(f"DROP TABLE {LEGACY_REVOCATION_TABLE}"))
+            db_session.commit()
+
+
+@pytest.mark.parametrize(
+    "stored_rounds, rehashed_rounds",
+    [
+        (BCRYPT_MIN_ROUNDS, BCRYPT_MIN_ROUNDS + 1),
+        (BCRYPT_MIN_ROUNDS + 2, BCRYPT_MIN_ROUNDS + 2)
+    ]
+)
+def test_login_rehashes_outdated_password(test_db, client, create_customer, stored_rounds, rehashed_rounds):
+    """ A password hashed with a lower cost is rehashed on login, one with a higher cost is kept."""
+    with TestSessionLocal() as db_session:
+        user_data = db_session.query(User).filter(User.email == "customer@gmail.com").first()
+        user_data.password = bcrypt.using(rounds=stored_rounds).hash("Customer@1234")
+        db_session.commit()
+
+    pwd_context = Hash.pwd_context
+    Hash.configure(BCRYPT_MIN_ROUNDS + 1)
+    try:
+        with patch("services.user_service.send_mail"):
+            response = client.post(
+                "/api/v1/user/sign-in",
+                json={"username": "customer@gmail.com", "password": "Customer@1234"},
+            )
+        assert response.status_code == 200, response.text
+
+        with TestSessionLocal() as db_session:
+            user_data = db_session.query(User).filter(User.email == "customer@gmail.com").first()
+            assert user_data.password.startswith(f"$2b${rehashed_rounds}$")
+            assert Hash.verify_password("Customer@1234", user_data.password)
+    finally:
+        Hash.pwd_context = pwd_context
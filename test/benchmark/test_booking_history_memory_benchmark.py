@@ -0,0 +1,72 @@
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from authentication.token_management import create_access_token
+from core.constant import TOKEN_SUB, TOKEN_USER_ID, ROLE_TYPE
+from core.database import TestSessionLocal
+from models.turf_booking import TurfBooking
+
+pytestmark = pytest.mark.slow
+
+HISTORY_SIZES = [100, 1000, 10000]
+PAGE_SIZE = 5
+
+
+def add_bookings(customer, count):
+    """ Add the given number of past bookings of the customer in one statement."""
+    reservation_date = datetime(2025, 1, 1)
+    with TestSessionLocal() as db_session:
+        db_session.execute(insert(TurfBooking), [
+            {
+                "customer_id": customer.id,
+                "reservation_date": reservation_date - timedelta(days=day),
+                "start_time": reservation_date - timedelta(days=day) + timedelta(hours=13),
+                "end_time": reservation_date - timedelta(days=day) + timedelta(hours=14),
+                "total_amount": 1200,
+                "payment_status": "paid",
+                "booking_status": "confirm"
+            }
+            for day in range(count)
+        ])
+        db_session.commit()
+
+
+def measure_peak_memory(client, headers):
+    """ Fetch the first page of the booking history and return the peak of the memory allocated meanwhile."""
+    tracemalloc.start()
+    try:
+        response = client.get("/api/v1/customer/show-turf-booking", params={"size": PAGE_SIZE}, headers=headers)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert response.status_code == 200
+    assert len(response.json()["bookings"]) == PAGE_SIZE
+    return peak
+
+
+def test_booking_history_memory_benchmark(client, create_customer):
+    customer = create_customer[0]
+    headers = {"Authorization": "Bearer " + create_access_token(
+        data={TOKEN_SUB: customer.email, TOKEN_USER_ID: str(customer.id), ROLE_TYPE: "Customer"}
+    )}
+
+    # warm up the imports and the connection, so they are not counted against the first size
+    add_bookings(customer, PAGE_SIZE)
+    measure_peak_memory(client, headers)
+
+    peaks = {}
+    history_size = PAGE_SIZE
+    for target_size in HISTORY_SIZES:
+        add_bookings(customer, target_size - history_size)
+        history_size = target_size
+        peaks[history_size] = measure_peak_memory(client, headers)
+
+    print("\n" + "\n".join(f"{size} bookings: peak {peak / 1024:.0f} KiB per page request"
+                           for size, peak in peaks.items()))
+
+    # only one page of rows is loaded, so the memory does not grow with the history
+    assert peaks[HISTORY_SIZES[-1]] < peaks[HISTORY_SIZES[0]] * 1.5
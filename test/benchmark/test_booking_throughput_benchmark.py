@@ -0,0 +1,124 @@
+import asyncio
+import copy
+import time
+from datetime import datetime, date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from geoalchemy2.shape import from_shape
+from shapely.geometry.point import Point
+from sqlalchemy import event, select, func
+
+from core.constant import TURF_SLOT_ALREADY_BOOKED
+from core.database import TestSessionLocal, TestAsyncSessionLocal, test_async_engine
+from models.address_model import Address
+from models.game_model import Game
+from models.turf_booking import TurfBooking
+from models.turf_model import Turf
+from schemas.customer_schemas import BookTurfSchema
+from services.customer_service import CustomerService
+from test.test_data.owner_json_data import address_valid_payload, turf_api_data
+
+pytestmark = pytest.mark.slow
+
+BOOKING_DAYS = 5
+SLOTS_PER_DAY = 10
+STATEMENTS_PER_BOOKING = 3
+# each request opens its own connection, so stay well below the connection limit of the database
+CONCURRENT_REQUESTS = 20
+
+
+@pytest.fixture(scope="module")
+def booking_turf(create_turf_owner):
+    """ This fixture adds the turf which all the benchmark bookings compete for."""
+    with TestSessionLocal() as db_session:
+        address_data = copy.deepcopy(address_valid_payload)
+        address_data["turf_owner_id"] = str(create_turf_owner[0].id)
+        address = Address(**address_data)
+        address.geom = from_shape(Point(address_data["long"], address_data["lat"]), srid=4326)
+        db_session.add(address)
+        db_session.flush()
+
+        turf_data = copy.deepcopy(turf_api_data)
+        turf_data["turf_name"] = "Benchmark turf"
+        turf_data["address_id"] = str(address.id)
+        turf_data["game_id"] = str(db_session.query(Game).filter(Game.game_name == "cricket").first().id)
+        turf_data["turf_owner_id"] = str(create_turf_owner[0].id)
+        turf = Turf(**turf_data)
+        db_session.add(turf)
+        db_session.commit()
+        return turf.id
+
+
+def booking_slots():
+    """ One hour slots of the next days, which are all free at the start of the benchmark."""
+    first_day = datetime.combine(date.today() + timedelta(days=2), datetime.min.time())
+    return [
+        first_day + timedelta(days=day, hours=8 + slot)
+        for day in range(BOOKING_DAYS)
+        for slot in range(SLOTS_PER_DAY)
+    ]
+
+
+async def book_slot(turf_id, customer, start_time):
+    """ Book the slot in its own session, as a separate request would, and return whether it was booked."""
+    booking_data = BookTurfSchema(
+        turf_id=turf_id, reservation_date=start_time, start_time=start_time, end_time=start_time + timedelta(hours=1)
+    )
+    async with TestAsyncSessionLocal() as db:
+        try:
+            await CustomerService(db).book_turf(booking_data, SimpleNamespace(user_id=customer.id))
+            return True
+        except HTTPException as http_exc:
+            assert http_exc.detail == TURF_SLOT_ALREADY_BOOKED
+            return False
+
+
+async def book_concurrently(turf_id, customers, slots):
+    """ Every customer tries to book every slot at the same time, return the outcomes and the throughput."""
+    request_slots = asyncio.Semaphore(CONCURRENT_REQUESTS)
+
+    async def book_request(customer, start_time):
+        async with request_slots:
+            return await book_slot(turf_id, customer, start_time)
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(
+        book_request(customer, start_time) for start_time in slots for customer in customers
+    ))
+    return outcomes, len(outcomes) / (time.perf_counter() - start)
+
+
+def test_booking_throughput_benchmark(booking_turf, create_customer):
+    slots = booking_slots()
+    statements = []
+
+    def collect_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # the first booking compiles the price table of the turf, the measured one finds it cached
+    assert asyncio.run(book_slot(booking_turf, create_customer[0], slots[0]))
+
+    event.listen(test_async_engine.sync_engine, "before_cursor_execute", collect_statement)
+    try:
+        assert asyncio.run(book_slot(booking_turf, create_customer[0], slots[1]))
+    finally:
+        event.remove(test_async_engine.sync_engine, "before_cursor_execute", collect_statement)
+
+    # turf lock with price, discount and rules version, slot conflict check and the insert returning the id,
+    # the statements of the connection setup do not touch the turf tables
+    booking_statements = [statement for statement in statements if "turf" in statement]
+    assert len(booking_statements) == STATEMENTS_PER_BOOKING, booking_statements
+
+    outcomes, throughput = asyncio.run(book_concurrently(booking_turf, create_customer[:2], slots[2:]))
+    print(f"\n{len(outcomes)} concurrent booking requests for {len(slots) - 2} slots of one turf: "
+          f"{throughput:.1f} requests/s")
+
+    # the turf lock lets exactly one of the competing requests book each slot
+    assert sum(outcomes) == len(slots) - 2
+    with TestSessionLocal() as db_session:
+        booked_slots = db_session.execute(
+            select(func.count(TurfBooking.id)).where(TurfBooking.turf_id == booking_turf)
+        ).scalar()
+    assert booked_slots == len(slots)
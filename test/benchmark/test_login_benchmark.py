@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from authentication.hashing import Hash
+
+pytestmark = pytest.mark.slow
+
+CONCURRENT_SIGN_INS = 8
+PASSWORD = "Customer@1234"
+
+
+async def measure_sign_ins(verify):
+    """ Run concurrent password checks and measure throughput and the longest event loop stall."""
+    hashed_password = Hash.encrypt(PASSWORD)
+    max_stall = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal max_stall
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            max_stall = max(max_stall, time.perf_counter() - start - 0.005)
+
+    async def sign_in():
+        assert await verify(PASSWORD, hashed_password)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(sign_in() for _ in range(CONCURRENT_SIGN_INS)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await heartbeat_task
+
+    return CONCURRENT_SIGN_INS / elapsed, max_stall
+
+
+async def verify_on_event_loop(input_password, hashed_password):
+    return Hash.verify_password(input_password, hashed_password)
+
+
+def test_login_throughput_benchmark():
+    inline_throughput, inline_stall = asyncio.run(measure_sign_ins(verify_on_event_loop))
+    pool_throughput, pool_stall = asyncio.run(measure_sign_ins(Hash.async_verify_password))
+
+    print(f"\ninline: {inline_throughput:.1f} sign-ins/s, longest loop stall {inline_stall * 1000:.0f} ms"
+          f"\npool ({Hash.executor._max_workers} workers): {pool_throughput:.1f} sign-ins/s, "
+          f"longest loop stall {pool_stall * 1000:.0f} ms")
+
+    # Hashing in the pool keeps the event loop free for the other requests
+    assert pool_stall < inline_stall
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, insert
+
+from core.database import TestSessionLocal, TestAsyncSessionLocal, test_async_engine
+from models.revenue_model import Revenue
+from models.turf_booking import TurfBooking
+from models.turf_model import Turf
+from services.admin_service import AdminService
+
+pytestmark = pytest.mark.slow
+
+TURF_COUNTS = [10, 100]
+BOOKINGS_PER_TURF = 100
+REVENUE_AMOUNT = 150
+START_DATE = date(2025, 1, 1)
+END_DATE = date(2025, 12, 31)
+
+
+def add_turfs_with_bookings(owner, customer, count):
+    """ Add turfs of the owner, each with a paid booking and its revenue on each of the first days of the year."""
+    first_day = datetime.combine(START_DATE, datetime.min.time())
+    with TestSessionLocal() as db_session:
+        turf_ids = db_session.execute(insert(Turf).returning(Turf.id), [
+            {
+                "turf_name": f"Revenue turf {turf}",
+                "description": "Revenue benchmark turf",
+                "booking_price": 1200,
+                "is_active": True,
+                "is_verified": True,
+                "turf_owner_id": owner.id
+            }
+            for turf in range(count)
+        ]).scalars().all()
+
+        booking_ids = db_session.execute(insert(TurfBooking).returning(TurfBooking.id), [
+            {
+                "turf_id": turf_id,
+                "customer_id": customer.id,
+                "reservation_date": first_day + timedelta(days=day),
+                "start_time": first_day + timedelta(days=day, hours=18),
+                "end_time": first_day + timedelta(days=day, hours=19),
+                "total_amount": 1200,
+                "payment_status": "paid",
+                "booking_status": "confirm"
+            }
+            for turf_id in turf_ids
+            for day in range(BOOKINGS_PER_TURF)
+        ]).scalars().all()
+
+        db_session.execute(insert(Revenue), [
+            {"turf_booking_id": booking_id, "amount": REVENUE_AMOUNT} for booking_id in booking_ids
+        ])
+        db_session.commit()
+
+
+async def get_revenue_data(owner, admin):
+    """ Fetch the revenue of the owner in its own session, as a separate request would."""
+    async with TestAsyncSessionLocal() as db:
+        return await AdminService(db).get_revenue_data(
+            owner.id, SimpleNamespace(user_id=admin.id), START_DATE, END_DATE
+        )
+
+
+def measure_revenue_data(owner, admin):
+    """ Fetch the revenue of the owner and return it with the statements executed and the elapsed time."""
+    statements = []
+
+    def collect_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_async_engine.sync_engine, "before_cursor_execute", collect_statement)
+    try:
+        start = time.perf_counter()
+        revenue_data = asyncio.run(get_revenue_data(owner, admin))
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(test_async_engine.sync_engine, "before_cursor_execute", collect_statement)
+
+    return revenue_data, statements, elapsed
+
+
+def test_revenue_aggregation_benchmark(create_admin, create_turf_owner, create_customer):
+    owner = create_turf_owner[0]
+
+    # warm up the principal cache of the owner, so its lookup is not counted against the first size
+    add_turfs_with_bookings(owner, create_customer[0], 1)
+    asyncio.run(get_revenue_data(owner, create_admin))
+
+    results = {}
+    turf_count = 1
+    for target_count in TURF_COUNTS:
+        add_turfs_with_bookings(owner, create_customer[0], target_count - turf_count)
+        turf_count = target_count
+
+        revenue_data, statements, elapsed = measure_revenue_data(owner, create_admin)
+        results[turf_count] = (len(statements), elapsed)
+
+        assert len(revenue_data.revenues) == turf_count
+        assert all(turf.revenue_amount == BOOKINGS_PER_TURF * REVENUE_AMOUNT for turf in revenue_data.revenues)
+        assert revenue_data.total_revenue == turf_count * BOOKINGS_PER_TURF * REVENUE_AMOUNT
+
+    print("\n" + "\n".join(
+        f"{count} turfs x {BOOKINGS_PER_TURF} bookings: {statement_count} statements, {elapsed * 1000:.0f} ms"
+        for count, (statement_count, elapsed) in results.items()
+    ))
+
+    # the revenue is summed by one aggregate, so the statements do not grow with the turfs or their bookings
+    statement_counts = {statement_count for statement_count, _ in results.values()}
+    assert len(statement_counts) == 1
+    revenue_statements = [statement for statement in statements if "revenue" in statement]
+    assert len(revenue_statements) == 1, revenue_statements
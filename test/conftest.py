@@ -2,12 +2,18 @@ import copy
 import uuid
 
 import pytest
+from sqlalchemy import event
 from geoalchemy2.shape import from_shape
 from shapely.geometry.point import Point
 from starlette.testclient import TestClient
 
 from authentication.hashing import Hash
-from core.database import TestSessionLocal, test_engine, Base, get_db
+from authentication.principal_cache import principal_cache
+from authentication.revocation_cache import revocation_cache
+from core.database import TestSessionLocal, test_engine, Base, get_db, TestAsyncSessionLocal, test_async_engine
+from core.pricing import price_tables
+from core.reference_catalog import reference_catalog
+from core.search_cache import search_cache
 from core.seed_data import admin_data_payload
 from main import app
 from models.game_model import Game
@@ -16,6 +22,23 @@ from models.user_model import User
 from test.test_data.user_json_data import user_data_payload
 
 
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", default=False,
+                     help="run the slow tests, which seed large tables or measure performance")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: seeds large tables or measures performance, run with --run-slow")
+
+def pytest_collection_modifyitems(config, items):
+    """ This hook skips the slow tests unless --run-slow is given."""
+    if config.getoption("--run-slow"):
+        return
+
+    skip_slow = pytest.mark.skip(reason="slow test, run with --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
 @pytest.fixture(scope="module")
 def test_db():
     Base.metadata.create_all(bind=test_engine)
@@ -50,15 +73,41 @@ def test_db():
         if tables_to_drop:
             Base.metadata.drop_all(bind=test_engine, tables=tables_to_drop)
 
-def override_get_db():
-    db = TestSessionLocal()
-    try:
+        # blacklist_token table is dropped, so forget the revoked tokens as well
+        revocation_cache.clear()
+        principal_cache.clear()
+        search_cache.clear()
+        reference_catalog.clear()
+        price_tables.clear()
+
+async def override_get_db():
+    async with TestAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 app.dependency_overrides[get_db] = override_get_db
 
+@pytest.fixture(autouse=True)
+def clear_request_caches():
+    """ This fixture forgets the cached turf searches and reference data,
+        since the tests change the tables directly."""
+    search_cache.clear()
+    reference_catalog.clear()
+    yield
+
+@pytest.fixture
+def query_counter():
+    """ This fixture collects the SQL statements executed by the API through the test engine."""
+    statements = []
+
+    def collect_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_async_engine.sync_engine, "before_cursor_execute", collect_statement)
+    try:
+        yield statements
+    finally:
+        event.remove(test_async_engine.sync_engine, "before_cursor_execute", collect_statement)
+
 @pytest.fixture(scope="module")
 def client():
     with TestClient(app) as client:
@@ -0,0 +1,123 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert, select, text
+
+from core.booking_queries import conflicting_bookings, customer_bookings, turf_bookings
+from core.constant import CURSOR_NEXT
+from core.database import TestSessionLocal
+from core.pagination import newest_first, offset_query, keyset_query, encode_cursor
+from core.slot_occupancy import is_turf_free
+from models.turf_booking import TurfBooking
+from test.api.conftest import address, turf
+
+pytestmark = pytest.mark.slow
+
+SEEDED_DAYS = 2000
+BOOKINGS_PER_DAY = 10
+FIRST_DAY = datetime(2024, 1, 1)
+PAGE_SIZE = 5
+
+
+@pytest.fixture(scope="module")
+def seeded_bookings(create_customer, turf):
+    """ This fixture seeds a large booking history, so that the planner prefers the indexes where they fit."""
+    with TestSessionLocal() as db_session:
+        db_session.execute(insert(TurfBooking), [
+            {
+                "turf_id": turf.id,
+                "customer_id": create_customer[slot % 2].id,
+                "reservation_date": FIRST_DAY + timedelta(days=day),
+                "start_time": FIRST_DAY + timedelta(days=day, hours=8 + slot),
+                "end_time": FIRST_DAY + timedelta(days=day, hours=9 + slot),
+                "total_amount": 1200,
+                "payment_status": "paid",
+                "booking_status": "cancelled" if slot % 5 == 0 else "confirm"
+            }
+            for day in range(SEEDED_DAYS)
+            for slot in range(BOOKINGS_PER_DAY)
+        ])
+        db_session.execute(text("ANALYZE turf_booking"))
+        db_session.execute(text("ANALYZE turf_slot_occupancy"))
+        db_session.commit()
+
+    return turf.id, create_customer[0].id
+
+
+def page_cursor():
+    """ This function returns the cursor of the next page after a booking created now."""
+    return encode_cursor(SimpleNamespace(created_at=datetime.now(), id=uuid4()), CURSOR_NEXT)
+
+
+def slot_conflict_query(turf_id, customer_id):
+    """ overlap check of validate_booking_data """
+    reservation_date = FIRST_DAY + timedelta(days=SEEDED_DAYS // 2)
+    return conflicting_bookings(
+        turf_id, reservation_date, reservation_date + timedelta(hours=10), reservation_date + timedelta(hours=12)
+    )
+
+
+def turf_availability_query(turf_id, customer_id):
+    """ free slot condition of search_free_turfs, evaluated for one turf """
+    reservation_date = FIRST_DAY + timedelta(days=SEEDED_DAYS // 2)
+    return select(is_turf_free(turf_id, reservation_date + timedelta(hours=10), reservation_date + timedelta(hours=12)))
+
+
+def customer_history_query(turf_id, customer_id):
+    """ first page of show_turf_booking_history """
+    return offset_query(newest_first(customer_bookings(customer_id), TurfBooking), 1, PAGE_SIZE)
+
+
+def customer_history_cursor_query(turf_id, customer_id):
+    """ page of show_turf_booking_history after a cursor """
+    return keyset_query(customer_bookings(customer_id), TurfBooking, PAGE_SIZE, page_cursor())[0]
+
+
+def turf_bookings_query(turf_id, customer_id):
+    """ first page of the turf booking lists of admin, owner and manager """
+    start_date = FIRST_DAY + timedelta(days=SEEDED_DAYS // 2)
+    return offset_query(
+        newest_first(turf_bookings(turf_id, start_date, start_date + timedelta(days=7)), TurfBooking), 1, PAGE_SIZE
+    )
+
+
+def turf_bookings_cursor_query(turf_id, customer_id):
+    """ page of the turf booking lists of admin, owner and manager after a cursor """
+    start_date = FIRST_DAY + timedelta(days=SEEDED_DAYS // 2)
+    return keyset_query(
+        turf_bookings(turf_id, start_date, start_date + timedelta(days=7)), TurfBooking, PAGE_SIZE, page_cursor()
+    )[0]
+
+
+def scanned_nodes(plan):
+    """ This function walks the plan tree and yields the type and the relation of every node."""
+    yield plan["Node Type"], plan.get("Relation Name")
+    for child_plan in plan.get("Plans", []):
+        yield from scanned_nodes(child_plan)
+
+
+@pytest.mark.parametrize(
+    "build_query",
+    [
+        slot_conflict_query, turf_availability_query, customer_history_query, customer_history_cursor_query,
+        turf_bookings_query, turf_bookings_cursor_query
+    ]
+)
+def test_booking_queries_use_indexes(seeded_bookings, build_query):
+    """ test that the hot booking queries do not fall back to a sequential scan of the booking tables """
+    query = build_query(*seeded_bookings)
+
+    with TestSessionLocal() as db_session:
+        connection = db_session.connection()
+        compiled = query.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+        query_plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+
+    if isinstance(query_plan, str):
+        query_plan = json.loads(query_plan)
+
+    nodes = list(scanned_nodes(query_plan[0]["Plan"]))
+    assert ("Seq Scan", "turf_booking") not in nodes, nodes
+    assert ("Seq Scan", "turf_slot_occupancy") not in nodes, nodes